@@ -70,26 +70,82 @@ def karma_chain_with_lights(sublayer, output_file: str, width: int, height: int,
     return rop
 
 
+# Networks built in this session, keyed by (usd_path, camera, light, width, height)
+_SUBLAYERS = {}
+_NETWORKS = {}
+
+
+def karma_network(usd_path: str, width: int = 1920, height: int = 1080, camera: str = None,
+                  light: str = None):
+    """
+    Return the usdrender_rop for this scene/camera/light/resolution, building the
+    sublayer and Karma chain only the first time it is asked for in this session.
+    """
+    key = (usd_path, camera, light, width, height)
+    if key not in _NETWORKS:
+        if usd_path not in _SUBLAYERS:
+            _SUBLAYERS[usd_path] = load_usd_as_sublayer(ensure_stage(), usd_path)
+        _NETWORKS[key] = karma_chain_with_lights(_SUBLAYERS[usd_path], "", width, height, camera, light)
+    return _NETWORKS[key]
+
+
+def render_frame(rop, frame: int, output_file: str):
+    """Point the Karma chain feeding rop at output_file and render a single frame."""
+    karma = rop.input(0)
+    if karma.parm("picture"):
+        karma.parm("picture").set(output_file)
+    hou.setFrame(frame)
+    if rop.parm("trange"):
+        rop.parm("trange").set(1)
+    rop.render(frame_range=(frame, frame))
+
+
 def render_with_karma(usd_path: str, output_file: str, frame: int, width: int = 1920,
                       height: int = 1080, camera: str = None, light: str = None):
     """
     Full render helper:
     - Loads USD as sublayer
-    - Builds Karma + light chain
+    - Builds Karma + light chain (reused by later calls in the same session)
     - Renders single frame
     """
-    stage = ensure_stage()
-    sub = load_usd_as_sublayer(stage, usd_path)
-    rop = karma_chain_with_lights(sub, output_file, width, height, camera, light)
-
-    # Render current frame
-    hou.setFrame(frame)
-    if rop.parm("trange"):
-        rop.parm("trange").set(0)
-    rop.render()
+    rop = karma_network(usd_path, width, height, camera, light)
+    render_frame(rop, frame, output_file)
     return f"[HOUDINI] Rendered frame {frame} → {output_file}"
 
 
+def render_range(usd_path: str, output_template: str, start: int, end: int, width: int = 1920,
+                 height: int = 1080, camera: str = None, light: str = None):
+    """
+    Render frames start..end in this hython session through one Karma network.
+    Each frame is written to output_template.format(frame=N) and reported on
+    stdout as "[HOUDINI] FRAME_DONE <frame> <path>".
+    """
+    rop = karma_network(usd_path, width, height, camera, light)
+    for frame in range(start, end + 1):
+        output_file = output_template.format(frame=frame)
+        render_frame(rop, frame, output_file)
+        print(f"[HOUDINI] FRAME_DONE {frame} {output_file}", flush=True)
+    return f"[HOUDINI] Rendered frames {start}-{end} → {output_template}"
+
+
+def serve(usd_path: str):
+    """
+    Stay resident with usd_path loaded and render jobs sent over stdin
+    (see worker_protocol.py) until told to shut down. Networks are reused
+    across jobs with the same camera/light/resolution.
+    """
+    from worker_protocol import serve as serve_jobs
+
+    def render_job(job):
+        rop = karma_network(usd_path, job.get("width") or 1920, job.get("height") or 1080,
+                            job.get("camera"), job.get("light"))
+        render_frame(rop, job["frame"], job["output"])
+        return job["output"]
+
+    karma_network(usd_path)  # load the scene before reporting ready
+    serve_jobs(render_job)
+
+
 def cli():
     p = argparse.ArgumentParser(description="Houdini Karma Adapter")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -104,7 +160,25 @@ def cli():
     r.add_argument("--light", type=str, default=None, choices=["Dome Light", "Physical Sky"],
                    help="Optional light to enable")
 
+    rr = sub.add_parser("render-range")
+    rr.add_argument("--scene", required=True, help="Absolute path to USD scene")
+    rr.add_argument("--output", required=True, help="Absolute output path with a {frame} placeholder")
+    rr.add_argument("--start", type=int, required=True)
+    rr.add_argument("--end", type=int, required=True)
+    rr.add_argument("--width", type=int, default=1920)
+    rr.add_argument("--height", type=int, default=1080)
+    rr.add_argument("--camera", type=str, default=None, help="Camera name in USD to use")
+    rr.add_argument("--light", type=str, default=None, choices=["Dome Light", "Physical Sky"],
+                    help="Optional light to enable")
+
+    w = sub.add_parser("serve")
+    w.add_argument("--scene", required=True, help="Absolute path to USD scene")
+
     args = p.parse_args()
+    if args.cmd == "serve":
+        serve(str(Path(args.scene).resolve()))
+        return
+
     print(f"!!!!!!LIGHT IS {args.light} AND CAMERA IS {args.camera}!!!!!!")
 
     if args.cmd == "render-frame":
@@ -118,6 +192,18 @@ def cli():
             light=args.light,
         )
         print(msg)
+    elif args.cmd == "render-range":
+        msg = render_range(
+            usd_path=str(Path(args.scene).resolve()),
+            output_template=args.output,
+            start=args.start,
+            end=args.end,
+            width=args.width,
+            height=args.height,
+            camera=args.camera,
+            light=args.light,
+        )
+        print(msg)
 
 
 if __name__ == "__main__":
@@ -115,17 +115,73 @@ def render(scene_file, output_path, startf, endf, ext, camera="persp"):
     print(f"[MAYA] Rendered frames {startf}-{endf} to {output_path}")
     return f"[MAYA] Rendered frames {startf}-{endf} to {output_path}"
 
+def _setup_arnold(ext):
+    """Make Arnold the current renderer, writing one merged file per frame."""
+    _ensure_arnold_plugin()
+    cmds.setAttr("defaultRenderGlobals.currentRenderer", "arnold", type="string")
+    cmds.setAttr("defaultArnoldDriver.ai_translator", ext, type="string")
+    cmds.setAttr("defaultArnoldDriver.mergeAOVs", 1)
+    cmds.setAttr("defaultRenderGlobals.animation", 0)
+
+def _render_arnold_frame(frame, output_path, camera="persp"):
+    cmds.setAttr("defaultArnoldDriver.pre", output_path, type="string")
+    cmds.setAttr("defaultRenderGlobals.startFrame", frame)
+    cmds.setAttr("defaultRenderGlobals.endFrame", frame)
+    cmds.currentTime(frame)
+    cmds.arnoldRender(seq=str(frame), camera=camera)
+
+def render_frames(scene_file, output_template, startf, endf, ext, camera="persp"):
+    """
+    Render frames startf..endf with Arnold in a single Maya session.
+
+    The scene is opened and the Arnold plugin loaded once; each frame is then
+    written to output_template.format(frame=N) and reported on stdout as
+    "[MAYA] FRAME_DONE <frame> <path>" so the caller can track progress.
+    """
+    cmds.file(scene_file, o=True, force=True)
+    _setup_arnold(ext)
+
+    for frame in range(startf, endf + 1):
+        output_path = output_template.format(frame=frame)
+        _render_arnold_frame(frame, output_path, camera)
+        print(f"[MAYA] FRAME_DONE {frame} {output_path}", flush=True)
+
+    return f"[MAYA] Rendered frames {startf}-{endf} to {output_template}"
+
+def serve(scene_file):
+    """
+    Stay resident with scene_file open and render jobs sent over stdin
+    (see worker_protocol.py) until told to shut down.
+    """
+    from worker_protocol import serve as serve_jobs
+
+    cmds.file(scene_file, o=True, force=True)
+    current = {}
+
+    def render_job(job):
+        ext = job.get("ext", "exr")
+        if current.get("ext") != ext:
+            _setup_arnold(ext)
+            current["ext"] = ext
+        if job.get("width") and job.get("height"):
+            cmds.setAttr("defaultResolution.width", job["width"])
+            cmds.setAttr("defaultResolution.height", job["height"])
+        _render_arnold_frame(job["frame"], job["output"], job.get("camera") or "persp")
+        return job["output"]
+
+    serve_jobs(render_job)
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description="Maya Adapter CLI")
-    parser.add_argument("function", choices=["export_usd", "render"])
+    parser.add_argument("function", choices=["export_usd", "render", "serve"])
     parser.add_argument("--directory", default="TEMP")  # not used here but kept to match your call
     parser.add_argument("--scene", required=True, help="Project name")
     parser.add_argument("--file", required=True, help=".ma/.mb scene full path")
     parser.add_argument("--startf", type=int, default=1)
     parser.add_argument("--endf", type=int, default=1)
     parser.add_argument("--outputf", help="USD export full path")
-    parser.add_argument("--outputr", help="Render output path (unused here)")
+    parser.add_argument("--outputr", help="Render output path; a {frame} placeholder renders one file per frame")
     parser.add_argument("--ext", choices=["png", "exr", "jpeg"])
     parser.add_argument("--cam", default="cam1")
 
@@ -144,7 +200,13 @@ def main():
             if not args.outputr:
                 print("[MAYA] ERROR: --outputr is required for export_usd", file=sys.stderr)
                 sys.exit(2)
-            render(args.file, args.outputr, args.startf, args.endf, args.ext, args.cam)
+            if "{frame}" in args.outputr:
+                render_frames(args.file, args.outputr, args.startf, args.endf, args.ext, args.cam)
+            else:
+                render(args.file, args.outputr, args.startf, args.endf, args.ext, args.cam)
+
+        elif args.function == "serve":
+            serve(args.file)
 
     except Exception:
         traceback.print_exc()
@@ -0,0 +1,58 @@
+# adapters/worker_protocol.py
+"""
+Job protocol spoken by resident ("warm") DCC workers.
+
+A worker is an adapter started with its `serve` command. It loads the scene
+once, then reads one JSON job per line on stdin and answers each on stdout:
+
+    -> {"id": 1, "frame": 12, "output": "/abs/rf12v001.exr", "camera": "persp",
+        "width": 1920, "height": 1080, "ext": "exr", "light": null}
+    <- [WORKER] {"id": 1, "status": "ok", "frame": 12, "output": "/abs/rf12v001.exr"}
+    <- [WORKER] {"id": 1, "status": "error", "frame": 12, "error": "..."}
+
+`{"cmd": "shutdown"}` (or closing stdin) stops the worker. Replies carry the
+[WORKER] prefix so DCC log output on stdout can be told apart from them.
+
+Only depends on the standard library so it can run inside mayapy and hython.
+"""
+import json
+import sys
+import traceback
+
+PREFIX = "[WORKER] "
+
+
+def send(message: dict, stream=None):
+    stream = stream or sys.stdout
+    stream.write(PREFIX + json.dumps(message) + "\n")
+    stream.flush()
+
+
+def parse(line: str):
+    """Return the message carried by a worker reply line, or None for log output."""
+    if not line.startswith(PREFIX):
+        return None
+    return json.loads(line[len(PREFIX):])
+
+
+def serve(render_job, stdin=None):
+    """
+    Run the job loop until shutdown. render_job(job) renders one frame and
+    returns the written output path; any exception is reported for that job
+    and the worker keeps serving.
+    """
+    stdin = stdin or sys.stdin
+    send({"event": "ready"})
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        job = json.loads(line)
+        if job.get("cmd") == "shutdown":
+            break
+        try:
+            output = render_job(job)
+            send({"id": job.get("id"), "status": "ok", "frame": job.get("frame"), "output": str(output)})
+        except Exception as e:
+            traceback.print_exc()
+            send({"id": job.get("id"), "status": "error", "frame": job.get("frame"), "error": str(e)})
@@ -0,0 +1,74 @@
+"""
+Loading a core.models.Project with many frame versions: the YAML form
+(core.utils.load_project_from_yaml) against the binary form
+(core.utils.load_project_binary), plus indexed lookups on the loaded table.
+
+    python -m benchmarks.project_model [--versions 400] [--frames 2500] [--shots 100]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from core.models import Project, Shot, RenderSettingsVersion, FrameVersionTable
+from core.frameset import FrameSet
+from core.utils import save_project_to_yaml, load_project_from_yaml, save_project_binary, load_project_binary
+
+
+def make_project(versions, frames, shots) -> Project:
+    rows = [(frame, v, f"rsv{v:03d}", f"/show/Renders/rsv{v:03d}/rf{frame}v{v:03d}.exr")
+            for v in range(1, versions + 1) for frame in range(1, frames + 1)]
+    per_shot = frames // shots
+    return Project(
+        "Bench", "@Bench",
+        [Shot(f"SH{i:03d}", (i * per_shot + 1, (i + 1) * per_shot)) for i in range(shots)],
+        [RenderSettingsVersion(f"rsv{v:03d}", {"renderer": "Arnold", "output_dir": "/show/Renders"},
+                               FrameSet.from_range(1, frames), (1, frames)) for v in range(1, versions + 1)],
+        FrameVersionTable(rows))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--versions", type=int, default=400)
+    p.add_argument("--frames", type=int, default=2500)
+    p.add_argument("--shots", type=int, default=100)
+    p.add_argument("--skip-yaml", action="store_true", help="YAML load of a million rows takes minutes")
+    args = p.parse_args()
+
+    project, built = timed(lambda: make_project(args.versions, args.frames, args.shots))
+    print(f"{len(project.frame_versions):,} frame versions (built in {built:.2f} s)")
+
+    with tempfile.TemporaryDirectory() as root:
+        bin_path = os.path.join(root, "project.bin")
+        _, saved = timed(lambda: save_project_binary(project, bin_path))
+        loaded, load_time = timed(lambda: load_project_binary(bin_path))
+        assert len(loaded.frame_versions) == len(project.frame_versions)
+        print(f"binary: {os.path.getsize(bin_path) / 1e6:6.1f} MB  save {saved * 1e3:7.1f} ms  "
+              f"load {load_time * 1e3:7.1f} ms")
+
+        if not args.skip_yaml:
+            yaml_path = os.path.join(root, "project.yaml")
+            _, saved = timed(lambda: save_project_to_yaml(project, yaml_path))
+            _, yaml_load = timed(lambda: load_project_from_yaml(yaml_path))
+            print(f"yaml:   {os.path.getsize(yaml_path) / 1e6:6.1f} MB  save {saved * 1e3:7.1f} ms  "
+                  f"load {yaml_load * 1e3:7.1f} ms  ({yaml_load / load_time:.0f}x slower)")
+
+        table = loaded.frame_versions
+        _, t = timed(lambda: [table.for_frame(f) for f in range(1, 1001)])
+        print(f"for_frame x1000:             {t * 1e3:7.1f} ms")
+        _, t = timed(lambda: loaded.frame_versions_for_shot("SH050"))
+        print(f"frame_versions_for_shot:     {t * 1e3:7.1f} ms")
+        _, t = timed(lambda: table.for_rsv("rsv200"))
+        print(f"for_rsv (builds the index):  {t * 1e3:7.1f} ms")
+        _, t = timed(lambda: table.for_rsv("rsv201"))
+        print(f"for_rsv (indexed):           {t * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Project-open latency: how long the metadata reads behind opening a project
+take, before and after the shared metadata cache.
+
+Opening a project parses metadata.yaml in SceneProject.load_existing,
+MainProjectWindow.load_metadata and ProjectConfig.load, and renders.yaml in
+the RenderManager built by RenderSettingsWindow and by ManageShotsWindow3Panel.
+
+    python -m benchmarks.project_open [--shots 2000] [--versions 40] [--frames 2500]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import yaml
+
+from core.storage import METADATA_CACHE, load_metadata, read_yaml, YamlLoader
+from core.rendering import RenderManager
+
+
+def make_project(root, shots, versions, frames):
+    config_dir = os.path.join(root, "Config")
+    os.makedirs(config_dir)
+    metadata = {
+        "project_name": "Bench",
+        "project_tag": "@Bench",
+        "project_dir": root,
+        "scene_file": ["bench.mb", "bench.usda"],
+        "shots": [f"SH{i:04d}" for i in range(shots)],
+        "shot_struct": {f"SH{i:04d}": [i * 100 + 1, i * 100 + 100] for i in range(shots)},
+        "renderSettings": {},
+        "renders": {},
+    }
+    renders = {"renders": {
+        f"rsv{v:03d}": {
+            "settings": {"renderer": "Arnold", "fps": 24, "output_dir": os.path.join(root, "Renders"),
+                         "output_format": "EXR", "resolution_width": 1920, "resolution_height": 1080},
+            "frame_range": [1, frames],
+            "frames": list(range(1, frames + 1)),
+        } for v in range(1, versions + 1)
+    }}
+    with open(os.path.join(config_dir, "metadata.yaml"), "w") as f:
+        yaml.safe_dump(metadata, f)
+    with open(os.path.join(config_dir, "renders.yaml"), "w") as f:
+        yaml.safe_dump(renders, f)
+    return config_dir
+
+
+def open_before(config_dir):
+    """The reads opening a project made before: pure-Python safe_load every time."""
+    for name in ("metadata.yaml", "metadata.yaml", "metadata.yaml", "renders.yaml", "renders.yaml"):
+        with open(os.path.join(config_dir, name), "r") as f:
+            yaml.safe_load(f)
+
+
+def open_after(config_dir):
+    """The same consumers going through the shared cache."""
+    metadata_path = os.path.join(config_dir, "metadata.yaml")
+    load_metadata(config_dir)  # SceneProject.load_existing
+    read_yaml(metadata_path)  # MainProjectWindow.load_metadata
+    read_yaml(metadata_path)  # ProjectConfig.load
+    RenderManager(os.path.join(config_dir, "renders.yaml"))  # RenderSettingsWindow
+    RenderManager(os.path.join(config_dir, "renders.yaml"))  # ManageShotsWindow3Panel
+
+
+def best_of(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--shots", type=int, default=2000)
+    p.add_argument("--versions", type=int, default=40)
+    p.add_argument("--frames", type=int, default=2500)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        config_dir = make_project(root, args.shots, args.versions, args.frames)
+        sizes = {name: os.path.getsize(os.path.join(config_dir, name)) for name in ("metadata.yaml", "renders.yaml")}
+        print(f"Project: {args.shots} shots, {args.versions} versions x {args.frames} frames "
+              f"(metadata.yaml {sizes['metadata.yaml'] / 1e3:.0f} kB, renders.yaml {sizes['renders.yaml'] / 1e6:.1f} MB)")
+        print(f"Loader: {YamlLoader.__name__}")
+
+        before = best_of(lambda: open_before(config_dir), args.repeat)
+        cold = best_of(lambda: open_after(config_dir), args.repeat, setup=METADATA_CACHE.invalidate)
+        warm = best_of(lambda: open_after(config_dir), args.repeat)
+
+        print(f"before (safe_load per consumer):  {before * 1e3:8.1f} ms")
+        print(f"after, cold cache:                {cold * 1e3:8.1f} ms  ({before / cold:.1f}x)")
+        print(f"after, warm cache (reopen):       {warm * 1e3:8.1f} ms  ({before / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
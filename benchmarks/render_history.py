@@ -0,0 +1,80 @@
+"""
+Opening render history: RenderManager on a single renders.yaml (every
+version parsed up front) against the split Config/renders/ layout (index
+only, versions loaded on first access).
+
+    python -m benchmarks.render_history [--versions 2000] [--frames 2500]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import yaml
+
+from core.storage import METADATA_CACHE
+from core.rendering import RenderManager, RenderHistory
+
+
+def version(v, root, frames):
+    # Every other frame finished: a realistic partial render that does not collapse into one range
+    return {"settings": {"renderer": "Arnold", "fps": 24, "output_dir": os.path.join(root, "Renders"),
+                         "output_format": "EXR", "resolution_width": 1920, "resolution_height": 1080},
+            "frame_range": [1, frames],
+            "frames": list(range(1, frames + 1, 2))}
+
+
+def make_projects(root, versions, frames):
+    single = os.path.join(root, "single", "renders.yaml")
+    os.makedirs(os.path.dirname(single))
+    with open(single, "w") as f:
+        yaml.safe_dump({"renders": {f"rsv{v:03d}": version(v, root, frames) for v in range(1, versions + 1)}}, f)
+
+    split = os.path.join(root, "split", "renders.yaml")
+    history = RenderHistory(os.path.join(root, "split", "renders"))
+    for v in range(1, versions + 1):
+        history[f"rsv{v:03d}"] = version(v, root, frames)
+    history.flush()
+    return single, split
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        METADATA_CACHE.invalidate()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--versions", type=int, default=2000)
+    p.add_argument("--frames", type=int, default=2500)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        single, split = make_projects(root, args.versions, args.frames)
+        print(f"{args.versions} versions x {args.frames // 2} frames "
+              f"(renders.yaml {os.path.getsize(single) / 1e6:.1f} MB, "
+              f"index.yaml {os.path.getsize(os.path.join(root, 'split', 'renders', 'index.yaml')) / 1e3:.0f} kB)")
+
+        def list_versions(path):
+            manager = RenderManager(path)
+            manager.get_render_versions()
+            return manager
+
+        before, _ = best_of(lambda: list_versions(single), args.repeat)
+        after, manager = best_of(lambda: list_versions(split), args.repeat)
+        print(f"open + list versions, single file: {before * 1e3:8.1f} ms")
+        print(f"open + list versions, split:       {after * 1e3:8.1f} ms  ({before / after:.0f}x, "
+              f"{manager.history.loads} version files read)")
+
+        one, _ = best_of(lambda: manager.get_frames("rsv1000" if args.versions >= 1000 else "rsv001"), 1)
+        print(f"first access to one version:       {one * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
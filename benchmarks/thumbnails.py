@@ -0,0 +1,57 @@
+"""
+Version-strip thumbnails: decoding and scaling each full-resolution render
+(what the gallery did per thumbnail) against core.thumbnails.ThumbnailCache,
+cold (first open generates the thumbnails) and warm (every later open).
+
+    python -m benchmarks.thumbnails [--versions 40] [--width 3840] [--height 2160]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from PIL import Image
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QImage
+
+from core.thumbnails import ThumbnailCache, THUMBNAIL_SIZE
+
+
+def make_renders(root, versions, width, height):
+    paths = []
+    for v in range(1, versions + 1):
+        path = os.path.join(root, "Renders", f"rsv{v:03d}", f"rf1v{v:03d}.png")
+        os.makedirs(os.path.dirname(path))
+        Image.radial_gradient("L").resize((width, height)).convert("RGB").save(path)
+        paths.append(path)
+    return paths
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--versions", type=int, default=40)
+    p.add_argument("--width", type=int, default=3840)
+    p.add_argument("--height", type=int, default=2160)
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = make_renders(root, args.versions, args.width, args.height)
+        print(f"{args.versions} versions at {args.width}x{args.height}")
+
+        full = timed(lambda: [QImage(p).scaled(*THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                              for p in paths])
+        cold = timed(lambda: [QImage(ThumbnailCache.for_project(root).thumbnail(p)) for p in paths])
+        warm = timed(lambda: [QImage(ThumbnailCache.for_project(root).thumbnail(p)) for p in paths])
+        print(f"  full decode + scale  {full * 1000:8.1f} ms")
+        print(f"  cache, first open    {cold * 1000:8.1f} ms")
+        print(f"  cache, later opens   {warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
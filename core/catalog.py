@@ -0,0 +1,229 @@
+# core/catalog.py
+"""
+Project catalog: ROOT_DIR/catalog.yaml lists every project (name, tag,
+creator, creation time, shot count, last render activity) so projects can be
+listed and searched without opening each one's metadata.
+
+SceneProject records a project when it is created or opened. A catalog goes
+stale when projects are added or removed behind its back (copied onto the
+share, deleted by hand) or simply ages; it then rebuilds itself from a scan of
+ROOT_DIR, re-reading only the metadata of projects whose files changed.
+
+    python -m core.catalog list
+    python -m core.catalog search sh
+    python -m core.catalog rebuild
+"""
+import os
+import time
+import difflib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from core.storage import (read_yaml, atomic_write_yaml, load_metadata, uses_database, FileLock,
+                          METADATA_FILE, RENDERS_FILE, DB_FILE)
+
+CATALOG_FILE = "catalog.yaml"
+CATALOG_MAX_AGE = 300  # seconds before entries are re-checked against the projects' files
+SCAN_WORKERS = 8  # metadata reads in parallel; on a network share most of the time is latency
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _metadata_stamp(config_dir) -> list:
+    """(mtime_ns, size) of the files holding a project's metadata; changes whenever it is rewritten."""
+    names = [DB_FILE, f"{DB_FILE}-wal"] if uses_database(config_dir) else [METADATA_FILE]
+    return [list(_stat(os.path.join(config_dir, name)) or ()) for name in names]
+
+
+def _last_render(config_dir):
+    """When render versions or frames were last recorded, from the render files' mtimes (None if never)."""
+    if uses_database(config_dir):
+        names = [DB_FILE, f"{DB_FILE}-wal"]  # also touched by metadata edits, so only approximate
+    else:
+        names = [RENDERS_FILE, "renders.journal", os.path.join("renders", "index.yaml")]
+    latest = max((s[0] for s in map(_stat, (os.path.join(config_dir, n) for n in names)) if s), default=None)
+    return datetime.fromtimestamp(latest / 1e9).isoformat(timespec="seconds") if latest else None
+
+
+def make_entry(metadata, project_dir) -> dict:
+    config_dir = os.path.join(project_dir, "Config")
+    name = metadata.get("project_name") or os.path.basename(os.path.normpath(project_dir))
+    return {
+        "name": name,
+        "tag": metadata.get("project_tag", f"@{name}"),
+        "project_dir": project_dir,
+        "created_by": metadata.get("created_by"),
+        "created_at": metadata.get("created_at"),
+        "shot_count": len(metadata.get("shots") or []),
+        "last_render": _last_render(config_dir),
+        "stamp": _metadata_stamp(config_dir),
+    }
+
+
+class ProjectCatalog:
+    """
+    The catalog of one ROOT_DIR. Writes hold catalog.yaml.lock and re-read the
+    file first, so several artists creating projects on the same share do not
+    drop each other's entries.
+    """
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.path = os.path.join(root_dir, CATALOG_FILE)
+        self._file_lock = FileLock(f"{self.path}.lock")
+
+    def _read(self) -> dict:
+        data = read_yaml(self.path) if os.path.exists(self.path) else None
+        return data or {"scanned_at": None, "projects": {}}
+
+    def _write(self, data):
+        atomic_write_yaml(self.path, data, sort_keys=True)
+
+    # --- Staleness ---
+    def _project_dirs(self) -> set:
+        try:
+            names = os.listdir(self.root_dir)
+        except FileNotFoundError:
+            return set()
+        return {n for n in names if os.path.isdir(os.path.join(self.root_dir, n, "Config"))}
+
+    def is_stale(self, data=None) -> bool:
+        """True if projects were added or removed since the last scan, or the scan is older than CATALOG_MAX_AGE."""
+        data = data if data is not None else self._read()
+        if not data.get("scanned_at") or time.time() - data["scanned_at"] > CATALOG_MAX_AGE:
+            return True
+        known = {os.path.basename(os.path.normpath(e["project_dir"])) for e in data["projects"].values()}
+        return known != self._project_dirs()
+
+    # --- Updates ---
+    def record(self, metadata, project_dir):
+        """Add or update one project, e.g. after it was created or opened. Writes only if the entry changed."""
+        entry = make_entry(metadata, project_dir)
+        with self._file_lock:
+            data = self._read()
+            if data["projects"].get(entry["name"]) == entry:
+                return entry
+            data["projects"][entry["name"]] = entry
+            self._write(data)
+        return entry
+
+    def remove(self, name):
+        with self._file_lock:
+            data = self._read()
+            if data["projects"].pop(name, None) is not None:
+                self._write(data)
+
+    def rebuild(self) -> dict:
+        """
+        Scan ROOT_DIR. Entries whose metadata files are unchanged are kept (only
+        their last-render time is refreshed); the rest are read in parallel.
+        """
+        with self._file_lock:
+            old = {os.path.normpath(e["project_dir"]): e for e in self._read()["projects"].values()}
+            entries, to_read = [], []
+            for name in sorted(self._project_dirs()):
+                project_dir = os.path.join(self.root_dir, name)
+                config_dir = os.path.join(project_dir, "Config")
+                entry = old.get(os.path.normpath(project_dir))
+                if entry and entry.get("stamp") == _metadata_stamp(config_dir):
+                    entries.append({**entry, "last_render": _last_render(config_dir)})
+                else:
+                    to_read.append(project_dir)
+
+            def read(project_dir):
+                try:
+                    return make_entry(load_metadata(os.path.join(project_dir, "Config")), project_dir)
+                except Exception as e:  # one unreadable project must not hide the others
+                    print(f"[Catalog] Skipping {project_dir}: {e}")
+                    return None
+
+            with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+                entries.extend(e for e in pool.map(read, to_read) if e)
+
+            data = {"scanned_at": time.time(), "projects": {e["name"]: e for e in entries}}
+            self._write(data)
+        return data
+
+    # --- Queries ---
+    def projects(self, refresh=True) -> list:
+        """
+        All catalog entries by name, rebuilding first if the catalog is stale.
+        refresh=False returns what catalog.yaml holds without scanning ROOT_DIR
+        (e.g. for suggestions while typing).
+        """
+        data = self._read()
+        if refresh and self.is_stale(data):
+            data = self.rebuild()
+        return [data["projects"][name] for name in sorted(data["projects"])]
+
+    def get(self, tag):
+        """Entry for a project tag ("@Name") or name, or None."""
+        name = tag.lstrip("@")
+        for entry in self.projects():
+            if entry["name"] == name:
+                return entry
+        return None
+
+    def search(self, query, limit=None, refresh=True) -> list:
+        """
+        Entries matching query, best first: name prefix, then substring, then
+        the query's letters in order ("shw" finds "ShowReel"), then names
+        difflib finds close (typos). Case-insensitive; a leading "@" is ignored.
+        refresh is passed to projects().
+        """
+        query = query.strip().lstrip("@").lower()
+        ranked = []
+        for entry in self.projects(refresh):
+            name = entry["name"].lower()
+            if name.startswith(query):
+                rank = 0
+            elif query in name:
+                rank = 1
+            elif _is_subsequence(query, name):
+                rank = 2
+            elif difflib.SequenceMatcher(None, query, name).ratio() >= 0.6:
+                rank = 3
+            else:
+                continue
+            ranked.append((rank, name, entry))
+        ranked.sort(key=lambda r: r[:2])
+        return [entry for _, _, entry in ranked[:limit]]
+
+
+def _is_subsequence(query, text) -> bool:
+    chars = iter(text)
+    return all(c in chars for c in query)
+
+
+def cli():
+    from core.project import ROOT_DIR
+
+    p = argparse.ArgumentParser(description="Project catalog")
+    p.add_argument("--root", default=ROOT_DIR, help=f"Projects root (default: {ROOT_DIR})")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    s = sub.add_parser("search")
+    s.add_argument("query")
+    sub.add_parser("rebuild")
+    args = p.parse_args()
+
+    catalog = ProjectCatalog(args.root)
+    if args.cmd == "rebuild":
+        entries = list(catalog.rebuild()["projects"].values())
+    elif args.cmd == "search":
+        entries = catalog.search(args.query)
+    else:
+        entries = catalog.projects()
+    for e in entries:
+        print(f"{e['tag']:24} {e['shot_count']:>5} shots  created {e['created_at'] or '-':19.19}  "
+              f"last render {e['last_render'] or '-':19}  {e['created_by'] or ''}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,80 @@
+# core/events.py
+"""
+In-process change notifications for a project.
+
+ProjectConfig emits shot events and RenderManager render events on the bus
+of the project's Config directory, after the change is persisted:
+
+    bus = bus_for(config_dir)
+    unsubscribe = bus.subscribe(on_event, kinds={SHOT_ADDED, SHOT_REMOVED})
+
+Callbacks run synchronously on the emitting thread (frame completions come
+from render threads); Qt widgets subscribe through ui.workers.EventRelay,
+which re-delivers events on the GUI thread.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+SHOT_ADDED = "shot_added"
+SHOT_UPDATED = "shot_updated"  # frame range changed
+SHOT_RENAMED = "shot_renamed"
+SHOT_REMOVED = "shot_removed"
+RSV_CREATED = "rsv_created"
+FRAME_COMPLETED = "frame_completed"
+SHOT_EVENTS = frozenset({SHOT_ADDED, SHOT_UPDATED, SHOT_RENAMED, SHOT_REMOVED})
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectEvent:
+    kind: str
+    shot: Optional[str] = None
+    old_shot: Optional[str] = None  # SHOT_RENAMED
+    frame_range: Optional[Tuple[int, int]] = None
+    index: Optional[int] = None  # position of the shot in the shot list, for SHOT_ADDED
+    rsv: Optional[str] = None
+    frame: Optional[int] = None
+    origin: object = field(default=None, compare=False, repr=False)  # the object that made the change
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, kinds=None):
+        """Call callback(event) for every event, or only those whose kind is in kinds. Returns an unsubscribe function."""
+        entry = (callback, frozenset(kinds) if kinds else None)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def emit(self, event: ProjectEvent):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, kinds in subscribers:
+            if kinds is not None and event.kind not in kinds:
+                continue
+            try:
+                callback(event)
+            except Exception as e:  # one broken listener must not stop the others or the change itself
+                print(f"[Events] {event.kind} listener failed: {e}")
+
+
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def bus_for(config_dir) -> EventBus:
+    """The process-wide bus of a project, keyed by its Config directory."""
+    key = os.path.abspath(os.fspath(config_dir))
+    with _buses_lock:
+        if key not in _buses:
+            _buses[key] = EventBus()
+        return _buses[key]
@@ -0,0 +1,316 @@
+# core/exr.py
+"""
+OpenEXR decoding into NumPy, for viewing renders in the gallery.
+
+read_exr() reads single-part scanline and tiled files stored uncompressed
+or with RLE, ZIPS or ZIP compression (what Arnold and Karma write unless
+told otherwise) straight into half or float arrays. It reads only what is
+asked for: a subset of channels, a mip level of a tiled file, and every
+step-th row and column; rows outside the wanted ones are not decompressed
+where the file's blocks allow it, so a preview of a large plate never
+holds the full-resolution image.
+
+Other compressions (PIZ, PXR24, B44, DWA), deep and multi-part files go
+through OpenImageIO when it is installed, and raise ValueError otherwise.
+"""
+import math
+import zlib
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import OpenImageIO as oiio
+except ImportError:  # optional: only needed for the compressions decoded below
+    oiio = None
+
+MAGIC = b"\x76\x2f\x31\x01"
+TILED_FLAG = 0x200
+DEEP_FLAG = 0x800
+MULTIPART_FLAG = 0x1000
+
+COMPRESSIONS = ["NONE", "RLE", "ZIPS", "ZIP", "PIZ", "PXR24", "B44", "B44A", "DWAA", "DWAB"]
+LINES_PER_BLOCK = {"NONE": 1, "RLE": 1, "ZIPS": 1, "ZIP": 16, "PIZ": 32, "PXR24": 16,
+                   "B44": 32, "B44A": 32, "DWAA": 32, "DWAB": 256}
+NATIVE_COMPRESSIONS = {"NONE", "RLE", "ZIPS", "ZIP"}
+PIXEL_TYPES = {0: np.dtype("<u4"), 1: np.dtype("<f2"), 2: np.dtype("<f4")}  # UINT, HALF, FLOAT
+ONE_LEVEL, MIPMAP_LEVELS, RIPMAP_LEVELS = 0, 1, 2
+
+
+@dataclass(slots=True)
+class Channel:
+    name: str
+    dtype: np.dtype
+    x_sampling: int = 1
+    y_sampling: int = 1
+
+
+@dataclass(slots=True)
+class ExrHeader:
+    channels: List[Channel]  # in file order (sorted by name)
+    compression: str
+    data_window: Tuple[int, int, int, int]  # xmin, ymin, xmax, ymax
+    tiles: Optional[Tuple[int, int, int, int]] = None  # x size, y size, level mode, rounding mode
+    deep: bool = False
+    multipart: bool = False
+    offsets_at: int = 0  # file position of the chunk offset table
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        xmin, ymin, xmax, ymax = self.data_window
+        return xmax - xmin + 1, ymax - ymin + 1
+
+    @property
+    def channel_names(self) -> List[str]:
+        return [c.name for c in self.channels]
+
+    @property
+    def native(self) -> bool:
+        """True if read_exr decodes it without OpenImageIO."""
+        return (self.compression in NATIVE_COMPRESSIONS and not self.deep and not self.multipart
+                and (self.tiles is None or self.tiles[2] != RIPMAP_LEVELS)
+                and all(c.x_sampling == c.y_sampling == 1 for c in self.channels))
+
+    def level_count(self) -> int:
+        if self.tiles is None or self.tiles[2] == ONE_LEVEL:
+            return 1
+        rounding = math.ceil if self.tiles[3] else math.floor
+        return int(rounding(math.log2(max(self.size)))) + 1
+
+    def level_size(self, level) -> Tuple[int, int]:
+        rounding = math.ceil if self.tiles and self.tiles[3] else math.floor
+        return tuple(max(1, int(rounding(n / 2 ** level))) for n in self.size)
+
+
+def is_exr(path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == MAGIC
+    except OSError:
+        return False
+
+
+def _cstring(f) -> str:
+    chars = bytearray()
+    while True:
+        c = f.read(1)
+        if not c:
+            raise ValueError("Truncated EXR header.")
+        if c == b"\0":
+            return chars.decode()
+        chars += c
+
+
+def _parse_channels(data) -> List[Channel]:
+    channels, pos = [], 0
+    while data[pos] != 0:
+        end = data.index(b"\0", pos)
+        name = data[pos:end].decode()
+        pixel_type, _, x_sampling, y_sampling = struct.unpack_from("<iB3xii", data, end + 1)
+        channels.append(Channel(name, PIXEL_TYPES[pixel_type], x_sampling, y_sampling))
+        pos = end + 1 + 16
+    return channels
+
+
+def _read_header(f) -> ExrHeader:
+    if f.read(4) != MAGIC:
+        raise ValueError("Not an OpenEXR file.")
+    (version,) = struct.unpack("<i", f.read(4))
+    attributes = {}
+    while True:
+        name = _cstring(f)
+        if not name:
+            break
+        _cstring(f)  # attribute type
+        (size,) = struct.unpack("<i", f.read(4))
+        attributes[name] = f.read(size)
+    if "channels" not in attributes or "dataWindow" not in attributes:
+        raise ValueError("EXR header has no channels or dataWindow.")
+    tiles = None
+    if "tiles" in attributes:
+        x_size, y_size, mode = struct.unpack("<IIB", attributes["tiles"])
+        tiles = (x_size, y_size, mode & 0x0F, (mode >> 4) & 0x0F)
+    return ExrHeader(
+        channels=_parse_channels(attributes["channels"]),
+        compression=COMPRESSIONS[attributes.get("compression", b"\0")[0]],
+        data_window=struct.unpack("<4i", attributes["dataWindow"]),
+        tiles=tiles if version & TILED_FLAG else None,
+        deep=bool(version & DEEP_FLAG),
+        multipart=bool(version & MULTIPART_FLAG),
+        offsets_at=f.tell(),
+    )
+
+
+def read_header(path) -> ExrHeader:
+    with open(path, "rb") as f:
+        return _read_header(f)
+
+
+def default_channels(names) -> List[str]:
+    """The channels to show: R, G, B and A where present, else Y, else the first three."""
+    rgba = [c for c in ("R", "G", "B", "A") if c in names]
+    if len(rgba) >= 3:
+        return rgba
+    if "Y" in names:
+        return ["Y"] + (["A"] if "A" in names else [])
+    return list(names[:3])
+
+
+# --- Decompression ---
+
+def _undo_zip_filters(data) -> bytes:
+    """Reverse the byte predictor and the two-half interleave that ZIP, ZIPS and RLE apply before compressing."""
+    t = np.frombuffer(data, np.uint8).copy()
+    t[1:] -= 128  # wraps: the predictor stores differences offset by 128
+    t = np.cumsum(t, dtype=np.uint8)
+    out = np.empty_like(t)
+    half = (len(t) + 1) // 2
+    out[0::2] = t[:half]
+    out[1::2] = t[half:]
+    return out.tobytes()
+
+
+def _rle_decode(data) -> bytes:
+    out, pos = bytearray(), 0
+    while pos < len(data):
+        count = struct.unpack_from("b", data, pos)[0]
+        pos += 1
+        if count < 0:
+            out += data[pos:pos - count]
+            pos -= count
+        else:
+            out += data[pos:pos + 1] * (count + 1)
+            pos += 1
+    return bytes(out)
+
+
+def _uncompress(compression, data, expected) -> bytes:
+    if len(data) == expected:
+        return data  # stored as is: compressing did not make the block smaller
+    if compression in ("ZIP", "ZIPS"):
+        return _undo_zip_filters(zlib.decompress(data))
+    if compression == "RLE":
+        return _undo_zip_filters(_rle_decode(data))
+    raise ValueError(f"Unexpected {compression} block.")
+
+
+def _channel_rows(raw, lines, width, channels, wanted, rows):
+    """{name: (len(rows), width) array} for the wanted channels of a decompressed block."""
+    line_bytes = width * sum(c.dtype.itemsize for c in channels)
+    block = np.frombuffer(raw, np.uint8).reshape(lines, line_bytes)[rows]
+    result, offset = {}, 0
+    for c in channels:
+        nbytes = width * c.dtype.itemsize
+        if c.name in wanted:
+            result[c.name] = np.ascontiguousarray(block[:, offset:offset + nbytes]).view(c.dtype)
+        offset += nbytes
+    return result
+
+
+# --- Reading ---
+
+def read_exr(path, channels=None, level=0, step=1) -> np.ndarray:
+    """
+    H x W x len(channels) array of an EXR image: float16 if every channel read
+    is half, else float32. channels defaults to default_channels(); level picks
+    a mip level of a tiled file (files without levels are subsampled by
+    2**level instead); step keeps every step-th row and column on top.
+    """
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        names = channels or default_channels(header.channel_names)
+        missing = [n for n in names if n not in header.channel_names]
+        if missing:
+            raise ValueError(f"{path}: no channel(s) {', '.join(missing)}.")
+        if not header.native:
+            return _read_with_oiio(path, header, names, level, step)
+        if header.tiles is not None and header.tiles[2] == MIPMAP_LEVELS:
+            top = header.level_count() - 1
+            if level > top:  # smaller than the last level: subsample that
+                step, level = step * 2 ** (level - top), top
+        else:
+            step, level = step * 2 ** level, 0
+        by_name = {c.name: c for c in header.channels}
+        dtype = np.float16 if all(by_name[n].dtype == np.float16 for n in names) else np.float32
+
+        if header.tiles is None:
+            planes = _read_scanlines(f, header, set(names), step)
+        else:
+            planes = _read_tiles(f, header, set(names), level, step)
+    return np.stack([planes[n].astype(dtype, copy=False) for n in names], axis=-1)
+
+
+def _read_offsets(f, header, count):
+    f.seek(header.offsets_at)
+    return np.frombuffer(f.read(8 * count), "<u8")
+
+
+def _read_scanlines(f, header, wanted, step):
+    xmin, ymin, xmax, ymax = header.data_window
+    width, height = header.size
+    per_block = LINES_PER_BLOCK[header.compression]
+    offsets = _read_offsets(f, header, math.ceil(height / per_block))
+    line_bytes = width * sum(c.dtype.itemsize for c in header.channels)
+
+    out_rows = range(0, height, step)
+    planes = {c.name: np.empty((len(out_rows), len(range(0, width, step))), c.dtype)
+              for c in header.channels if c.name in wanted}
+    for block in sorted({row // per_block for row in out_rows}):  # blocks holding no wanted row are skipped
+        f.seek(int(offsets[block]))
+        y, size = struct.unpack("<ii", f.read(8))
+        first = y - ymin
+        lines = min(per_block, height - first)
+        raw = _uncompress(header.compression, f.read(size), lines * line_bytes)
+        rows = np.arange(-(-first // step) * step, first + lines, step)  # wanted rows in this block
+        values = _channel_rows(raw, lines, width, header.channels, wanted, rows - first)
+        for name, plane in values.items():
+            planes[name][rows // step] = plane[:, ::step]
+    return planes
+
+
+def _read_tiles(f, header, wanted, level, step):
+    tile_w, tile_h = header.tiles[:2]
+    sizes = [header.level_size(l) for l in range(header.level_count())]
+    counts = [math.ceil(w / tile_w) * math.ceil(h / tile_h) for w, h in sizes]
+    offsets = _read_offsets(f, header, sum(counts))
+    first_tile = sum(counts[:level])
+    width, height = sizes[level]
+    tiles_x = math.ceil(width / tile_w)
+
+    out_rows = range(0, height, step)
+    planes = {c.name: np.empty((len(out_rows), len(range(0, width, step))), c.dtype)
+              for c in header.channels if c.name in wanted}
+    pixel_bytes = sum(c.dtype.itemsize for c in header.channels)
+    for ty in sorted({row // tile_h for row in out_rows}):
+        for tx in range(tiles_x):
+            f.seek(int(offsets[first_tile + ty * tiles_x + tx]))
+            _, _, _, _, size = struct.unpack("<5i", f.read(20))
+            x0, y0 = tx * tile_w, ty * tile_h
+            w, h = min(tile_w, width - x0), min(tile_h, height - y0)
+            raw = _uncompress(header.compression, f.read(size), w * h * pixel_bytes)
+            rows = np.arange(-(-y0 // step) * step, y0 + h, step)
+            cols = np.arange(-(-x0 // step) * step, x0 + w, step)
+            values = _channel_rows(raw, h, w, header.channels, wanted, rows - y0)
+            for name, plane in values.items():
+                planes[name][np.ix_(rows // step, cols // step)] = plane[:, cols - x0]
+    return planes
+
+
+def _read_with_oiio(path, header, names, level, step):
+    if oiio is None:
+        kind = "deep" if header.deep else "multi-part" if header.multipart else header.compression
+        raise ValueError(f"{path}: {kind} EXR files need OpenImageIO.")
+    inp = oiio.ImageInput.open(str(path))
+    if inp is None:
+        raise ValueError(f"{path}: {oiio.geterror()}")
+    try:
+        if level and not inp.seek_subimage(0, level):  # no such mip level: subsample instead
+            step, level = step * 2 ** level, 0
+        spec = inp.spec()
+        pixels = inp.read_image(0, level, 0, spec.nchannels, "float")
+        order = [list(spec.channelnames).index(n) for n in names]
+    finally:
+        inp.close()
+    return np.ascontiguousarray(pixels[::step, ::step, order])
@@ -0,0 +1,358 @@
+# core/farm.py
+"""
+Multi-node render farm: a coordinator that leases tasks over TCP and the
+workers that render them.
+
+The coordinator splits a render version's frames into tasks and leases them to
+worker processes. Workers heartbeat while rendering; a lease that is not
+renewed within lease_seconds, or whose worker disconnects, goes back in the
+queue. Finished frames are recorded in the project's RenderManager.
+
+Messages are JSON lines; every request gets exactly one reply:
+
+    worker → {"type": "hello", "worker": "host-1234", "token": "..."}
+                                                             ← {"type": "welcome", "heartbeat": 10.0}
+    worker → {"type": "lease"}                               ← {"type": "task", "task": {...}}
+                                                               | {"type": "idle"} | {"type": "shutdown"}
+    worker → {"type": "heartbeat", "task": "t0003"}          ← {"type": "ok"} | {"type": "lost"}
+    worker → {"type": "result", "task": "t0003", "done": [..], "failed": [..], "error": null}
+                                                             ← {"type": "ok"}
+
+A connection has to say hello first; when the coordinator has a token (from
+FARM_TOKEN_ENV) the hello must carry the same one. The coordinator listens on
+localhost unless given a --host, so set a token before opening it to the
+network. A worker whose heartbeat is answered with "lost" (the lease expired
+and the task was handed out again), or cannot reach the coordinator at all,
+aborts the task.
+
+Output paths come from the render version's settings, so the project has to
+live on storage every worker can reach (ROOT_DIR as a shared path).
+"""
+import os
+import hmac
+import json
+import time
+import socket
+import argparse
+import itertools
+import threading
+import socketserver
+from collections import deque
+
+from core.rendering import RenderSettings, Renderer, RenderManager, MAYAPY, HYTHON
+from core.storage import load_metadata
+from core.telemetry import TelemetryStore
+
+DEFAULT_PORT = 7345
+LEASE_SECONDS = 30.0
+TASK_SIZE = 10
+MAX_ATTEMPTS = 3  # times a frame is handed out before it is reported as failed
+IDLE_POLL_SECONDS = 0.5
+FARM_TOKEN_ENV = "FARM_TOKEN"  # shared secret workers must present in their hello
+
+
+class FarmCoordinator:
+    def __init__(self, project_dir, rsv, frames, task_size=TASK_SIZE, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, host="127.0.0.1", port=DEFAULT_PORT, token=None):
+        self.project_dir = str(project_dir)
+        self.token = token
+        self.rsv = rsv
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.manager = RenderManager(os.path.join(self.project_dir, "Config", "renders.yaml"))
+        self.metadata = load_metadata(os.path.join(self.project_dir, "Config"))
+        self.settings = self.manager.get_render_info(rsv)["settings"]
+
+        self.tasks = {}  # task id → {"frames": [...], "attempts": n}
+        self.failed = {}  # frame → last error
+        self._pending = deque()
+        self._leases = {}  # task id → (worker, expiry)
+        self._workers = set()
+        self._task_ids = itertools.count(1)
+        self._cond = threading.Condition()
+
+        frames = list(frames)
+        for i in range(0, len(frames), task_size):
+            self._add_task(frames[i:i + task_size])
+
+        self._server = _FarmServer((host, port), _FarmHandler)
+        self._server.coordinator = self
+        self._stopping = threading.Event()
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    # --- Lifecycle ---
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._reap_expired, daemon=True).start()
+        return self
+
+    def wait(self, timeout=None) -> bool:
+        """Block until every task has finished (or failed for good); False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self.tasks, timeout)
+
+    def stop(self):
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def status(self) -> dict:
+        """Snapshot of farm state for the UI/CLI."""
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "leased": {task: worker for task, (worker, _) in self._leases.items()},
+                "remaining_tasks": len(self.tasks),
+                "failed_frames": sorted(self.failed),
+                "workers": sorted(self._workers),
+            }
+
+    # --- Requests from workers ---
+    def handle(self, worker, msg) -> dict:
+        kind = msg.get("type")
+        if kind == "hello":
+            if self.token and not hmac.compare_digest(str(msg.get("token") or ""), self.token):
+                return {"type": "error", "error": "Wrong farm token"}
+            with self._cond:
+                self._workers.add(worker)
+            return {"type": "welcome", "heartbeat": self.lease_seconds / 3}
+        if kind == "lease":
+            return self._lease(worker)
+        if kind == "heartbeat":
+            return self._heartbeat(worker, msg["task"])
+        if kind == "result":
+            self._complete(worker, msg["task"], msg.get("done", []), msg.get("failed", []), msg.get("error"))
+            return {"type": "ok"}
+        return {"type": "error", "error": f"Unknown message type {kind!r}"}
+
+    def worker_lost(self, worker):
+        """Connection closed: everything the worker held goes back in the queue."""
+        with self._cond:
+            self._workers.discard(worker)
+            for task_id, (holder, _) in list(self._leases.items()):
+                if holder == worker:
+                    self._requeue(task_id)
+
+    # --- Internals ---
+    def _add_task(self, frames, attempts=0):
+        task_id = f"t{next(self._task_ids):04d}"
+        self.tasks[task_id] = {"frames": list(frames), "attempts": attempts}
+        self._pending.append(task_id)
+
+    def _lease(self, worker):
+        with self._cond:
+            if not self.tasks or self._stopping.is_set():
+                return {"type": "shutdown"}
+            if not self._pending:
+                return {"type": "idle"}
+            task_id = self._pending.popleft()
+            task = self.tasks[task_id]
+            task["attempts"] += 1
+            self._leases[task_id] = (worker, time.monotonic() + self.lease_seconds)
+            return {"type": "task", "task": {
+                "id": task_id,
+                "rsv": self.rsv,
+                "frames": task["frames"],
+                "settings": self.settings,
+                "metadata": self.metadata,
+            }}
+
+    def _heartbeat(self, worker, task_id):
+        with self._cond:
+            lease = self._leases.get(task_id)
+            if lease is None or lease[0] != worker:
+                return {"type": "lost"}
+            self._leases[task_id] = (worker, time.monotonic() + self.lease_seconds)
+            return {"type": "ok"}
+
+    def _complete(self, worker, task_id, done, failed, error):
+        # Recorded before taking self._cond: update_frame does journal and file-lock I/O, which must not
+        # hold up heartbeats, leases and the reaper. Late results from an expired lease still count;
+        # update_frame is idempotent and RenderManager is thread-safe.
+        for frame in done:
+            self.manager.update_frame(self.rsv, frame)
+        with self._cond:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return
+            lease = self._leases.get(task_id)
+            if lease is not None and lease[0] != worker:
+                return  # re-leased to another worker, which will report it
+            self._leases.pop(task_id, None)
+            if task_id in self._pending:
+                self._pending.remove(task_id)
+            del self.tasks[task_id]
+
+            done = set(done)
+            missing = [f for f in task["frames"] if f not in done]
+            if missing:
+                if task["attempts"] < self.max_attempts:
+                    self._add_task(missing, task["attempts"])
+                else:
+                    for frame in missing:
+                        self.failed[frame] = error or "render failed"
+            self._cond.notify_all()
+
+    def _requeue(self, task_id):
+        self._leases.pop(task_id, None)
+        if task_id in self.tasks and task_id not in self._pending:
+            self._pending.appendleft(task_id)
+
+    def _reap_expired(self):
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            with self._cond:
+                for task_id, (_, expiry) in list(self._leases.items()):
+                    if expiry < now:
+                        self._requeue(task_id)
+            self._stopping.wait(min(1.0, self.lease_seconds / 4))
+
+
+class _FarmServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _FarmHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        worker = None
+        try:
+            for line in self.rfile:
+                msg = json.loads(line)
+                if msg.get("type") == "hello":
+                    name = msg.get("worker") or f"{self.client_address[0]}:{self.client_address[1]}"
+                    reply = coordinator.handle(name, msg)
+                    if reply["type"] == "welcome":
+                        worker = name
+                elif worker is None:
+                    reply = {"type": "error", "error": "Send hello first"}
+                else:
+                    reply = coordinator.handle(worker, msg)
+                self.wfile.write((json.dumps(reply) + "\n").encode())
+                if worker is None:
+                    return  # refused: drop the connection
+        except (OSError, ValueError):
+            pass
+        finally:
+            if worker is not None:
+                coordinator.worker_lost(worker)
+
+
+class FarmWorker:
+    """Leases tasks from a coordinator and renders them with the local DCCs."""
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, name=None, mayapy=MAYAPY, hython=HYTHON, token=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.mayapy = mayapy
+        self.hython = hython
+        self._lock = threading.Lock()
+
+    def run(self):
+        with socket.create_connection((self.host, self.port)) as sock:
+            self._reader = sock.makefile("r")
+            self._sock = sock
+            welcome = self._request({"type": "hello", "worker": self.name, "token": self.token})
+            if welcome["type"] != "welcome":
+                raise ConnectionError(welcome.get("error", "Coordinator refused the connection"))
+            self.heartbeat = welcome["heartbeat"]
+            while True:
+                reply = self._request({"type": "lease"})
+                if reply["type"] == "shutdown":
+                    return
+                if reply["type"] == "idle":
+                    time.sleep(IDLE_POLL_SECONDS)
+                    continue
+                self._run_task(reply["task"])
+
+    def _run_task(self, task):
+        stop = threading.Event()
+        beat = None
+        done, error = [], None
+        try:
+            project_dir = task["metadata"].get("project_dir")
+            renderer = Renderer(RenderSettings.from_dict(task["settings"]), metadata=task["metadata"],
+                                rsv=task["rsv"], hython=self.hython, mayapy=self.mayapy,
+                                telemetry=TelemetryStore(os.path.join(project_dir, "Config")) if project_dir else None)
+            beat = threading.Thread(target=self._heartbeat_loop, args=(task["id"], renderer, stop), daemon=True)
+            beat.start()
+            renderer.render_chunk(task["frames"], on_frame=lambda frame, path: done.append(frame))
+        except Exception as e:
+            error = str(e)
+            print(f"[FarmWorker] {self.name} task {task['id']} failed: {e}")
+        finally:
+            stop.set()
+            if beat is not None:
+                beat.join()
+        failed = [f for f in task["frames"] if f not in done]
+        self._request({"type": "result", "task": task["id"], "done": done, "failed": failed, "error": error})
+
+    def _heartbeat_loop(self, task_id, renderer, stop):
+        while not stop.wait(self.heartbeat):
+            try:
+                reply = self._request({"type": "heartbeat", "task": task_id})
+            except (OSError, ValueError) as e:
+                # Without a coordinator the lease lapses and the task is handed out again
+                print(f"[FarmWorker] {self.name} lost the coordinator during task {task_id} ({e}); aborting it")
+                renderer.abort()
+                return
+            if reply["type"] == "lost":
+                # Another worker has the task now; frames finished so far are still reported
+                print(f"[FarmWorker] {self.name} lost the lease on task {task_id}; aborting it")
+                renderer.abort()
+                return
+
+    def _request(self, msg) -> dict:
+        with self._lock:
+            self._sock.sendall((json.dumps(msg) + "\n").encode())
+            line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed the connection")
+        return json.loads(line)
+
+
+def cli():
+    p = argparse.ArgumentParser(description="Render farm")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    c = sub.add_parser("coordinator")
+    c.add_argument("--project-dir", required=True)
+    c.add_argument("--rsv", required=True)
+    c.add_argument("--start", type=int, required=True)
+    c.add_argument("--end", type=int, required=True)
+    c.add_argument("--task-size", type=int, default=TASK_SIZE)
+    c.add_argument("--lease", type=float, default=LEASE_SECONDS)
+    c.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to accept remote workers (set a token first)")
+    c.add_argument("--port", type=int, default=DEFAULT_PORT)
+    c.add_argument("--token", default=os.environ.get(FARM_TOKEN_ENV))
+
+    w = sub.add_parser("worker")
+    w.add_argument("--host", default="127.0.0.1")
+    w.add_argument("--port", type=int, default=DEFAULT_PORT)
+    w.add_argument("--name", default=None)
+    w.add_argument("--mayapy", default=MAYAPY)
+    w.add_argument("--hython", default=HYTHON)
+    w.add_argument("--token", default=os.environ.get(FARM_TOKEN_ENV))
+
+    args = p.parse_args()
+
+    if args.cmd == "coordinator":
+        coordinator = FarmCoordinator(args.project_dir, args.rsv, range(args.start, args.end + 1),
+                                      task_size=args.task_size, lease_seconds=args.lease,
+                                      host=args.host, port=args.port, token=args.token).start()
+        print(f"[Farm] Coordinating {args.rsv} on {coordinator.address[0]}:{coordinator.address[1]}")
+        coordinator.wait()
+        status = coordinator.status()
+        coordinator.stop()
+        print(f"[Farm] Finished {args.rsv}; failed frames: {status['failed_frames'] or 'none'}")
+    elif args.cmd == "worker":
+        FarmWorker(args.host, args.port, args.name, mayapy=args.mayapy, hython=args.hython, token=args.token).run()
+
+
+if __name__ == "__main__":
+    cli()
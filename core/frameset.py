@@ -0,0 +1,229 @@
+# core/frameset.py
+"""
+FrameSet: a set of frame numbers stored as sorted, disjoint inclusive ranges.
+
+A finished render of frames 1-5000 is one range rather than 5000 list
+entries, membership is a binary search, and set operations walk ranges
+instead of frames. The text form is what renders.yaml stores:
+
+    FrameSet("1-100,120-140x2,200")  # 1..100, every 2nd frame 120..140, 200
+    str(FrameSet([1, 2, 3, 7]))      # "1-3,7"
+
+FrameSet.from_value() also accepts the plain lists of ints older files hold.
+"""
+import re
+import bisect
+import heapq
+
+_TOKEN_RE = re.compile(r"^(-?\d+)(?:-(-?\d+)(?:x(\d+))?)?$")
+
+
+class FrameSet:
+    __slots__ = ("_starts", "_ends", "_len")
+
+    def __init__(self, frames=None):
+        self._starts = []
+        self._ends = []
+        self._len = 0
+        if frames is None:
+            return
+        if isinstance(frames, str):
+            for start, end, step in self._parse(frames):
+                if step == 1:
+                    self.add_range(start, end)
+                else:
+                    for frame in range(start, end + 1, step):
+                        self.add_range(frame, frame)
+        elif isinstance(frames, FrameSet):
+            self._starts, self._ends, self._len = list(frames._starts), list(frames._ends), frames._len
+        elif isinstance(frames, range) and frames.step == 1:
+            if frames:
+                self.add_range(frames.start, frames.stop - 1)
+        else:
+            self._set_ranges(self._runs(sorted(set(int(f) for f in frames))))
+
+    # --- Construction / serialization ---
+    @classmethod
+    def from_value(cls, value) -> "FrameSet":
+        """Build from anything renders.yaml may hold: None, a frame spec string or a list of ints."""
+        return cls(value) if value is not None else cls()
+
+    @classmethod
+    def from_range(cls, start, end) -> "FrameSet":
+        frames = cls()
+        if start <= end:
+            frames.add_range(start, end)
+        return frames
+
+    @staticmethod
+    def _parse(spec):
+        for token in spec.replace(" ", "").split(","):
+            if not token:
+                continue
+            match = _TOKEN_RE.match(token)
+            if not match:
+                raise ValueError(f"Invalid frame range '{token}' in '{spec}'")
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) is not None else start
+            step = int(match.group(3) or 1)
+            if end < start or step < 1:
+                raise ValueError(f"Invalid frame range '{token}' in '{spec}'")
+            yield start, end, step
+
+    @staticmethod
+    def _runs(frames):
+        """(start, end) runs of consecutive frames from sorted unique ints."""
+        runs = []
+        for frame in frames:
+            if runs and frame == runs[-1][1] + 1:
+                runs[-1][1] = frame
+            else:
+                runs.append([frame, frame])
+        return runs
+
+    def _set_ranges(self, ranges):
+        self._starts = [start for start, _ in ranges]
+        self._ends = [end for _, end in ranges]
+        self._len = sum(end - start + 1 for start, end in ranges)
+
+    def __str__(self):
+        """Compact spec: "a-b" for runs, "a-bxN" for three or more frames N apart."""
+        parts = []
+        i, n = 0, len(self._starts)
+        while i < n:
+            start, end = self._starts[i], self._ends[i]
+            if start != end:
+                parts.append(f"{start}-{end}")
+                i += 1
+                continue
+            # Collect isolated frames spaced evenly
+            j = i + 1
+            step = self._starts[j] - start if j < n else 0
+            while j < n and self._starts[j] == self._ends[j] and self._starts[j] - self._starts[j - 1] == step:
+                j += 1
+            if j - i >= 3:
+                parts.append(f"{start}-{self._starts[j - 1]}x{step}")
+                i = j
+            else:
+                parts.append(str(start))
+                i += 1
+        return ",".join(parts)
+
+    def __repr__(self):
+        return f"FrameSet('{self}')"
+
+    # --- Set protocol ---
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        for start, end in zip(self._starts, self._ends):
+            yield from range(start, end + 1)
+
+    def __contains__(self, frame):
+        i = bisect.bisect_right(self._starts, frame) - 1
+        return i >= 0 and frame <= self._ends[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, FrameSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def ranges(self) -> list:
+        """[(start, end), ...] inclusive, ascending."""
+        return list(zip(self._starts, self._ends))
+
+    # --- Mutation ---
+    def add(self, frame) -> bool:
+        """Add one frame; False if it was already present."""
+        if frame in self:
+            return False
+        self.add_range(frame, frame)
+        return True
+
+    def add_range(self, start, end):
+        """Add start..end inclusive, merging with overlapping or adjacent ranges."""
+        i = bisect.bisect_left(self._ends, start - 1)  # first range that can touch [start, end]
+        j = bisect.bisect_right(self._starts, end + 1)  # first range after it
+        if i < j:
+            removed = sum(self._ends[k] - self._starts[k] + 1 for k in range(i, j))
+            start, end = min(start, self._starts[i]), max(end, self._ends[j - 1])
+        else:
+            removed = 0
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+        self._len += end - start + 1 - removed
+
+    def discard_range(self, start, end):
+        """Remove start..end inclusive."""
+        i = bisect.bisect_left(self._ends, start)
+        j = bisect.bisect_right(self._starts, end)
+        if i >= j:
+            return
+        removed = sum(self._ends[k] - self._starts[k] + 1 for k in range(i, j))
+        starts, ends = [], []
+        if self._starts[i] < start:
+            starts.append(self._starts[i])
+            ends.append(start - 1)
+        if self._ends[j - 1] > end:
+            starts.append(end + 1)
+            ends.append(self._ends[j - 1])
+        kept = sum(e - s + 1 for s, e in zip(starts, ends))
+        self._starts[i:j] = starts
+        self._ends[i:j] = ends
+        self._len -= removed - kept
+
+    def discard(self, frame):
+        self.discard_range(frame, frame)
+
+    def update(self, other):
+        """In-place union."""
+        merged = self | FrameSet.from_value(other)
+        self._starts, self._ends, self._len = merged._starts, merged._ends, merged._len
+
+    # --- Set algebra ---
+    def union(self, other) -> "FrameSet":
+        other = other if isinstance(other, FrameSet) else FrameSet(other)
+        ranges = []
+        for start, end in heapq.merge(self.ranges(), other.ranges()):
+            if ranges and start <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        result = FrameSet()
+        result._set_ranges(ranges)
+        return result
+
+    def difference(self, other) -> "FrameSet":
+        other = other if isinstance(other, FrameSet) else FrameSet(other)
+        result = FrameSet(self)
+        for start, end in other.ranges():
+            result.discard_range(start, end)
+        return result
+
+    def intersection(self, other) -> "FrameSet":
+        other = other if isinstance(other, FrameSet) else FrameSet(other)
+        ranges, a, b = [], self.ranges(), other.ranges()
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+            if start <= end:
+                ranges.append([start, end])
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        result = FrameSet()
+        result._set_ranges(ranges)
+        return result
+
+    __or__ = union
+    __sub__ = difference
+    __and__ = intersection
+
+    def missing(self, start, end) -> "FrameSet":
+        """Frames of start..end that are not in the set."""
+        return FrameSet.from_range(start, end) - self
@@ -0,0 +1,192 @@
+# core/imagecache.py
+"""
+Decoded render frames kept in memory, and the display views computed from them.
+
+DecodedImageCache holds frames as read-only NumPy arrays (H x W x channels),
+least recently used first out once their total size passes
+IMAGE_CACHE_BYTES, so switching the gallery between channels or exposures
+never goes back to disk. Entries are keyed by path, mtime, size and the
+pixel step they were decoded at (a preview keeps every Nth pixel, so a
+large plate never sits in memory at full resolution); a re-rendered frame
+is decoded again. EXR files decode to half/float arrays through core.exr,
+everything else to uint8 through PIL.
+
+display_view() turns a cached frame into an 8-bit image to show: all of
+RGB, one channel, luminance or alpha, with an exposure offset in stops.
+Float (scene-linear) frames also get a view transform, sRGB by default or a
+plain gamma. Everything is array slicing and vectorized arithmetic over the
+whole frame (half floats through a 65536-entry lookup table); the result is
+C-contiguous so the UI can wrap it in a QImage without copying.
+"""
+import os
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from core import exr
+
+IMAGE_CACHE_BYTES = 1024 * 1024 * 1024
+VIEW_CHANNELS = ("R", "G", "B", "A", "L")  # "L": luminance
+LUMA_WEIGHTS = (0.2126, 0.7152, 0.0722)  # Rec. 709
+VIEW_TRANSFORMS = ("sRGB", "gamma", "linear")  # for float frames
+
+
+def decode_image(path, step=1) -> np.ndarray:
+    """
+    Frame as an H x W x 3 (or 4 with alpha) array, every step-th pixel:
+    uint8 for 8-bit formats, float16/float32 for EXR. EXR previews read a mip
+    level where the file has them and only the rows they need; either way the
+    result is subsampled by step overall (to within a pixel of [::step, ::step]).
+    """
+    if exr.is_exr(path):
+        level = (step & -step).bit_length() - 1  # step = 2**level * odd: the mip level then every odd-th pixel
+        pixels = exr.read_exr(path, level=level, step=step >> level)
+        if pixels.shape[2] < 3:  # Y or YA: grey
+            pixels = np.concatenate([np.repeat(pixels[..., :1], 3, axis=2), pixels[..., 1:]], axis=2)
+        return pixels
+    with Image.open(path) as im:
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        pixels = np.asarray(im.convert("RGBA" if has_alpha else "RGB"))
+    return np.ascontiguousarray(pixels[::step, ::step]) if step > 1 else pixels
+
+
+def image_size(path):
+    """(width, height) from the file's header, without decoding it."""
+    if exr.is_exr(path):
+        return exr.read_header(path).size
+    with Image.open(path) as im:
+        return im.size
+
+
+class DecodedImageCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = IMAGE_CACHE_BYTES if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> array, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path, step=1):
+        st = os.stat(path)
+        return os.path.abspath(path), st.st_mtime_ns, st.st_size, step
+
+    def get(self, path, step=1, decode=None) -> np.ndarray:
+        """
+        The decoded frame (read-only) at every step-th pixel, from memory when
+        possible; decode(path, step) reads it otherwise (decode_image by
+        default). Safe to call from several threads.
+        """
+        key = self.key(path, step)
+        with self._lock:
+            pixels = self._entries.get(key)
+            if pixels is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pixels
+        pixels = (decode or decode_image)(path, step)  # outside the lock: other frames stay available meanwhile
+        pixels.flags.writeable = False  # shared by every view
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = pixels
+                self._bytes += pixels.nbytes
+                self._evict()
+            return self._entries[key]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, pixels = self._entries.popitem(last=False)
+            self._bytes -= pixels.nbytes
+
+    def __contains__(self, path):
+        try:
+            key = self.key(path)  # full resolution
+        except OSError:
+            return False
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+IMAGE_CACHE = DecodedImageCache()  # process-wide, shared by every gallery
+
+
+def display_view(pixels, channel=None, exposure=0.0, step=1, transform="sRGB", gamma=2.2) -> np.ndarray:
+    """
+    8-bit, C-contiguous view of a decoded frame: H x W x 3 for RGB (channel
+    None), H x W for one of VIEW_CHANNELS. exposure scales by 2**exposure;
+    step > 1 keeps every step-th pixel in both directions. Float frames are
+    taken as scene-linear and encoded with transform (one of VIEW_TRANSFORMS;
+    "gamma" uses 1/gamma); 8-bit frames are already display-referred.
+    """
+    if step > 1:
+        pixels = pixels[::step, ::step]
+    floating = pixels.dtype != np.uint8
+    if channel == "A":
+        if pixels.shape[2] < 4:
+            return np.full(pixels.shape[:2], 255, np.uint8)  # opaque
+        alpha = pixels[..., 3]  # alpha is not exposed or transformed
+        return np.ascontiguousarray(_encode(alpha, 1.0, "linear", 1.0) if floating else alpha)
+
+    if channel is None:
+        view = pixels[..., :3]
+    elif channel == "L":
+        view = pixels[..., :3].astype(np.float32, copy=False) @ np.asarray(LUMA_WEIGHTS, np.float32)
+    else:
+        view = pixels[..., "RGB".index(channel)]
+
+    gain = 2.0 ** exposure
+    if floating:
+        if view.dtype == np.float16:
+            return _display_lut(gain, transform, gamma)[view.view(np.uint16)]
+        return _encode(view, gain, transform, gamma)
+    if gain != 1.0:
+        view = view * np.float32(gain)
+    return np.ascontiguousarray(_to_uint8(view))
+
+
+def _to_uint8(values) -> np.ndarray:
+    if values.dtype == np.uint8:
+        return values
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+
+def _encode(linear, gain, transform, gamma) -> np.ndarray:
+    """Scene-linear values to 8-bit display values."""
+    with np.errstate(invalid="ignore"):  # NaN pixels (and LUT entries) go to black below
+        v = np.nan_to_num(np.asarray(linear, np.float32) * np.float32(gain), nan=0.0, posinf=1.0, neginf=0.0)
+    np.clip(v, 0.0, 1.0, out=v)
+    if transform == "sRGB":
+        v = np.where(v <= 0.0031308, v * 12.92, 1.055 * np.power(v, 1 / 2.4) - 0.055)
+    elif transform == "gamma":
+        v = np.power(v, 1 / gamma)
+    elif transform != "linear":
+        raise ValueError(f"Unknown view transform {transform!r}; expected one of {VIEW_TRANSFORMS}.")
+    return (v * 255 + 0.5).astype(np.uint8)
+
+
+@lru_cache(maxsize=32)
+def _display_lut(gain, transform, gamma) -> np.ndarray:
+    """_encode of every half-float bit pattern, indexed by the value's uint16 bits."""
+    return _encode(np.arange(65536, dtype=np.uint16).view(np.float16), gain, transform, gamma)
+
+
+def preview_step(shape, size) -> int:
+    """Largest pixel step that keeps a frame of shape (H, W, ...) at least size (W, H)."""
+    return max(1, min(shape[0] // max(size[1], 1), shape[1] // max(size[0], 1)))
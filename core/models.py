@@ -1,28 +1,388 @@
+# core/models.py
+"""
+Typed project model.
+
+Shot, RenderSettingsVersion and FrameVersion are slotted dataclasses. A
+project's FrameVersions (one per finished frame per render version, easily
+millions) are not kept as objects: FrameVersionTable stores them column by
+column in arrays, sorted by frame, so lookups by frame or frame range (a
+shot) are binary searches and by render version an index built on first use.
+Shots and render versions are looked up by id through dicts kept alongside
+their lists.
+
+Project serializes to plain dicts for YAML (to_dict/from_dict) and to a
+compact binary form (to_bytes/from_bytes) whose frame columns load straight
+into arrays; see core.utils for the file helpers.
+"""
+import sys
+import json
+import bisect
+import struct
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
+
+from core.frameset import FrameSet
+
+MAGIC = b"DCCPRJ"
+BINARY_VERSION = 1
+assert array("i").itemsize == 4, "binary project format expects 32-bit C ints"
+
+
+def _little_endian(column):
+    """The column in little-endian byte order (a swapped copy on big-endian hosts, else itself)."""
+    if sys.byteorder == "little":
+        return column
+    swapped = array(column.typecode, column)
+    swapped.byteswap()
+    return swapped
+
 
-@dataclass
+@dataclass(slots=True)
 class Shot:
     id: str
     frame_range: Tuple[int, int]
 
-@dataclass
+
+def shots_from_metadata(metadata) -> List[Shot]:
+    """Shots of ProjectConfig.data in shot-list order; a missing or malformed range becomes None."""
+    struct_ = metadata.get("shot_struct") or {}
+    shots = []
+    for shot_id in metadata.get("shots") or []:
+        frames = struct_.get(shot_id)
+        valid = isinstance(frames, (list, tuple)) and len(frames) == 2
+        shots.append(Shot(shot_id, (int(frames[0]), int(frames[1])) if valid else None))
+    return shots
+
+@dataclass(slots=True)
 class RenderSettingsVersion:
     id: str
     settings: Dict
-    frames: List[int]
+    frames: FrameSet = field(default_factory=FrameSet)
+    frame_range: Optional[Tuple[int, int]] = None
 
-@dataclass
+@dataclass(slots=True)
 class FrameVersion:
     frame_number: int
     version_number: int
     render_settings_id: str
     output_path: str
 
-@dataclass
+
+class FrameVersionTable:
+    """
+    FrameVersion records in columns: frame and version numbers in int32
+    arrays, the render version as an index into a small name table, output
+    paths in a list. Rows are kept sorted by (frame, version); indexing or
+    iterating yields FrameVersion objects built on demand.
+    """
+    __slots__ = ("_frames", "_versions", "_rsv", "_paths", "_rsv_names", "_rsv_ids", "_by_rsv")
+
+    def __init__(self, records=()):
+        self._frames = array("i")
+        self._versions = array("i")
+        self._rsv = array("i")
+        self._paths = []
+        self._rsv_names = []
+        self._rsv_ids = {}
+        self._by_rsv = None  # {rsv id: array of rows}, built on first for_rsv
+        if records:
+            self.extend(records)
+
+    def _rsv_id(self, name):
+        rsv = self._rsv_ids.get(name)
+        if rsv is None:
+            rsv = self._rsv_ids[name] = len(self._rsv_names)
+            self._rsv_names.append(name)
+        return rsv
+
+    def _row(self, i) -> FrameVersion:
+        return FrameVersion(self._frames[i], self._versions[i], self._rsv_names[self._rsv[i]], self._paths[i])
+
+    # --- Mutation ---
+    def add(self, frame_number, version_number, render_settings_id, output_path=""):
+        """Insert one record in order; an existing (frame, version, rsv) row gets the new path."""
+        rsv = self._rsv_id(render_settings_id)
+        i = bisect.bisect_left(self._frames, frame_number)
+        end = bisect.bisect_right(self._frames, frame_number, i)
+        while i < end and (self._versions[i], self._rsv[i]) < (version_number, rsv):
+            i += 1
+        if i < end and (self._versions[i], self._rsv[i]) == (version_number, rsv):
+            self._paths[i] = output_path
+            return
+        self._frames.insert(i, frame_number)
+        self._versions.insert(i, version_number)
+        self._rsv.insert(i, rsv)
+        self._paths.insert(i, output_path)
+        self._by_rsv = None
+
+    def append(self, record: FrameVersion):
+        self.add(record.frame_number, record.version_number, record.render_settings_id, record.output_path)
+
+    def extend(self, records):
+        """
+        Bulk insert FrameVersions or (frame, version, rsv, path) tuples with one
+        sort, much faster than add() per record when loading a whole project.
+        """
+        rows = list(zip(self._frames, self._versions, self._rsv, self._paths))
+        for r in records:
+            if isinstance(r, FrameVersion):
+                r = (r.frame_number, r.version_number, r.render_settings_id, r.output_path)
+            rows.append((r[0], r[1], self._rsv_id(r[2]), r[3]))
+        rows.sort(key=lambda r: r[:3])
+        unique = [r for i, r in enumerate(rows) if i + 1 == len(rows) or rows[i + 1][:3] != r[:3]]  # last wins
+        self._frames = array("i", (r[0] for r in unique))
+        self._versions = array("i", (r[1] for r in unique))
+        self._rsv = array("i", (r[2] for r in unique))
+        self._paths = [r[3] for r in unique]
+        self._by_rsv = None
+
+    # --- Access ---
+    def __len__(self):
+        return len(self._frames)
+
+    def __getitem__(self, i) -> FrameVersion:
+        return self._row(range(len(self._frames))[i])
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self._frames)))
+
+    def __eq__(self, other):
+        if not isinstance(other, FrameVersionTable):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"<FrameVersionTable {len(self)} records, {len(self._rsv_names)} render versions>"
+
+    @property
+    def render_settings_ids(self) -> list:
+        return list(self._rsv_names)
+
+    # --- Indexed lookups ---
+    def for_frame(self, frame_number) -> List[FrameVersion]:
+        """Every version of one frame, by version number."""
+        return self.for_frame_range(frame_number, frame_number)
+
+    def for_frame_range(self, start, end) -> List[FrameVersion]:
+        """Every record with start <= frame <= end (e.g. a shot), by frame then version."""
+        lo = bisect.bisect_left(self._frames, start)
+        hi = bisect.bisect_right(self._frames, end, lo)
+        return [self._row(i) for i in range(lo, hi)]
+
+    def for_rsv(self, render_settings_id) -> List[FrameVersion]:
+        """Every frame of one render version, by frame."""
+        rsv = self._rsv_ids.get(render_settings_id)
+        if rsv is None:
+            return []
+        if self._by_rsv is None:
+            by_rsv = {}
+            for i, r in enumerate(self._rsv):
+                by_rsv.setdefault(r, array("i")).append(i)
+            self._by_rsv = by_rsv
+        return [self._row(i) for i in self._by_rsv.get(rsv, ())]
+
+    # --- Serialization ---
+    def to_columns(self) -> dict:
+        """Plain lists per field; YAML-safe."""
+        return {
+            "frame_number": self._frames.tolist(),
+            "version_number": self._versions.tolist(),
+            "render_settings_id": [self._rsv_names[r] for r in self._rsv],
+            "output_path": list(self._paths),
+        }
+
+    @classmethod
+    def from_columns(cls, columns) -> "FrameVersionTable":
+        return cls(zip(columns["frame_number"], columns["version_number"],
+                       columns["render_settings_id"], columns["output_path"]))
+
+
+@dataclass(slots=True)
 class Project:
+    """
+    Shots and render versions keep their list order; add and remove them
+    through the methods below so the id indexes stay current (lists replaced
+    or resized directly are re-indexed on the next lookup).
+    """
     name: str
     tag: str
     shots: List[Shot] = field(default_factory=list)
     render_settings_versions: List[RenderSettingsVersion] = field(default_factory=list)
-    frame_versions: List[FrameVersion] = field(default_factory=list)
+    frame_versions: FrameVersionTable = field(default_factory=FrameVersionTable)
+    _shots_by_id: Dict[str, Shot] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _rsv_by_id: Dict[str, RenderSettingsVersion] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._reindex()
+
+    def _reindex(self):
+        self._shots_by_id = {s.id: s for s in self.shots}
+        self._rsv_by_id = {r.id: r for r in self.render_settings_versions}
+
+    def _stale(self) -> bool:
+        return len(self._shots_by_id) != len(self.shots) or len(self._rsv_by_id) != len(self.render_settings_versions)
+
+    # --- Mutation ---
+    def add_shot(self, shot: Shot, index=None):
+        """Add a shot (at the end, or at index), or replace the one with the same id in place."""
+        old = self.shot(shot.id)
+        if old is not None:
+            self.shots[self.shots.index(old)] = shot
+        elif index is None:
+            self.shots.append(shot)
+        else:
+            self.shots.insert(index, shot)
+        self._shots_by_id[shot.id] = shot
+
+    def remove_shot(self, shot_id):
+        shot = self._shots_by_id.pop(shot_id, None)
+        if shot is not None:
+            self.shots.remove(shot)
+
+    def rename_shot(self, old_id, new_id):
+        """Rename a shot in place, keeping its position and frame range."""
+        shot = self.shot(old_id)
+        if shot is None:
+            return
+        del self._shots_by_id[old_id]
+        shot.id = new_id
+        self._shots_by_id[new_id] = shot
+
+    def set_shots(self, shots: List[Shot]):
+        """Replace every shot, e.g. after the metadata was reloaded."""
+        self.shots = list(shots)
+        self._reindex()
+
+    def set_renders(self, render_settings_versions: List[RenderSettingsVersion], frame_versions: FrameVersionTable):
+        """Replace the render versions and frame versions, e.g. with a RenderManager's."""
+        self.render_settings_versions = list(render_settings_versions)
+        self.frame_versions = frame_versions
+        self._reindex()
+
+    def add_render_settings_version(self, rsv: RenderSettingsVersion):
+        """Add a render version, or replace the one with the same id in place."""
+        old = self.render_settings_version(rsv.id)
+        if old is None:
+            self.render_settings_versions.append(rsv)
+        else:
+            self.render_settings_versions[self.render_settings_versions.index(old)] = rsv
+        self._rsv_by_id[rsv.id] = rsv
+
+    # --- Lookups ---
+    def shot(self, shot_id) -> Optional[Shot]:
+        if self._stale():
+            self._reindex()
+        return self._shots_by_id.get(shot_id)
+
+    def render_settings_version(self, rsv_id) -> Optional[RenderSettingsVersion]:
+        if self._stale():
+            self._reindex()
+        return self._rsv_by_id.get(rsv_id)
+
+    def frame_versions_for_shot(self, shot_id) -> List[FrameVersion]:
+        shot = self.shot(shot_id)
+        if shot is None:
+            raise KeyError(f"Shot {shot_id} not found.")
+        return self.frame_versions.for_frame_range(*shot.frame_range)
+
+    # --- Conversion from the stored project ---
+    @classmethod
+    def from_metadata(cls, metadata, renders=None, frame_versions=None) -> "Project":
+        """
+        Build from ProjectConfig.data and, optionally, RenderManager.data and
+        RenderManager.frame_version_table(). Without renders the render
+        versions come from the metadata's renderSettings.
+        """
+        shots = shots_from_metadata(metadata)
+        if renders is not None:
+            rsvs = [RenderSettingsVersion(rsv, info.get("settings", {}), FrameSet.from_value(info.get("frames")),
+                                          tuple(info["frame_range"]) if info.get("frame_range") else None)
+                    for rsv, info in sorted(renders.get("renders", {}).items())]
+        else:
+            rsvs = [RenderSettingsVersion(rsv, settings)
+                    for rsv, settings in sorted((metadata.get("renderSettings") or {}).items())]
+        name = metadata.get("project_name", "")
+        return cls(name, metadata.get("project_tag", f"@{name}"), shots, rsvs,
+                   frame_versions if frame_versions is not None else FrameVersionTable())
+
+    # --- Plain dicts (YAML) ---
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "tag": self.tag,
+            "shots": [{"id": s.id, "frame_range": list(s.frame_range) if s.frame_range else None} for s in self.shots],
+            "render_settings_versions": [
+                {"id": r.id, "settings": r.settings, "frames": str(r.frames),
+                 "frame_range": list(r.frame_range) if r.frame_range else None}
+                for r in self.render_settings_versions],
+            "frame_versions": self.frame_versions.to_columns(),
+        }
+
+    @classmethod
+    def from_dict(cls, data) -> "Project":
+        frame_versions = data.get("frame_versions") or {}
+        if isinstance(frame_versions, list):  # records rather than columns
+            table = FrameVersionTable(FrameVersion(**r) for r in frame_versions)
+        else:
+            table = FrameVersionTable.from_columns(frame_versions) if frame_versions else FrameVersionTable()
+        return cls(
+            data["name"], data["tag"],
+            [Shot(s["id"], tuple(s["frame_range"]) if s.get("frame_range") else None) for s in data.get("shots") or []],
+            [RenderSettingsVersion(r["id"], r.get("settings") or {}, FrameSet.from_value(r.get("frames")),
+                                   tuple(r["frame_range"]) if r.get("frame_range") else None)
+             for r in data.get("render_settings_versions") or []],
+            table)
+
+    # --- Binary ---
+    def to_bytes(self) -> bytes:
+        """
+        MAGIC, then a length-prefixed JSON header with everything except the
+        frame versions, then the row count, the three int32 columns as raw
+        little-endian arrays and the output paths NUL-joined.
+        """
+        table = self.frame_versions
+        header = self.to_dict()
+        header["frame_versions"] = {"render_settings_ids": table._rsv_names}
+        header = json.dumps(header, separators=(",", ":")).encode()
+        paths = "\0".join(table._paths).encode()
+        parts = [MAGIC, struct.pack("<HI", BINARY_VERSION, len(header)), header, struct.pack("<I", len(table))]
+        for column in (table._frames, table._versions, table._rsv):
+            parts.append(_little_endian(column).tobytes())
+        parts += [struct.pack("<I", len(paths)), paths]
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data) -> "Project":
+        view = memoryview(data)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a binary project file.")
+        pos = len(MAGIC)
+        version, header_len = struct.unpack_from("<HI", view, pos)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary project version {version}.")
+        pos += 6
+        header = json.loads(bytes(view[pos:pos + header_len]))
+        pos += header_len
+        (rows,) = struct.unpack_from("<I", view, pos)
+        pos += 4
+
+        table = FrameVersionTable()
+        columns = []
+        for _ in range(3):
+            column = array("i")
+            column.frombytes(view[pos:pos + 4 * rows])
+            columns.append(_little_endian(column))
+            pos += 4 * rows
+        table._frames, table._versions, table._rsv = columns
+        (paths_len,) = struct.unpack_from("<I", view, pos)
+        pos += 4
+        table._paths = bytes(view[pos:pos + paths_len]).decode().split("\0") if rows else []
+        table._rsv_names = header["frame_versions"]["render_settings_ids"]
+        table._rsv_ids = {name: i for i, name in enumerate(table._rsv_names)}
+
+        header["frame_versions"] = None
+        project = cls.from_dict(header)
+        project.frame_versions = table
+        return project
+
@@ -1,14 +1,33 @@
 import os
+import re
+import copy
+import dataclasses
 import shutil
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
-import yaml
 from pathlib import Path
 import logging
 
 from core.utils import convert_to_usd
+from core.frameset import FrameSet
+from core.models import Project, Shot, shots_from_metadata
+from core.catalog import ProjectCatalog
+from core import events
+from core.storage import (open_backend, uses_database, load_metadata, read_yaml, atomic_write_yaml, FileLock,
+                          METADATA_FILE)
 
 DEFAULT_USER = "ADMIN"
 ROOT_DIR = "TEMP"  # Can be changed later to a shared or network path
+FRAME_ID_RE = re.compile(r"^(?P<shot>.+)_rf(?P<frame>-?\d+)")  # "SH010_rf12", as recorded by add_render
+
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
 
 class SceneProject:
     def __init__(self):
@@ -48,6 +67,7 @@ class SceneProject:
         # --- Initialize ProjectConfig ---
         self.config = ProjectConfig(project_name, project_dir, scene_files)
         self.config.save()
+        self._catalog_record(self.config.data, project_dir)
 
         print(f"New project '{project_name}' created at '{self.project_path}'.")
 
@@ -55,18 +75,34 @@ class SceneProject:
     def load_existing(self, project_tag):
         project_name = project_tag.lstrip("@")
         project_dir = os.path.join(ROOT_DIR, project_name)
-        config_path = os.path.join(project_dir, "Config", "metadata.yaml")
+        config_dir = os.path.join(project_dir, "Config")
 
-        if not os.path.exists(config_path):
+        if not uses_database(config_dir) and not os.path.exists(os.path.join(config_dir, METADATA_FILE)):
             raise FileNotFoundError(f"No project found with tag '{project_tag}'.")
 
-        with open(config_path, "r") as f:
-            self.metadata = yaml.safe_load(f)
+        self.metadata = load_metadata(config_dir)
 
         self.project_path = project_dir
+        self._catalog_record(self.metadata, project_dir)
         print(f"Loaded project '{self.metadata['project_name']}' from '{project_dir}'.")
         return self.metadata
 
+    def _catalog_record(self, metadata, project_dir):
+        # The catalog is an index; failing to update it must not fail the project itself
+        try:
+            ProjectCatalog(ROOT_DIR).record(metadata, project_dir)
+        except Exception as e:
+            print(f"[Catalog] Could not record '{project_dir}': {e}")
+
+    def list_projects(self, query=None, refresh=True) -> list:
+        """
+        Catalog entries for the projects in ROOT_DIR, filtered by core.catalog
+        search if query is given. refresh=False skips the staleness check and
+        rescan, answering from catalog.yaml alone.
+        """
+        catalog = ProjectCatalog(ROOT_DIR)
+        return catalog.search(query, refresh=refresh) if query else catalog.projects(refresh)
+
     def _setup_logging(self, project_dir):
         log_file = os.path.join(project_dir, "Config", "project.log")
         handler = logging.FileHandler(log_file)
@@ -84,12 +120,24 @@ class SceneProject:
 
 
 class ProjectConfig:
-    def __init__(self, project_name, project_dir, scenes=None):
+    """
+    Project metadata. Stored in Config/metadata.yaml, or in Config/project.db
+    through a core.storage.SqliteBackend once the project has been migrated
+    (pass backend= to choose explicitly).
+
+    Every change made through the methods below is persisted on its own and
+    then announced on the project's core.events bus (shot added, updated,
+    renamed or removed), so windows can patch just the affected rows.
+
+    self.model is the same project as a core.models.Project, which windows
+    read shots from and a RenderManager fills with render versions and
+    frames (RenderManager.attach_model).
+    """
+    def __init__(self, project_name, project_dir, scenes=None, backend=None):
         self.project_name = project_name
         self.project_dir = project_dir
         self.scene_files = scenes
-        self.config_dir = os.path.join(self.project_dir, "Config")
-        self.yaml_path = os.path.join(self.config_dir, "metadata.yaml")
+        self._init_storage(os.path.join(self.project_dir, "Config"), None, backend)
         self.data = {
             "project_name": self.project_name,
             "project_tag" : f"@{self.project_name}",
@@ -106,46 +154,316 @@ class ProjectConfig:
 
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir)        
-        if os.path.exists(self.yaml_path):
+        if self.backend is not None:
+            if self.backend.load_metadata() is not None:
+                self.load()
+            else:
+                self.save()
+        elif os.path.exists(self.yaml_path):
             self.load()
         else:
             self.save()
 
+    def _init_storage(self, config_dir, yaml_path, backend):
+        self.config_dir = config_dir
+        self.yaml_path = yaml_path or os.path.join(self.config_dir, METADATA_FILE)
+        self.backend = backend if backend is not None else open_backend(self.config_dir)
+        self._file_lock = FileLock(f"{self.yaml_path}.lock")
+        self._pending = []  # changes not yet written, re-applied to the file's latest content on save
+        self._batch_depth = 0
+        self.events = events.bus_for(self.config_dir)
+        self._queued_events = []  # emitted once the enclosing batch() has been written
+        self._stamp = None  # metadata.yaml as last loaded or written by this config
+        self._rendered = {}  # rsv -> {shot: FrameSet}, see rendered_frames()
+        self._rendered_for = None
+        self._model = None  # see model
+        self._model_for = None
+
+    @classmethod
+    def open(cls, metadata_file):
+        """
+        ProjectConfig over an existing metadata file, e.g. the one a window was
+        opened with (a project.db next to it takes precedence). Unlike the
+        constructor it never writes defaults; nothing is written until a change.
+        """
+        config = cls.__new__(cls)
+        config._init_storage(os.path.dirname(os.path.abspath(metadata_file)), metadata_file, None)
+        config.data = {}
+        if config.backend is not None or os.path.exists(config.yaml_path):
+            config.load()
+        config.project_name = config.data.get("project_name")
+        config.project_dir = config.data.get("project_dir")
+        config.scene_files = config.data.get("scene_file")
+        return config
+
+    @classmethod
+    def in_memory(cls, data=None):
+        """
+        ProjectConfig over a metadata dict that is never written, e.g. for a
+        window opened without a metadata file. Changes go through the same
+        methods and are announced on a bus of its own.
+        """
+        config = cls.__new__(cls)
+        config.config_dir = config.yaml_path = config.backend = config._file_lock = None
+        config._pending = []
+        config._batch_depth = 0
+        config.events = events.EventBus()
+        config._queued_events = []
+        config._stamp = None
+        config._rendered = {}
+        config._rendered_for = None
+        config._model = None
+        config._model_for = None
+        config.data = data if data is not None else {}
+        config.project_name = config.data.get("project_name")
+        config.project_dir = config.data.get("project_dir")
+        config.scene_files = config.data.get("scene_file")
+        return config
+
     def load(self):
-        with open(self.yaml_path, "r") as f:
-            self.data = yaml.safe_load(f) or self.data
-        return self.yaml_path, self.data
+        if self.yaml_path is None:  # in memory: nothing to reload
+            return None, self.data
+        if self.backend is None:
+            self._stamp = _file_stamp(self.yaml_path)  # before reading: a write in between forces a re-read on save
+        data = self.backend.load_metadata() if self.backend is not None else read_yaml(self.yaml_path)
+        if data:
+            self.data.clear()  # in place: windows hold on to this dict
+            self.data.update(data)
+        return (self.backend.path if self.backend is not None else self.yaml_path), self.data
+
+    def follow(self):
+        """
+        Keep self.data current with shot changes other ProjectConfigs in this
+        process make to the same project (e.g. a window's config while a tool
+        edits shots). Reloads before later subscribers see the event; the
+        subscription ends when this config is garbage collected.
+        """
+        ref = weakref.ref(self)
+
+        def on_event(event):
+            config = ref()
+            if config is None:
+                unsubscribe()
+            elif event.origin is not config:
+                config.load()
+        unsubscribe = self.events.subscribe(on_event, kinds=events.SHOT_EVENTS)
 
     def save(self):
-        with open(self.yaml_path, "w") as f:
-            yaml.dump(self.data, f)
+        """
+        Write metadata.yaml atomically while holding metadata.yaml.lock.
+        Changes made through the methods below since the last save are
+        re-applied to the file's current content first, so processes editing
+        the same project concurrently do not lose each other's updates (unless
+        the file is still the one this config last loaded or wrote).
+        """
+        if self.backend is not None:
+            self.backend.save_metadata(self.data)
+            self._pending = []
+            return
+        if self.yaml_path is None:  # in memory
+            self._pending = []
+            return
+        with self._file_lock:
+            if self._pending and os.path.exists(self.yaml_path) and _file_stamp(self.yaml_path) != self._stamp:
+                data = read_yaml(self.yaml_path) or {}
+                for apply in self._pending:
+                    apply(data)
+                self.data.clear()  # in place: windows hold on to this dict
+                self.data.update(data)
+            self._pending = []
+            atomic_write_yaml(self.yaml_path, self.data)
+            self._stamp = _file_stamp(self.yaml_path)
+
+    @property
+    def model(self) -> Project:
+        """
+        The project as a core.models.Project, shots in shot-list order. Built
+        on first use and kept current by add_shot, remove_shot and rename_shot;
+        when self.data is reloaded or replaced its shots are rebuilt in place,
+        so the object (and render versions attached to it) stays the same.
+        """
+        shots = self.data.get("shots")
+        if self._model is None:
+            self._model = Project.from_metadata(self.data)
+        elif self._model_for is not shots:
+            self._model.name = self.data.get("project_name", "")
+            self._model.tag = self.data.get("project_tag", f"@{self._model.name}")
+            self._model.set_shots(shots_from_metadata(self.data))
+        self._model_for = shots
+        return self._model
+
+    def _commit(self, apply, change, *args, event=None, model=None):
+        """
+        Make one change: apply(data) edits the metadata dict, change(*args) is
+        the matching single-row update on a database backend and model(project)
+        the same change to self.model, if built. For YAML the file is
+        rewritten, or at the end of the enclosing batch(). event is emitted
+        once the change is written.
+        """
+        in_step = self._model is not None and self._model_for is self.data.get("shots")
+        apply(self.data)
+        if model is not None and in_step and self._model_for is self.data.get("shots"):
+            model(self._model)
+        if self.backend is not None:
+            getattr(self.backend, change)(*args)
+        else:
+            self._pending.append(apply)
+            if not self._batch_depth:
+                self.save()
+        if event is not None:
+            event = dataclasses.replace(event, origin=self)
+            if self._batch_depth:
+                self._queued_events.append(event)
+            else:
+                self.events.emit(event)
+
+    @contextmanager
+    def batch(self):
+        """
+        Group mutations into one write:
+
+            with config.batch():
+                config.add_shot("SH010", (1, 10))
+                config.add_shot("SH020", (11, 20))
+
+        metadata.yaml is written once when the outermost batch exits (on a
+        database backend the changes share one transaction). If the block
+        raises, nothing is written and self.data is restored.
+        """
+        if self._batch_depth:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            return
+
+        snapshot = copy.deepcopy(self.data)
+        self._batch_depth = 1
+        try:
+            if self.backend is not None:
+                with self.backend.transaction():
+                    yield self
+            else:
+                yield self
+        except BaseException:
+            self.data.clear()
+            self.data.update(snapshot)
+            self._pending = []
+            self._queued_events = []
+            raise
+        finally:
+            self._batch_depth = 0
+        if self._pending:
+            self.save()
+        queued, self._queued_events = self._queued_events, []
+        for event in queued:
+            self.events.emit(event)
 
     # --- Shots ---
     def add_shot(self, shot_name, frame_range):
-        if shot_name not in self.data["shots"]:
-            self.data["shots"].append(shot_name)
-        self.data["shot_struct"][shot_name] = frame_range
-        self.save()
+        """Add a shot, or change an existing shot's frame range."""
+        def apply(data):
+            if shot_name not in data.setdefault("shots", []):
+                data["shots"].append(shot_name)
+            data.setdefault("shot_struct", {})[shot_name] = frame_range
+        if shot_name in self.data.get("shots", []):
+            event = events.ProjectEvent(events.SHOT_UPDATED, shot_name, frame_range=tuple(frame_range))
+        else:
+            event = events.ProjectEvent(events.SHOT_ADDED, shot_name, frame_range=tuple(frame_range),
+                                        index=len(self.data.get("shots", [])))
+        self._commit(apply, "put_shot", shot_name, frame_range, event=event,
+                     model=lambda project: project.add_shot(Shot(shot_name, (int(frame_range[0]), int(frame_range[1])))))
+
+    def add_shots(self, shots):
+        """Add or update many shots with one write; shots is {name: frame_range} or (name, frame_range) pairs."""
+        with self.batch():
+            for shot_name, frame_range in (shots.items() if isinstance(shots, dict) else shots):
+                self.add_shot(shot_name, frame_range)
 
     def remove_shot(self, shot_name):
-        if shot_name in self.data["shots"]:
-            self.data["shots"].remove(shot_name)
-        self.data["shot_struct"].pop(shot_name, None)
-        # Remove any renders for this shot
-        for rsv, frames in self.data["renders"].items():
-            self.data["renders"][rsv] = [f for f in frames if not f.startswith(shot_name)]
-        self.save()
+        def apply(data):
+            if shot_name in data.setdefault("shots", []):
+                data["shots"].remove(shot_name)
+            data.setdefault("shot_struct", {}).pop(shot_name, None)
+            # Remove any renders for this shot ("SH01_..." only, not "SH010_...")
+            for rsv, frames in data.setdefault("renders", {}).items():
+                data["renders"][rsv] = [f for f in frames if f != shot_name and not f.startswith(f"{shot_name}_")]
+        self._commit(apply, "delete_shot", shot_name, event=events.ProjectEvent(events.SHOT_REMOVED, shot_name),
+                     model=lambda project: project.remove_shot(shot_name))
+        for shots in self._rendered.values():
+            shots.pop(shot_name, None)
+
+    def rename_shot(self, old_name, new_name):
+        """Rename a shot in place, keeping its position, frame range and recorded renders."""
+        if new_name in self.data.get("shots", []):
+            raise ValueError(f"Shot '{new_name}' already exists.")
+
+        def apply(data):
+            shots = data.setdefault("shots", [])
+            if old_name in shots:
+                shots[shots.index(old_name)] = new_name
+            shot_struct = data.setdefault("shot_struct", {})
+            if old_name in shot_struct:
+                shot_struct[new_name] = shot_struct.pop(old_name)
+            prefix = f"{old_name}_"
+            for rsv, frames in data.setdefault("renders", {}).items():
+                data["renders"][rsv] = [f"{new_name}_{f[len(prefix):]}" if f.startswith(prefix) else f for f in frames]
+        self._commit(apply, "rename_shot", old_name, new_name,
+                     event=events.ProjectEvent(events.SHOT_RENAMED, new_name, old_shot=old_name),
+                     model=lambda project: project.rename_shot(old_name, new_name))
+        for shots in self._rendered.values():
+            if old_name in shots:
+                shots[new_name] = shots.pop(old_name)
 
     # --- Render Settings ---
     def add_render_setting(self, rsv_name, settings_dict):
-        self.data["renderSettings"][rsv_name] = settings_dict
-        if rsv_name not in self.data["renders"]:
-            self.data["renders"][rsv_name] = []
-        self.save()
+        def apply(data):
+            data.setdefault("renderSettings", {})[rsv_name] = settings_dict
+            data.setdefault("renders", {}).setdefault(rsv_name, [])
+        self._commit(apply, "put_render_setting", rsv_name, settings_dict)
 
     # --- Record Renders ---
     def add_render(self, rsv_name, frame_id):
-        if rsv_name not in self.data["renders"]:
-            self.data["renders"][rsv_name] = []
-        self.data["renders"][rsv_name].append(frame_id)
-        self.save()
\ No newline at end of file
+        def apply(data):
+            data.setdefault("renders", {}).setdefault(rsv_name, []).append(frame_id)
+        self._commit(apply, "add_render", rsv_name, frame_id)
+        shots = self._rendered.get(rsv_name) if self._rendered_for is self.data.get("renders") else None
+        match = FRAME_ID_RE.match(frame_id)
+        if shots is not None and match:
+            shots.setdefault(match.group("shot"), FrameSet()).add(int(match.group("frame")))
+
+    def add_renders(self, rsv_name, frame_ids):
+        """Record a finished chunk of frames with one write."""
+        with self.batch():
+            for frame_id in frame_ids:
+                self.add_render(rsv_name, frame_id)
+
+    def _rendered_shots(self, rsv_name) -> dict:
+        """
+        {shot: FrameSet} for a render version. Built from the stored frame IDs
+        with one pass the first time it is asked for, then kept current by
+        add_render, remove_shot and rename_shot; dropped whenever the renders
+        dict is replaced (reload, a merge with another process's write, a
+        rolled back batch).
+        """
+        renders = self.data.get("renders", {})
+        if self._rendered_for is not renders:
+            self._rendered, self._rendered_for = {}, renders
+        shots = self._rendered.get(rsv_name)
+        if shots is None:
+            shots = self._rendered[rsv_name] = {}
+            for frame_id in renders.get(rsv_name, []):
+                match = FRAME_ID_RE.match(frame_id)
+                if match:
+                    shots.setdefault(match.group("shot"), FrameSet()).add(int(match.group("frame")))
+        return shots
+
+    def rendered_frames(self, rsv_name, shot_name) -> FrameSet:
+        """Frames of a shot recorded for a render version."""
+        return FrameSet(self._rendered_shots(rsv_name).get(shot_name))
+
+    def missing_frames(self, rsv_name, shot_name) -> FrameSet:
+        """Frames of the shot's range with no render recorded for the version."""
+        start, end = self.data["shot_struct"][shot_name]
+        return self.rendered_frames(rsv_name, shot_name).missing(int(start), int(end))
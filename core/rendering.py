@@ -1,10 +1,30 @@
 # core/rendering.py
 import os
-import yaml
+import re
+import json
+import math
+import signal
+import struct
+import asyncio
+import time
 import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from collections import deque, OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from pathlib import Path
 
+from adapters import worker_protocol
+from core import telemetry as render_telemetry
+from core.storage import (atomic_write_yaml, atomic_write_bytes, read_yaml, open_backend, FileLock, RenderJournal,
+                          load_project_binary)
+from core.models import Project, RenderSettingsVersion, FrameVersion, FrameVersionTable
+from core.frameset import FrameSet
+from core import events
+
 # from adapters.nuke_adapter import NukeAdapter   # keep if you need it
 
 DEFAULT_FILENAME_TEMPLATE = "{shot}_{camera}_{frame}"
@@ -13,6 +33,99 @@ MIN_FPS = 1
 MAX_FPS = 240
 MAYAPY = "/usr/autodesk/maya2023/bin/mayapy"
 HYTHON = "/opt/hfs20.5.332/bin/hython3.11"
+ADAPTERS_DIR = Path(__file__).resolve().parents[1] / "adapters"
+RENDER_LICENSES = None  # Set to cap concurrent DCC renders at the number of available licences
+CHUNK_TARGET_SECONDS = 120  # Auto-sized chunks aim to keep one DCC session busy for about this long
+MAX_CHUNK_SIZE = 100
+JOURNAL_COMPACT_EVERY = 500  # journaled frames before RenderManager folds them back into the version files
+RENDERS_INDEX = "index.yaml"  # in Config/renders/, next to one <rsv>.yaml per render version
+VERSION_CACHE_SIZE = 64  # render versions a RenderManager keeps loaded
+OUTPUTS_INDEX = "outputs.jsonl"  # in Config/renders/: which files each frame has, for the gallery
+MODEL_CACHE_SUFFIX = ".model"  # Config/renders.model: the attached core.models.Project in binary form
+SCAN_WORKERS = 8  # output folders listed in parallel by RenderOutputIndex.rebuild; mostly network latency
+OUTPUT_NAME_RE = re.compile(r"^rf(?P<frame>-?\d+)v(?P<version>\d+)\.(?P<ext>\w+)$")  # rf12v003.exr
+FRAME_HEADERS = {  # magic bytes every valid output file starts with
+    "exr": b"\x76\x2f\x31\x01",
+    "png": b"\x89PNG\r\n\x1a\n",
+    "jpeg": b"\xff\xd8\xff",
+    "jpg": b"\xff\xd8\xff",
+}
+FRAME_ORDERINGS = ["sequential", "progressive", "stride"]
+FRAME_STRIDE = 10  # "stride" ordering renders every Nth frame before filling in
+FRAME_DONE_RE = re.compile(r"FRAME_DONE (-?\d+) (.+)$")  # "[MAYA] FRAME_DONE 12 /path/rf12v001.exr"
+
+
+def default_concurrency() -> int:
+    """
+    Number of DCC subprocesses to run at once: one per core,
+    capped by RENDER_LICENSES when set.
+    """
+    cores = os.cpu_count() or 1
+    if RENDER_LICENSES:
+        return max(1, min(cores, RENDER_LICENSES))
+    return cores
+
+
+def rsv_version(rsv: str | None) -> int:
+    """
+    Extract version number from a render version name (e.g. "rsv003" → 3).
+    Defaults to 1 if missing or malformed.
+    """
+    if not rsv or not rsv.startswith("rsv"):
+        return 1
+    try:
+        return int(rsv.replace("rsv", ""))
+    except ValueError:
+        return 1
+
+
+def order_frames(frames, ordering: str = "sequential", stride: int = FRAME_STRIDE) -> list:
+    """
+    Order frames for rendering so a coarse preview of the whole range appears early.
+
+    sequential:  1, 2, 3, ... as given
+    progressive: first, last, middle, then the midpoints of every remaining gap
+                 (binary subdivision), e.g. 1-9 → 1, 9, 5, 3, 7, 2, 4, 6, 8
+    stride:      every stride-th frame, then the frames in between in order
+    """
+    frames = list(frames)
+    if ordering == "sequential":
+        return frames
+    if ordering == "stride":
+        stride = max(1, stride)
+        coarse = frames[::stride]
+        return coarse + [f for i, f in enumerate(frames) if i % stride]
+    if ordering == "progressive":
+        if len(frames) <= 2:
+            return frames
+        ordered = [frames[0], frames[-1]]
+        gaps = deque([(0, len(frames) - 1)])
+        while gaps:
+            lo, hi = gaps.popleft()
+            mid = (lo + hi) // 2
+            if mid in (lo, hi):
+                continue
+            ordered.append(frames[mid])
+            gaps.append((lo, mid))
+            gaps.append((mid, hi))
+        return ordered
+    raise ValueError(f"Frame ordering '{ordering}' not supported. Choose from {FRAME_ORDERINGS}.")
+
+
+def frame_file_ok(path) -> bool:
+    """
+    True if path looks like a complete render: it exists, is larger than the
+    bare header, and starts with the magic bytes for its extension.
+    """
+    path = Path(path)
+    header = FRAME_HEADERS.get(path.suffix.lstrip(".").lower(), b"")
+    try:
+        if path.stat().st_size <= len(header):
+            return False
+        with open(path, "rb") as f:
+            return f.read(len(header)) == header
+    except OSError:
+        return False
 
 
 class RenderSettings:
@@ -50,20 +163,46 @@ class RenderSettings:
     def generate_filename(self, shot: str, camera: str, frame: int):
         return self.filename_template.format(shot=shot, camera=camera, frame=frame)
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "RenderSettings":
+        """
+        Rebuild settings saved by RenderManager.new_render_version. Extra keys
+        set on the instance by the UI (camera, light) are restored as attributes.
+        """
+        params = ["renderer", "fps", "output_dir", "output_format", "resolution_width",
+                  "resolution_height", "motion_blur", "denoise", "filename_template"]
+        settings = cls(**{k: data[k] for k in params if k in data})
+        for key, value in data.items():
+            if key not in params:
+                setattr(settings, key, value)
+        return settings
+
 
 class Renderer:
     """
     Renderer now supports Karma via hython subprocess.
     Give it metadata + rsv so it can find the scene and compute versioned filenames.
     """
-    def __init__(self, settings: RenderSettings, metadata: dict | None = None, rsv: str | None = None, hython: str = "hython"):
+    def __init__(self, settings: RenderSettings, metadata: dict | None = None, rsv: str | None = None,
+                 hython: str = HYTHON, mayapy: str = MAYAPY, pool: "WorkerPool | None" = None,
+                 telemetry: "render_telemetry.TelemetryStore | None" = None):
         self.settings = settings
         self.metadata = metadata or {}
         self.rsv = rsv
-        # self.hython = hython  # path to hython; ensure it's on PATH or provide absolute
+        # DCC executables; override to point at another install (or a stub in tests)
+        self.hython = hython
+        self.mayapy = mayapy
+        # Optional pool of warm DCC workers; when set, frames are sent as jobs instead of launching a process each
+        self.pool = pool
+        # Optional TelemetryStore; when set, DCC launches are measured and recorded per frame
+        self.telemetry = telemetry
+        self._proc = None  # DCC process of the chunk in progress, for abort()
+        self._aborted = False
 
     # --- Public API used by your UI loop ---
     def render_shot(self, shot_info: dict):
+        if self.pool is not None and self.settings.renderer in SUPPORTED_RENDERERS:
+            return self._render_warm([int(shot_info.get("frame", 1))])[0]
         if self.settings.renderer == "Karma":
             return self._render_karma_frame(shot_info)
         elif self.settings.renderer == "Arnold":
@@ -75,6 +214,37 @@ class Renderer:
             print(f"[Renderer] (stub) {self.settings.renderer} rendering {filename}")
             return filepath
 
+    def render_chunk(self, frames, on_frame=None):
+        """
+        Render a contiguous run of frames with as few DCC launches as possible.
+        on_frame(frame, path) is called as each frame finishes.
+        """
+        frames = list(frames)
+        if self.pool is not None:
+            return self._render_warm(frames, on_frame)
+        if self.settings.renderer == "Arnold":
+            return self._render_arnold_chunk(frames, on_frame)
+        if self.settings.renderer == "Karma":
+            return self._render_karma_chunk(frames, on_frame)
+
+        outputs = []
+        for frame in frames:
+            out_file = self.render_shot({"frame": frame})
+            outputs.append(out_file)
+            if on_frame:
+                on_frame(frame, out_file)
+        return outputs
+
+    def abort(self):
+        """
+        Stop render_chunk from another thread: the DCC process in progress (and
+        anything it spawned) is killed, so the chunk raises instead of finishing.
+        """
+        self._aborted = True
+        proc = self._proc
+        if proc is not None:
+            self._kill_group(proc)
+
 
     # --- Internal helpers ---
     def _scene_abs_path(self, renderer: str) -> Path:
@@ -128,9 +298,10 @@ class Renderer:
         out.mkdir(parents=True, exist_ok=True)
         return out
 
-    def _rf_filename(self, frame: int) -> str:
+    def _rf_filename(self, frame) -> str:
         """
         rf{frame}v{version}.{ext}  → rf1v001.exr
+        Pass frame="{frame}" to get a per-frame template for the adapters.
         """
         ver = self._version_from_rsv()
         ext = self.settings.output_format.lower()
@@ -141,12 +312,7 @@ class Renderer:
         Extract version number from self.rsv (e.g. "rsv003" → 3).
         Defaults to 1 if missing or malformed.
         """
-        if not self.rsv or not self.rsv.startswith("rsv"):
-            return 1
-        try:
-            return int(self.rsv.replace("rsv", ""))
-        except ValueError:
-            return 1
+        return rsv_version(self.rsv)
 
     def _render_arnold_frame(self, shot_info: dict):
         """
@@ -159,8 +325,8 @@ class Renderer:
         out_file = out_dir / self._rf_filename(frame)
 
         cmd = [
-            MAYAPY,
-            str(Path("adapters/maya_adapter.py").resolve()),
+            self.mayapy,
+            str(ADAPTERS_DIR / "maya_adapter.py"),
             "render",
             "--file", str(scene),
             "--scene", self.metadata.get('project_name'),
@@ -172,87 +338,1223 @@ class Renderer:
 
         # print("[Renderer] Arnold subprocess:", " ".join(cmd))
         # Raises exception if mayapy fails
-        subprocess.run(cmd, check=True)
+        stats = render_telemetry.ChunkTelemetry([frame])
+        exit_status = None
+        try:
+            self._run_streaming(self._launch_cmd(cmd), stats.on_line)
+            exit_status = 0
+            stats.frame_done(frame, out_file)
+        except subprocess.CalledProcessError as e:
+            exit_status = e.returncode
+            raise
+        finally:
+            self._record_telemetry(stats, exit_status)
 
         return out_file
 
+    def _render_arnold_chunk(self, frames, on_frame=None):
+        """
+        Launch one mayapy for frames[0]..frames[-1]; the adapter reports each
+        finished frame with a FRAME_DONE line.
+        """
+        return self._run_chunk(self._chunk_cmd(frames), frames, on_frame)
+
+    def _chunk_cmd(self, frames) -> list:
+        """Adapter command that renders frames[0]..frames[-1] in one DCC session."""
+        out_template = self._render_output_dir() / self._rf_filename("{frame}")
+
+        if self.settings.renderer == "Arnold":
+            return [
+                self.mayapy,
+                str(ADAPTERS_DIR / "maya_adapter.py"),
+                "render",
+                "--file", str(self._scene_abs_path("Arnold")),
+                "--scene", self.metadata.get('project_name'),
+                "--outputr", str(out_template),
+                "--startf", str(frames[0]),
+                "--endf", str(frames[-1]),
+                "--ext", self.settings.output_format.lower()
+            ]
+
+        if self.settings.renderer == "Karma":
+            cmd = [
+                self.hython,
+                str(ADAPTERS_DIR / "houdini_adapter.py"),
+                "render-range",
+                "--scene", str(self._scene_abs_path("Karma")),
+                "--output", str(out_template),
+                "--start", str(frames[0]),
+                "--end", str(frames[-1]),
+                "--width", str(self.settings.resolution_width),
+                "--height", str(self.settings.resolution_height),
+            ]
+            camera = getattr(self.settings, "camera", None)
+            light = getattr(self.settings, "light", None)
+            if camera:
+                cmd += ["--camera", camera]
+            if light and light != "None":
+                cmd += ["--light", light]
+            return cmd
+
+        raise ValueError(f"Unknown renderer: {self.settings.renderer}")
+
+    def _run_chunk(self, cmd, frames, on_frame=None):
+        """
+        Run a multi-frame adapter command, collecting the frames it reports as done.
+        Raises RuntimeError if the DCC exits cleanly without reporting every frame.
+        """
+        outputs = []
+        stats = render_telemetry.ChunkTelemetry(frames)
+
+        def on_line(line):
+            if stats.on_line(line):
+                return
+            match = FRAME_DONE_RE.search(line)
+            if match:
+                frame, out_file = int(match.group(1)), Path(match.group(2).strip())
+                outputs.append(out_file)
+                stats.frame_done(frame, out_file)
+                if on_frame:
+                    on_frame(frame, out_file)
+
+        exit_status = None
+        try:
+            self._run_streaming(self._launch_cmd(cmd), on_line)
+            exit_status = 0
+        except subprocess.CalledProcessError as e:
+            exit_status = e.returncode
+            raise
+        finally:
+            self._record_telemetry(stats, exit_status)
+        if len(outputs) != len(frames):
+            raise RuntimeError(f"{Path(cmd[0]).name} reported {len(outputs)} of {len(frames)} frames "
+                               f"for {frames[0]}-{frames[-1]}")
+        return outputs
+
+    def _run_streaming(self, cmd, on_line):
+        """
+        Run cmd, passing each stdout line to on_line as it is printed.
+        Raises CalledProcessError on a non-zero exit, like subprocess.run(check=True).
+        """
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, bufsize=1, start_new_session=True) as proc:
+            self._proc = proc
+            try:
+                if self._aborted:
+                    self._kill_group(proc)
+                for line in proc.stdout:
+                    print(line, end="")
+                    on_line(line.rstrip("\n"))
+            except BaseException:
+                self._kill_group(proc)
+                raise
+            finally:
+                self._proc = None
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+    def _launch_cmd(self, cmd) -> list:
+        """cmd as it is actually launched: through the telemetry wrapper when recording."""
+        return render_telemetry.wrap_command(cmd) if self.telemetry is not None else cmd
+
+    def _record_telemetry(self, stats, exit_status):
+        if self.telemetry is None or not self.rsv:
+            return
+        try:
+            self.telemetry.record(self.rsv, stats.records(exit_status))
+        except OSError as e:
+            # Telemetry is best effort; never fail a render over it
+            print(f"[Renderer] Could not record telemetry for {self.rsv}: {e}")
 
     def _render_karma_frame(self, shot_info: dict):
         """
-        Launch hython → adapters/houdini_adapter.py render-frame
+        Launch hython → adapters/houdini_adapter.py render-range for a single frame
         """
         frame = int(shot_info.get("frame", 1))
-        scene = self._scene_abs_path("Karma")
-        out_dir = self._render_output_dir()
-        out_file = out_dir / self._rf_filename(frame)
+        return self._render_karma_chunk([frame])[0]
 
-        cmd = [
-            HYTHON,
-            str(Path("adapters/houdini_adapter.py").resolve()),
-            "render-frame",
-            "--scene", str(scene),
-            "--output", str(out_file),
-            "--frame", str(frame),
-            "--width", str(self.settings.resolution_width),
-            "--height", str(self.settings.resolution_height),
-            "--camera", self.settings.camera,
-            "--light", self.settings.light,
+    def _render_karma_chunk(self, frames, on_frame=None):
+        """
+        Launch one hython for frames[0]..frames[-1]; the adapter builds the Karma
+        network once and reports each finished frame with a FRAME_DONE line.
+        """
+        cmd = self._chunk_cmd(frames)
+        print("[Renderer] Karma subprocess:", " ".join(cmd))
+        return self._run_chunk(cmd, frames, on_frame)
+
+    async def render_frames(self, frames, on_frame=None, on_output=None, frame_timeout: float | None = None):
+        """
+        asyncio counterpart of render_chunk: render frames[0]..frames[-1] in one
+        DCC subprocess without blocking the event loop.
+
+        on_frame(frame, path) is called as each frame finishes and
+        on_output(stream, line) for every stdout/stderr line as it is printed.
+        If frame_timeout is set and no frame finishes within that many seconds,
+        the process group is killed and TimeoutError raised. Cancelling the
+        awaiting task also kills the process group.
+        """
+        frames = list(frames)
+        cmd = self._chunk_cmd(frames)
+        returncode = None
+        stats = render_telemetry.ChunkTelemetry(frames)
+        proc = await asyncio.create_subprocess_exec(
+            *self._launch_cmd(cmd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, start_new_session=True
+        )
+        outputs = []
+        progress = asyncio.Event()
+
+        async def read(stream, name):
+            async for raw in stream:
+                line = raw.decode(errors="replace").rstrip("\n")
+                if name == "stdout" and stats.on_line(line):
+                    continue
+                if on_output:
+                    on_output(name, line)
+                match = FRAME_DONE_RE.search(line) if name == "stdout" else None
+                if match:
+                    frame, out_file = int(match.group(1)), Path(match.group(2).strip())
+                    outputs.append(out_file)
+                    stats.frame_done(frame, out_file)
+                    progress.set()
+                    if on_frame:
+                        on_frame(frame, out_file)
+
+        async def watchdog():
+            while True:
+                try:
+                    await asyncio.wait_for(progress.wait(), frame_timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No frame finished within {frame_timeout}s "
+                                       f"({len(outputs)} of {len(frames)} done)") from None
+                progress.clear()
+
+        readers = asyncio.ensure_future(asyncio.gather(read(proc.stdout, "stdout"), read(proc.stderr, "stderr")))
+        timer = asyncio.ensure_future(watchdog()) if frame_timeout else None
+        try:
+            await asyncio.wait({readers, timer} - {None}, return_when=asyncio.FIRST_COMPLETED)
+            if timer is not None and timer.done():
+                timer.result()  # raises TimeoutError
+            await readers
+            returncode = await proc.wait()
+        except BaseException:
+            self._kill_group(proc)
+            readers.cancel()
+            await asyncio.gather(readers, proc.wait(), return_exceptions=True)
+            returncode = proc.returncode
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._record_telemetry(stats, returncode)
+
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        if len(outputs) != len(frames):
+            raise RuntimeError(f"{Path(cmd[0]).name} reported {len(outputs)} of {len(frames)} frames "
+                               f"for {frames[0]}-{frames[-1]}")
+        return outputs
+
+    @staticmethod
+    def _kill_group(proc):
+        """Kill a subprocess started with start_new_session=True and everything it spawned."""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _serve_cmd(self) -> list:
+        """Command that starts a warm worker for this renderer's scene."""
+        if self.settings.renderer == "Arnold":
+            return [
+                self.mayapy,
+                str(ADAPTERS_DIR / "maya_adapter.py"),
+                "serve",
+                "--file", str(self._scene_abs_path("Arnold")),
+                "--scene", self.metadata.get('project_name'),
+            ]
+        return [
+            self.hython,
+            str(ADAPTERS_DIR / "houdini_adapter.py"),
+            "serve",
+            "--scene", str(self._scene_abs_path("Karma")),
         ]
 
-        print("[Renderer] Karma subprocess:", " ".join(cmd))
-        # Raise if hython fails
-        subprocess.run(cmd, check=True)
+    def _render_warm(self, frames, on_frame=None):
+        """Send each frame as a job to a warm worker from self.pool."""
+        out_dir = self._render_output_dir()
+        light = getattr(self.settings, "light", None)
+        cmd = self._serve_cmd()
+        worker = self.pool.acquire(cmd)
+        outputs = []
+        stats = render_telemetry.ChunkTelemetry(frames)  # wall time only: the worker outlives the frames
+        exit_status = None
+        try:
+            for frame in frames:
+                out_file = worker.render({
+                    "frame": frame,
+                    "output": str(out_dir / self._rf_filename(frame)),
+                    "camera": getattr(self.settings, "camera", None),
+                    "light": light if light != "None" else None,
+                    "width": self.settings.resolution_width,
+                    "height": self.settings.resolution_height,
+                    "ext": self.settings.output_format.lower(),
+                })
+                outputs.append(out_file)
+                stats.frame_done(frame, out_file)
+                if on_frame:
+                    on_frame(frame, out_file)
+            exit_status = 0
+        finally:
+            self.pool.release(cmd, worker)
+            self._record_telemetry(stats, exit_status)
+        return outputs
 
-        return out_file
+
+class WarmWorker:
+    """
+    A resident DCC process started with an adapter's `serve` command, speaking
+    the job protocol in adapters/worker_protocol.py over its stdin/stdout pipes.
+    """
+    def __init__(self, cmd: list):
+        self.cmd = cmd
+        self._next_id = 0
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+        self._read_reply()  # wait for the "ready" event once the scene is loaded
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def render(self, job: dict) -> Path:
+        """Send one job and block until the worker reports it; raises RuntimeError on failure."""
+        self._next_id += 1
+        job = dict(job, id=self._next_id)
+        self.proc.stdin.write(json.dumps(job) + "\n")
+        self.proc.stdin.flush()
+        while True:
+            reply = self._read_reply()
+            if reply.get("id") == job["id"]:
+                break
+        if reply.get("status") != "ok":
+            raise RuntimeError(f"Frame {job['frame']} failed on warm worker: {reply.get('error')}")
+        return Path(reply["output"])
+
+    def close(self):
+        if self.alive():
+            try:
+                self.proc.stdin.write(json.dumps({"cmd": "shutdown"}) + "\n")
+                self.proc.stdin.close()
+                self.proc.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+
+    def _read_reply(self) -> dict:
+        for line in self.proc.stdout:
+            reply = worker_protocol.parse(line.rstrip("\n"))
+            if reply is not None:
+                return reply
+            print(line, end="")  # DCC log output
+        raise RuntimeError(f"Warm worker exited with code {self.proc.wait()}: {' '.join(self.cmd)}")
+
+
+class WorkerPool:
+    """
+    Keeps warm workers alive between renders, keyed by the command that starts
+    them (DCC executable + adapter + scene), so later frames and later render
+    versions of the same scene skip DCC startup and scene load.
+    At most max_workers processes run per key; acquire() blocks when all are busy.
+    """
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or default_concurrency()
+        self._idle = {}
+        self._count = {}
+        self._cond = threading.Condition()
+
+    def acquire(self, cmd: list) -> WarmWorker:
+        key = tuple(cmd)
+        with self._cond:
+            while True:
+                idle = self._idle.setdefault(key, [])
+                while idle:
+                    worker = idle.pop()
+                    if worker.alive():
+                        return worker
+                    self._count[key] -= 1
+                if self._count.get(key, 0) < self.max_workers:
+                    self._count[key] = self._count.get(key, 0) + 1
+                    break
+                self._cond.wait()
+        try:
+            return WarmWorker(cmd)
+        except Exception:
+            with self._cond:
+                self._count[key] -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, cmd: list, worker: WarmWorker):
+        key = tuple(cmd)
+        with self._cond:
+            if worker.alive():
+                self._idle.setdefault(key, []).append(worker)
+            else:
+                self._count[key] -= 1
+            self._cond.notify()
+
+    def close(self):
+        """Shut down every idle worker."""
+        with self._cond:
+            workers = [w for idle in self._idle.values() for w in idle]
+            self._idle.clear()
+            self._count.clear()
+        for worker in workers:
+            worker.close()
+
+
+class RenderEngine:
+    """
+    Fans the frames of one render version out to a bounded pool of concurrent
+    DCC subprocesses.
+
+    Frames are grouped into contiguous chunks so one mayapy/hython launch can
+    render several of them: chunk_size=1 launches once per frame, a larger
+    value caps the frames per launch, and chunk_size=None sizes chunks
+    automatically from the measured per-frame time (see CHUNK_TARGET_SECONDS).
+
+    ordering picks the order frames are handed out in (see order_frames);
+    chunks only group frames that are consecutive in that order, so the
+    progressive orderings mostly launch one frame at a time until the fill-in.
+
+    Finished frames are recorded in the RenderManager and reported to every
+    subscriber as callback(done, total, frame). Callbacks run one at a time on
+    whichever thread rendered the frame (pool threads for run(), the event
+    loop thread for run_async()); UI code forwards them through a Qt signal
+    (see ui.workers.RenderWorker).
+    """
+    def __init__(self, renderer: Renderer, manager: "RenderManager | None" = None,
+                 max_workers: int | None = None, chunk_size: int | None = 1, ordering: str = "sequential"):
+        if ordering not in FRAME_ORDERINGS:
+            raise ValueError(f"Frame ordering '{ordering}' not supported. Choose from {FRAME_ORDERINGS}.")
+        self.renderer = renderer
+        self.manager = manager
+        self.max_workers = max_workers or default_concurrency()
+        self.chunk_size = chunk_size
+        self.ordering = ordering
+        self.failed = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._frame_seconds = []  # measured wall time per frame, for auto chunk sizing
+
+    def subscribe(self, callback):
+        """Register callback(done, total, frame), called once per finished frame."""
+        self._subscribers.append(callback)
+
+    def run(self, frames) -> list:
+        """
+        Render all frames, blocking until every subprocess has exited.
+        Returns the output paths of the frames that finished, in frame order.
+        Raises RuntimeError listing the failed frames if any render failed.
+        """
+        pending = deque(order_frames(frames, self.ordering))
+        self._total = len(pending)
+        self._done = 0
+        self._outputs = {}
+        self.failed = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    chunk = self._next_chunk(pending)
+                    running[pool.submit(self._render_chunk, chunk)] = chunk
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    chunk = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for frame in chunk:
+                            if frame not in self._outputs:
+                                self.failed[frame] = error
+
+        if self.failed:
+            raise RuntimeError(f"{len(self.failed)} frame(s) failed to render: {sorted(self.failed)}")
+        return [self._outputs[frame] for frame in sorted(self._outputs)]
+
+    async def run_async(self, frames, frame_timeout: float | None = None, on_output=None) -> list:
+        """
+        asyncio version of run(): up to max_workers chunks render at once through
+        Renderer.render_frames, so frames can time out (frame_timeout seconds
+        without progress) and cancelling the awaiting task kills every running
+        DCC process. With a warm worker pool, chunks run on executor threads and
+        cancellation stops dispatching new ones.
+        """
+        pending = deque(order_frames(frames, self.ordering))
+        self._total = len(pending)
+        self._done = 0
+        self._outputs = {}
+        self.failed = {}
+
+        running = {}
+        try:
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    chunk = self._next_chunk(pending)
+                    running[asyncio.ensure_future(self._render_chunk_async(chunk, frame_timeout, on_output))] = chunk
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    chunk = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        for frame in chunk:
+                            if frame not in self._outputs:
+                                self.failed[frame] = error
+        except asyncio.CancelledError:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+
+        if self.failed:
+            raise RuntimeError(f"{len(self.failed)} frame(s) failed to render: {sorted(self.failed)}")
+        return [self._outputs[frame] for frame in sorted(self._outputs)]
+
+    async def _render_chunk_async(self, chunk, frame_timeout, on_output):
+        if self.renderer.pool is not None:
+            return await asyncio.get_running_loop().run_in_executor(None, self._render_chunk, chunk)
+        start = time.monotonic()
+        await self.renderer.render_frames(chunk, on_frame=self._frame_done, on_output=on_output,
+                                          frame_timeout=frame_timeout)
+        with self._lock:
+            self._frame_seconds.append((time.monotonic() - start) / len(chunk))
+
+    def _next_chunk(self, pending) -> list:
+        """Pop the next run of consecutive frames off pending."""
+        size = self._chunk_limit(len(pending))
+        chunk = [pending.popleft()]
+        while pending and len(chunk) < size and pending[0] == chunk[-1] + 1:
+            chunk.append(pending.popleft())
+        return chunk
+
+    def _chunk_limit(self, remaining: int) -> int:
+        if self.chunk_size is not None:
+            return max(1, self.chunk_size)
+        if not self._frame_seconds:
+            return 1  # probe with single frames until there is a measurement
+        mean = sum(self._frame_seconds) / len(self._frame_seconds)
+        size = int(CHUNK_TARGET_SECONDS / max(mean, 1e-3))
+        # Never starve the other workers of frames at the tail of the range
+        size = min(size, math.ceil(remaining / self.max_workers), MAX_CHUNK_SIZE)
+        return max(1, size)
+
+    def _render_chunk(self, chunk):
+        start = time.monotonic()
+        self.renderer.render_chunk(chunk, on_frame=self._frame_done)
+        with self._lock:
+            self._frame_seconds.append((time.monotonic() - start) / len(chunk))
+
+    def _frame_done(self, frame, out_file):
+        # Recorded before taking the engine lock: the journal append and its
+        # file lock must not hold up the other workers' frames
+        if self.manager is not None and self.renderer.rsv:
+            self.manager.update_frame(self.renderer.rsv, frame, out_file)
+        with self._lock:
+            self._outputs[frame] = out_file
+            self._done += 1
+            for callback in self._subscribers:
+                callback(self._done, self._total, frame)
+
+
+def summarize_version(info) -> dict:
+    """Index entry for a render version: what listing versions needs without reading the version's file."""
+    settings = info.get("settings") or {}
+    frames = info.get("frames")
+    if not isinstance(frames, FrameSet):
+        frames = FrameSet.from_value(frames)
+    ranges = frames.ranges()
+    return {
+        "renderer": settings.get("renderer"),
+        "output_dir": settings.get("output_dir"),
+        "output_format": settings.get("output_format"),
+        "frame_range": list(info["frame_range"]) if info.get("frame_range") else None,
+        "frame_count": len(frames),
+        "first_frame": ranges[0][0] if ranges else None,
+        "last_frame": ranges[-1][1] if ranges else None,
+    }
+
+
+class RenderHistory(MutableMapping):
+    """
+    Render versions stored one file per version:
+
+        Config/renders/index.yaml    {versions: {rsv: summary}}, see summarize_version
+        Config/renders/rsv001.yaml   settings, frame_range, frames
+
+    Behaves as the {rsv: info} dict RenderManager.data["renders"] but only the
+    index is read up front. A version's file is read on first access and kept
+    in an LRU of cache_size versions. Frames journaled since the last
+    compaction (pending) are applied as a version loads, so evicting one never
+    loses frames. Versions changed in memory (dirty) stay loaded until flush()
+    writes them.
+    """
+    def __init__(self, directory, cache_size=None):
+        self.directory = Path(directory)
+        self.index_path = self.directory / RENDERS_INDEX
+        self.cache_size = cache_size if cache_size is not None else VERSION_CACHE_SIZE
+        self.index = self._read_index()
+        self.pending = {}  # {rsv: FrameSet} journaled, not yet in the version file
+        self.dirty = set()
+        self._cache = OrderedDict()
+        self.loads = 0  # version files read
+
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    def version_path(self, rsv) -> Path:
+        return self.directory / f"{rsv}.yaml"
+
+    def _read_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        return (read_yaml(self.index_path) or {}).get("versions") or {}
+
+    def _read_version(self, rsv) -> dict:
+        path = self.version_path(rsv)
+        info = (read_yaml(path) if path.exists() else None) or {}
+        info["frames"] = FrameSet.from_value(info.get("frames"))
+        if rsv in self.pending:
+            info["frames"].update(self.pending[rsv])
+        self.loads += 1
+        return info
+
+    def _evict(self):
+        for rsv in list(self._cache):  # least recently used first
+            if len(self._cache) <= self.cache_size:
+                break
+            if rsv not in self.dirty:
+                del self._cache[rsv]
+
+    def loaded(self) -> list:
+        return list(self._cache)
+
+    # --- Mapping ---
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(list(self.index))
+
+    def __contains__(self, rsv):
+        return rsv in self.index
+
+    def __getitem__(self, rsv):
+        if rsv in self._cache:
+            self._cache.move_to_end(rsv)
+            return self._cache[rsv]
+        if rsv not in self.index:
+            raise KeyError(rsv)
+        info = self._cache[rsv] = self._read_version(rsv)
+        self._evict()
+        return info
+
+    def __setitem__(self, rsv, info):
+        info["frames"] = FrameSet.from_value(info.get("frames"))
+        self._cache[rsv] = info
+        self._cache.move_to_end(rsv)
+        self.index[rsv] = summarize_version(info)
+        self.dirty.add(rsv)
+        self._evict()
+
+    def __delitem__(self, rsv):
+        raise TypeError("Render versions are never deleted.")
+
+    def summary(self, rsv) -> dict:
+        return self.index[rsv]
+
+    # --- Frames ---
+    def add_frame(self, rsv, frame) -> bool:
+        """Record a frame that is being journaled; False if the version already had it."""
+        added = self[rsv]["frames"].add(frame)
+        self.pending.setdefault(rsv, FrameSet()).add(frame)
+        return added
+
+    def add_pending(self, rsv, frame):
+        """A frame read back from the journal: applied now if the version is loaded, else when it loads."""
+        self.pending.setdefault(rsv, FrameSet()).add(frame)
+        if rsv in self._cache:
+            self._cache[rsv]["frames"].add(frame)
+
+    def might_contain(self, rsv, frame) -> bool:
+        """False only if the version certainly lacks frame; answered from the index and pending frames."""
+        summary = self.index[rsv]
+        if summary.get("first_frame") is not None and summary["first_frame"] <= frame <= summary["last_frame"]:
+            return True
+        return rsv in self.pending and frame in self.pending[rsv]
+
+    # --- Disk ---
+    def import_legacy(self, renders):
+        """Take versions from a single-file renders.yaml; they are written out split at the next flush()."""
+        for rsv, info in renders.items():
+            self[rsv] = info
+        self.cache_size = max(self.cache_size, len(self._cache))
+
+    def refresh(self):
+        """Pick up versions other processes added and frames they compacted into loaded versions."""
+        for rsv, summary in self._read_index().items():
+            if rsv not in self._cache and rsv not in self.dirty:
+                self.index[rsv] = summary
+        for rsv, info in self._cache.items():
+            path = self.version_path(rsv)
+            if path.exists():
+                info["frames"].update((read_yaml(path) or {}).get("frames"))
+
+    def flush(self):
+        """
+        Write every dirty version and every version with pending frames, then
+        the index. Call holding the renders lock, after refresh(), so the
+        files' current frames are already merged in.
+        """
+        for rsv in sorted(self.dirty | set(self.pending)):
+            if rsv not in self.index:
+                continue
+            info = self[rsv]
+            atomic_write_yaml(self.version_path(rsv), {**info, "frames": str(info["frames"])})
+            self.index[rsv] = summarize_version(info)
+        self.dirty.clear()
+        self.pending.clear()
+        atomic_write_yaml(self.index_path, {"versions": self.index})
+        self._evict()
+
+
+@dataclass(frozen=True, slots=True)
+class RenderOutput:
+    rsv: str
+    version: int
+    path: str
+    size: int
+    mtime: float
+
+
+class RenderOutputIndex:
+    """
+    Which output files exist for each frame, across every render version:
+
+        index.for_frame(12) -> [RenderOutput(rsv="rsv001", version=1, path=".../rf12v001.exr", ...), ...]
+
+    Stored as Config/renders/outputs.jsonl, one JSON line per written frame.
+    RenderManager.update_frame appends a line as each frame completes (a
+    re-rendered frame's later line wins) and queries are answered in memory,
+    reading only what other processes appended since. rebuild() re-derives
+    the whole index from one listing of each version's output folder.
+    """
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._by_frame = None  # {frame: {rsv: RenderOutput}}, loaded on first use
+        self._offset = 0  # bytes of the file already read
+        self._inode = None  # a rebuild replaces the file; then it is read again from the start
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _apply(self, line):
+        try:
+            r = json.loads(line)
+            output = RenderOutput(r["rsv"], int(r["version"]), r["path"], int(r["size"]), float(r["mtime"]))
+            self._by_frame.setdefault(int(r["frame"]), {})[output.rsv] = output
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    def refresh(self):
+        """Read the lines appended since the last read (all of them the first time, or after a rebuild elsewhere)."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+                size, inode = st.st_size, st.st_ino
+            except OSError:
+                size, inode = 0, None
+            if self._by_frame is None or inode != self._inode or size < self._offset:
+                self._by_frame, self._offset, self._inode = {}, 0, inode
+            if size == self._offset:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            complete = data.rfind(b"\n") + 1  # a line still being written is read next time
+            for line in data[:complete].decode().splitlines():
+                self._apply(line)
+            self._offset += complete
+
+    def record(self, rsv, frame, path, version=None):
+        """Add a finished frame's file; ignored if the file is not there (yet)."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        line = json.dumps({"frame": int(frame), "rsv": rsv, "version": rsv_version(rsv) if version is None else version,
+                           "path": os.fspath(path), "size": st.st_size, "mtime": st.st_mtime}) + "\n"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())  # one O_APPEND write: concurrent recorders never interleave
+        finally:
+            os.close(fd)
+
+    def for_frame(self, frame) -> list:
+        """Every recorded file of a frame, oldest version first."""
+        self.refresh()
+        return sorted(self._by_frame.get(int(frame), {}).values(), key=lambda o: (o.version, o.rsv))
+
+    @staticmethod
+    def _scan(rsv, folder, ext):
+        lines = []
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            return lines  # version never rendered, or its folder was removed
+        for entry in entries:
+            m = OUTPUT_NAME_RE.match(entry.name)
+            if not m or m["ext"].lower() != ext:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            lines.append(json.dumps({"frame": int(m["frame"]), "rsv": rsv, "version": int(m["version"]),
+                                     "path": entry.path, "size": st.st_size, "mtime": st.st_mtime}) + "\n")
+        return lines
+
+    def rebuild(self, folders):
+        """
+        Re-index from disk. folders is {rsv: (output folder, extension)}; each
+        folder is listed once, SCAN_WORKERS at a time, and the index file is
+        replaced atomically.
+        """
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            scans = list(pool.map(lambda item: self._scan(item[0], *item[1]), folders.items()))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for lines in scans:
+                    f.writelines(lines)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            self._by_frame = None
 
 
 class RenderManager:
-    def __init__(self, yaml_path):
+    """
+    Render versions and their finished frames.
+
+    State is Config/renders/ (see RenderHistory: an index plus one file per
+    version, loaded lazily) plus renders.journal next to it, an append-only
+    log of finished frames. update_frame only appends to the journal; every
+    JOURNAL_COMPACT_EVERY frames, and whenever a version is created, the
+    journal is folded into the versions it touched, each written atomically.
+    A project still holding a single renders.yaml is read from it and split
+    at the first write (renders.yaml is kept as renders.yaml.migrated).
+
+    Several processes may record into the same project at once: every write
+    holds renders.yaml.lock, and compaction first merges the versions and
+    frames other processes recorded, so no finished frame is lost.
+
+    A migrated project (Config/project.db next to yaml_path) is stored through
+    core.storage.SqliteBackend instead, one row per version and per frame, and
+    self.data["renders"] is a plain dict.
+
+    In memory each version's "frames" is a core.frameset.FrameSet; version
+    files store it range-encoded ("1-240,250-260x2"). Files written as plain
+    frame lists load the same way and are rewritten in the compact form.
+
+    New versions (RSV_CREATED) and newly finished frames (FRAME_COMPLETED)
+    are announced on the project's core.events bus once recorded, and each
+    finished frame's file goes into self.outputs (RenderOutputIndex), which
+    answers output_files(frame) for the gallery.
+
+    One manager may be shared by threads (RenderEngine records frames from
+    its pool threads while the UI reads versions): self._lock guards the
+    in-memory state and is never held while waiting for renders.yaml.lock,
+    so file and journal I/O do not serialize readers behind it.
+
+    attach_model(project) makes a core.models.Project (render versions plus a
+    FrameVersionTable of every finished frame) the manager's in-memory view
+    of the project; it is updated under self._lock as versions and frames are
+    recorded and saved in binary form as renders.model for the next open.
+    """
+    def __init__(self, yaml_path, backend=None):
         self.yaml_path = yaml_path
-        if os.path.exists(yaml_path):
-            with open(yaml_path, "r") as f:
-                self.data = yaml.safe_load(f) or {}
+        self.history_dir = Path(yaml_path).with_suffix("")
+        self.journal = RenderJournal(Path(yaml_path).with_suffix(".journal"))
+        self._file_lock = FileLock(f"{yaml_path}.lock")
+        self._lock = threading.RLock()  # taken after _file_lock or before a backend transaction, never the reverse
+        self._owns_backend = backend is None  # close() only closes a database this manager opened
+        self.backend = backend if backend is not None else open_backend(os.path.dirname(os.path.abspath(yaml_path)))
+        self.events = events.bus_for(os.path.dirname(os.path.abspath(yaml_path)))
+        self.outputs = RenderOutputIndex(self.history_dir / OUTPUTS_INDEX)
+        self.model_cache_path = Path(yaml_path).with_suffix(MODEL_CACHE_SUFFIX)
+        self.model = None  # core.models.Project kept current by this manager, see attach_model
+        self._model_changed = False  # since renders.model was written
+        if self.backend is not None:
+            self.data = self.backend.load_renders()
         else:
-            self.data = {}
+            history = RenderHistory(self.history_dir)
+            if not history.exists() and os.path.exists(yaml_path):
+                history.import_legacy((read_yaml(yaml_path) or {}).get("renders") or {})
+            self.data = {"renders": history}
         if "renders" not in self.data:
             self.data["renders"] = {}
+        self._replay()
+
+    def close(self):
+        """
+        Save the attached model if it changed, and close the project database if
+        this manager opened it; file-based projects hold nothing else open.
+        """
+        if self.model is not None and self._model_changed:
+            self._write_model_cache()
+        if self._owns_backend and self.backend is not None:
+            self.backend.close()
+
+    # --- Project model ---
+    def attach_model(self, project: Project) -> Project:
+        """
+        Fill project (a core.models.Project, e.g. ProjectConfig.model) with this
+        manager's render versions and finished frames, and keep them current as
+        versions are created and frames recorded here or picked up by refresh().
+        Starts from renders.model, so only versions whose frames changed since
+        it was written are read; it is rewritten when anything did, and on close().
+        """
+        cached = self._read_model_cache()
+        with self._lock:
+            if cached is not None:
+                project.set_renders(cached.render_settings_versions, cached.frame_versions)
+            else:
+                project.set_renders([], FrameVersionTable())
+            self.model = project
+            changed = self._sync_model() or cached is None
+        if changed:
+            self._write_model_cache()
+        return project
+
+    def _read_model_cache(self):
+        if not self.model_cache_path.exists():
+            return None
+        try:
+            return load_project_binary(self.model_cache_path)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            print(f"[RenderManager] Rebuilding unreadable {self.model_cache_path.name}: {e}")
+            return None
+
+    def _write_model_cache(self):
+        with self._lock:  # a consistent snapshot; the file is written outside the lock
+            data = self.model.to_bytes()
+            self._model_changed = False
+        try:
+            atomic_write_bytes(self.model_cache_path, data)
+        except OSError as e:
+            # The cache only saves time on the next open; never fail over it
+            print(f"[RenderManager] Could not write {self.model_cache_path.name}: {e}")
+
+    def _known_frames(self, rsv, known: FrameSet) -> FrameSet:
+        """
+        The version's finished frames. When the model's frames (known), less the
+        journaled ones, match the count in the index, they are the compacted
+        frames and the version file is not read.
+        """
+        history = self.history
+        if history is not None and rsv not in history.loaded():
+            pending = history.pending.get(rsv) or FrameSet()
+            if len(known.difference(pending)) == history.summary(rsv).get("frame_count"):
+                return known.union(pending)
+        return self._frame_set(rsv)
+
+    def _sync_model(self) -> bool:
+        """
+        Bring self.model's render versions and frame versions up to date with
+        self.data; True if anything changed. A model holding versions or frames
+        this manager does not have (renders.model from another state) is rebuilt.
+        """
+        project, rows, added = self.model, [], False
+        for rsv in sorted(self.data["renders"]):
+            model_rsv = project.render_settings_version(rsv)
+            if model_rsv is None:
+                info = self.data["renders"][rsv]
+                model_rsv = RenderSettingsVersion(rsv, info.get("settings") or {}, FrameSet(),
+                                                  tuple(info["frame_range"]) if info.get("frame_range") else None)
+                project.add_render_settings_version(model_rsv)
+                added = True
+            frames = self._known_frames(rsv, model_rsv.frames)
+            new = frames.difference(model_rsv.frames)
+            if len(frames) != len(model_rsv.frames) + len(new):
+                return self._rebuild_model()
+            if new:
+                (prefix, suffix), version = self._frame_path_parts(rsv), rsv_version(rsv)
+                rows.extend((frame, version, rsv, f"{prefix}{frame}{suffix}") for frame in new)
+                model_rsv.frames.update(new)
+        if len(project.render_settings_versions) != len(self.data["renders"]):
+            return self._rebuild_model()
+        if rows:
+            project.frame_versions.extend(rows)
+        return added or bool(rows)
+
+    def _rebuild_model(self) -> bool:
+        rsvs = []
+        for rsv in sorted(self.data["renders"]):
+            info = self.data["renders"][rsv]
+            rsvs.append(RenderSettingsVersion(rsv, info.get("settings") or {}, FrameSet(self._frame_set(rsv)),
+                                              tuple(info["frame_range"]) if info.get("frame_range") else None))
+        self.model.set_renders(rsvs, self.frame_version_table())
+        return True
+
+    @property
+    def history(self):
+        """The RenderHistory behind a YAML project, or None on a database backend."""
+        renders = self.data["renders"]
+        return renders if isinstance(renders, RenderHistory) else None
+
+    def _replay(self):
+        """Apply journaled frames (including ones other processes wrote since we loaded)."""
+        if self.backend is not None:
+            return
+        for rsv, frame in self.journal.replay():
+            if rsv not in self.data["renders"]:
+                continue
+            if self.history is not None:
+                self.history.add_pending(rsv, frame)
+            else:
+                self._add_frame(rsv, frame)
+
+    def _frame_set(self, rsv) -> FrameSet:
+        """The version's finished frames, converting a stored spec string or list in place."""
+        info = self.data["renders"][rsv]
+        frames = info.get("frames")
+        if not isinstance(frames, FrameSet):
+            frames = info["frames"] = FrameSet.from_value(frames)
+        return frames
+
+    def _add_frame(self, rsv, frame_number) -> bool:
+        """Add to the version's frame set; False if already there."""
+        if self.history is not None:
+            return self.history.add_frame(rsv, frame_number)
+        return self._frame_set(rsv).add(frame_number)
+
+    def _merge(self, data):
+        """Fold versions and frames recorded elsewhere into self.data."""
+        for rsv, info in (data or {}).get("renders", {}).items():
+            if rsv not in self.data["renders"]:
+                self.data["renders"][rsv] = info
+                self._frame_set(rsv)
+                continue
+            self._frame_set(rsv).update(info.get("frames"))
+
+    def refresh(self):
+        """Pick up versions and frames other processes have recorded since this manager loaded."""
+        if self.backend is not None:
+            data = self.backend.load_renders()
+            with self._lock:
+                self._merge(data)
+                if self.model is not None and self._sync_model():
+                    self._model_changed = True
+            return
+        with self._file_lock, self._lock:
+            self.history.refresh()
+            self._replay()
+            if self.model is not None and self._sync_model():
+                self._model_changed = True
 
     def _save(self):
-        with open(self.yaml_path, "w") as f:
-            yaml.safe_dump(self.data, f)
+        """Write the versions with new frames or settings (merged with what is on disk) and start a fresh journal."""
+        if self.backend is not None:
+            with self._lock:
+                for rsv, info in self.data["renders"].items():
+                    self.backend.put_render_version(rsv, info)
+            return
+        with self._file_lock:
+            self.refresh()
+            with self._lock:
+                self.history.flush()
+            self.journal.truncate()
+            if os.path.exists(self.yaml_path):  # single-file layout, now split
+                os.replace(self.yaml_path, f"{self.yaml_path}.migrated")
+
+    def compact(self):
+        """Fold the journal into the version files."""
+        self._save()
 
     def _next_render_version(self):
         existing = self.data.get("renders", {})
         versions = [int(k.replace("rsv", "")) for k in existing.keys() if k.startswith("rsv")]
         return f"rsv{max(versions, default=0)+1:03d}"
 
-    def new_render_version(self, settings: RenderSettings) -> str:
-        rsv = self._next_render_version()
-        settings_dict = {k: str(v) if isinstance(v, Path) else v for k, v in settings.__dict__.items()}
-        self.data["renders"][rsv] = {
-            "settings": settings_dict,
-            "frames": []
-        }
-        self._save()
+    def new_render_version(self, settings: RenderSettings, frame_range: tuple | None = None) -> str:
+        # Hold the lock (or a write transaction) from picking the number to writing it, so two
+        # processes never create the same rsv
+        first, second = ((self._lock, self.backend.transaction()) if self.backend is not None
+                         else (self._file_lock, self._lock))
+        with first, second:
+            self.refresh()
+            rsv = self._next_render_version()
+            settings_dict = {k: str(v) if isinstance(v, Path) else v for k, v in settings.__dict__.items()}
+            info = {
+                "settings": settings_dict,
+                "frames": FrameSet()
+            }
+            if frame_range:
+                info["frame_range"] = [int(frame_range[0]), int(frame_range[1])]
+            self.data["renders"][rsv] = info
+            if self.model is not None:
+                self.model.add_render_settings_version(
+                    RenderSettingsVersion(rsv, settings_dict, FrameSet(), tuple(info.get("frame_range") or ()) or None))
+                self._model_changed = True
+            if self.backend is not None:
+                self.backend.put_render_version(rsv, info)
+            else:
+                self._save()
+        if not self.outputs.exists():
+            self.rebuild_outputs()  # older project: index what is already on disk, once
+        self.events.emit(events.ProjectEvent(events.RSV_CREATED, rsv=rsv, frame_range=
+                                             tuple(info["frame_range"]) if frame_range else None))
         return rsv
 
-    def update_frame(self, rsv, frame_number):
+    def update_frame(self, rsv, frame_number, output_path=None):
+        """
+        Record a finished frame; output_path is the file written, frame_path()
+        if not given. Safe to call from several threads at once.
+        """
         if rsv not in self.data["renders"]:
-            raise ValueError(f"Render version {rsv} not found.")
-        if frame_number not in self.data["renders"][rsv]["frames"]:
-            self.data["renders"][rsv]["frames"].append(frame_number)
-            self.data["renders"][rsv]["frames"].sort()
-            self._save()
+            self.refresh()  # may have been created by another process
+        with self._lock:
+            if rsv not in self.data["renders"]:
+                raise ValueError(f"Render version {rsv} not found.")
+            frame_path = self.frame_path(rsv, frame_number)
+            added = self._add_frame(rsv, frame_number)
+            model_rsv = self.model.render_settings_version(rsv) if self.model is not None else None
+            if added and model_rsv is not None:
+                self.model.frame_versions.add(frame_number, rsv_version(rsv), rsv, str(frame_path))
+                model_rsv.frames.add(frame_number)
+                self._model_changed = True
+        if self.outputs.exists():  # also for frames already recorded: a re-render rewrote the file
+            self.outputs.record(rsv, frame_number, output_path or frame_path)
+        if not added:
+            return
+        if self.backend is not None:
+            self.backend.add_frame(rsv, frame_number, rsv_version(rsv), str(frame_path))
+        else:
+            with self._file_lock:  # so a compaction elsewhere cannot truncate the journal under this append
+                self.journal.append(rsv, frame_number)
+                if len(self.journal) >= JOURNAL_COMPACT_EVERY:
+                    self.compact()
+        self.events.emit(events.ProjectEvent(events.FRAME_COMPLETED, rsv=rsv, frame=frame_number))
 
     def get_render_versions(self):
-        return sorted(self.data["renders"].keys())
+        with self._lock:
+            return sorted(self.data["renders"].keys())
 
-    def get_frames(self, rsv):
-        if rsv not in self.data["renders"]:
-            raise ValueError(f"Render version {rsv} not found.")
-        return self.data["renders"][rsv]["frames"]
+    def get_frames(self, rsv) -> list:
+        return list(self.get_frame_set(rsv))
+
+    def get_frame_set(self, rsv) -> FrameSet:
+        """Finished frames of a render version as a FrameSet (a copy)."""
+        with self._lock:
+            if rsv not in self.data["renders"]:
+                raise ValueError(f"Render version {rsv} not found.")
+            return FrameSet(self._frame_set(rsv))
 
     def get_render_info(self, rsv):
-        if rsv not in self.data["renders"]:
-            raise ValueError(f"Render version {rsv} not found.")
-        return self.data["renders"][rsv]
+        with self._lock:
+            if rsv not in self.data["renders"]:
+                raise ValueError(f"Render version {rsv} not found.")
+            return self.data["renders"][rsv]
+
+    def get_summary(self, rsv) -> dict:
+        """
+        Renderer, output_dir, output_format, frame_range and frame counts of a
+        version (see summarize_version). On YAML projects this comes from the
+        index without loading the version; counts are as of the last compaction.
+        """
+        with self._lock:
+            if rsv not in self.data["renders"]:
+                raise ValueError(f"Render version {rsv} not found.")
+            if self.history is not None:
+                return dict(self.history.summary(rsv))
+            return summarize_version(self.data["renders"][rsv])
+
+    def frame_versions(self, frame_number) -> list:
+        """Every render version that finished frame_number, as core.models.FrameVersion."""
+        if self.model is not None:
+            with self._lock:
+                return self.model.frame_versions.for_frame(frame_number)
+        if self.backend is not None:
+            return self.backend.frame_versions(frame_number)
+        history = self.history
+        with self._lock:
+            candidates = [rsv for rsv in sorted(self.data["renders"])
+                          if history is None or history.might_contain(rsv, frame_number)]
+            return [FrameVersion(frame_number, rsv_version(rsv), rsv, str(self.frame_path(rsv, frame_number)))
+                    for rsv in candidates if frame_number in self._frame_set(rsv)]
+
+    def get_settings(self, rsv) -> RenderSettings:
+        """RenderSettings the render version was created with, e.g. to resume it."""
+        return RenderSettings.from_dict(self.get_render_info(rsv)["settings"])
+
+    def get_frame_range(self, rsv):
+        """(start, end) the render version was submitted with, or None for older versions."""
+        with self._lock:
+            frame_range = (self.history.summary(rsv) if self.history is not None and rsv in self.history
+                           else self.get_render_info(rsv)).get("frame_range")
+        return tuple(frame_range) if frame_range else None
+
+    def _frame_path_parts(self, rsv) -> tuple:
+        """(prefix, suffix) of the version's frame paths; the frame number goes between them."""
+        with self._lock:
+            if self.history is not None and rsv in self.history:
+                settings = self.history.summary(rsv)  # the index has the output settings; no need to load the version
+            else:
+                settings = self.get_render_info(rsv)["settings"]
+        ext = (settings.get("output_format") or "exr").lower()
+        return os.path.join(settings["output_dir"], rsv, "rf"), f"v{rsv_version(rsv):03d}.{ext}"
+
+    def frame_path(self, rsv, frame_number) -> Path:
+        """Where Renderer writes frame_number for this render version."""
+        prefix, suffix = self._frame_path_parts(rsv)
+        return Path(f"{prefix}{frame_number}{suffix}")
+
+    def rebuild_outputs(self):
+        """Re-index every version's output folder into self.outputs (one listing per folder, in parallel)."""
+        folders = {}
+        for rsv in self.get_render_versions():
+            prefix, suffix = self._frame_path_parts(rsv)
+            folders[rsv] = (os.path.dirname(prefix), suffix.rsplit(".", 1)[-1])
+        self.outputs.rebuild(folders)
+
+    def output_files(self, frame_number) -> list:
+        """RenderOutputs of every version's file for a frame, oldest version first; answered from the index."""
+        if not self.outputs.exists():
+            self.rebuild_outputs()
+        return self.outputs.for_frame(frame_number)
+
+    def frame_version_table(self) -> FrameVersionTable:
+        """Every finished frame of every version as a columnar core.models.FrameVersionTable."""
+        rows = []
+        with self._lock:
+            for rsv in self.get_render_versions():
+                (prefix, suffix), version = self._frame_path_parts(rsv), rsv_version(rsv)
+                rows.extend((frame, version, rsv, f"{prefix}{frame}{suffix}") for frame in self._frame_set(rsv))
+        return FrameVersionTable(rows)
+
+    def missing_frames(self, rsv, frames=None) -> list:
+        """
+        Frames of a render version that still need rendering: not recorded as
+        finished, or recorded but with a missing, truncated or corrupt file.
+        frames defaults to the version's stored frame range.
+        """
+        if frames is None:
+            frame_range = self.get_frame_range(rsv)
+            if frame_range is None:
+                raise ValueError(f"Render version {rsv} has no stored frame range; pass frames explicitly.")
+            frames = range(frame_range[0], frame_range[1] + 1)
+        done = self.get_frame_set(rsv)
+        return [f for f in frames if f not in done or not frame_file_ok(self.frame_path(rsv, f))]
@@ -0,0 +1,308 @@
+# core/scheduler.py
+"""
+Durable render job queue and scheduler.
+
+Jobs (project, shot, rsv, frames, priority) are kept in a YAML queue file under
+ROOT_DIR so they survive application restarts. The Scheduler hands out a few
+frames at a time: after every slice it picks again, so a higher-priority job
+submitted mid-render preempts at the next frame boundary, and jobs of equal
+priority share the farm fairly between projects, then between shots.
+"""
+import os
+import logging
+import argparse
+import itertools
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import List
+
+
+from core.frameset import FrameSet
+from core.project import ROOT_DIR
+from core.rendering import Renderer, RenderManager, RenderEngine, default_concurrency
+from core.storage import atomic_write_yaml, read_yaml, load_metadata, FileLock
+from core.telemetry import TelemetryStore
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = "render_queue.yaml"
+STATUSES = ["queued", "running", "done", "failed", "cancelled"]
+
+
+@dataclass
+class RenderJob:
+    id: str
+    project: str
+    project_dir: str
+    rsv: str
+    frames: List[int]
+    shot: str = ""
+    priority: int = 0  # higher renders first
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    status: str = "queued"
+    done: List[int] = field(default_factory=list)
+    failed: List[int] = field(default_factory=list)
+
+    def remaining(self) -> List[int]:
+        finished = set(self.done) | set(self.failed)
+        return [f for f in self.frames if f not in finished]
+
+
+class RenderQueue:
+    """
+    The queue file. Every mutation re-reads the file before writing it while
+    holding render_queue.yaml.lock, so the UI, the CLI and a running scheduler
+    can share one queue.
+    """
+    def __init__(self, path: str | None = None):
+        self.path = path or os.path.join(ROOT_DIR, QUEUE_FILE)
+        self._file_lock = FileLock(f"{self.path}.lock")
+        self.jobs = {}
+        self.served = {}  # frames dispatched to active work, {project: {shot: count}}, for fair share
+        self.load()
+
+    def load(self):
+        data = {}
+        if os.path.exists(self.path):
+            data = read_yaml(self.path) or {}
+        self.jobs = {job["id"]: RenderJob(**job) for job in data.get("jobs", [])}
+        self.served = data.get("served", {})
+        self._forget_idle()
+        return self
+
+    def save(self):
+        self._forget_idle()
+        atomic_write_yaml(self.path, {"jobs": [asdict(job) for job in self.jobs.values()], "served": self.served},
+                          sort_keys=False)
+
+    def _forget_idle(self):
+        """
+        Reset the counts of projects and shots with nothing queued or running, so
+        fair share weighs active work only and past renders never starve a project.
+        """
+        active = {(j.project, j.shot) for j in self.jobs.values() if j.status in ("queued", "running")}
+        served = {}
+        for project, shots in self.served.items():
+            kept = {shot: count for shot, count in shots.items() if (project, shot) in active}
+            if kept:
+                served[project] = kept
+        self.served = served
+
+    # --- Submission / control ---
+    def submit(self, project_dir, rsv, frames, shot="", priority=0) -> RenderJob:
+        with self._file_lock:
+            self.load()
+            next_id = max((int(j.replace("job", "")) for j in self.jobs), default=0) + 1
+            job = RenderJob(
+                id=f"job{next_id:04d}",
+                project=os.path.basename(os.path.normpath(project_dir)),
+                project_dir=str(project_dir),
+                rsv=rsv,
+                frames=[int(f) for f in frames],
+                shot=shot,
+                priority=int(priority),
+            )
+            self.jobs[job.id] = job
+            self.save()
+            return job
+
+    def cancel(self, job_id):
+        with self._file_lock:
+            self.load()
+            if job_id not in self.jobs:
+                raise ValueError(f"Render job {job_id} not found.")
+            if self.jobs[job_id].status in ("queued", "running"):
+                self.jobs[job_id].status = "cancelled"
+            self.save()
+
+    def set_priority(self, job_id, priority):
+        with self._file_lock:
+            self.load()
+            if job_id not in self.jobs:
+                raise ValueError(f"Render job {job_id} not found.")
+            self.jobs[job_id].priority = int(priority)
+            self.save()
+
+    def requeue_interrupted(self):
+        """Jobs left 'running' by a scheduler that died go back in the queue."""
+        with self._file_lock:
+            self.load()
+            for job in self.jobs.values():
+                if job.status == "running":
+                    job.status = "queued"
+            self.save()
+
+    # --- Scheduling ---
+    def next_job(self) -> RenderJob | None:
+        """
+        Highest priority first; among equals the project, then the shot, that has
+        been served the fewest frames; then the oldest submission.
+        """
+        self.load()
+        active = [j for j in self.jobs.values() if j.status in ("queued", "running") and j.remaining()]
+        if not active:
+            return None
+        top = max(j.priority for j in active)
+        active = [j for j in active if j.priority == top]
+
+        def project_share(job):
+            return sum(self.served.get(job.project, {}).values())
+
+        def shot_share(job):
+            return self.served.get(job.project, {}).get(job.shot, 0)
+
+        return min(active, key=lambda j: (project_share(j), shot_share(j), j.submitted_at, j.id))
+
+    def start_slice(self, job_id, frames):
+        """Mark frames of a job as dispatched."""
+        with self._file_lock:
+            self.load()
+            job = self.jobs[job_id]
+            job.status = "running"
+            shots = self.served.setdefault(job.project, {})
+            shots[job.shot] = shots.get(job.shot, 0) + len(frames)
+            self.save()
+
+    def finish_slice(self, job_id, done, failed):
+        """Record the outcome of a dispatched slice."""
+        with self._file_lock:
+            self.load()
+            job = self.jobs[job_id]
+            job.done = sorted(set(job.done) | set(done))
+            job.failed = sorted(set(job.failed) | set(failed))
+            if job.status == "running":
+                if job.remaining():
+                    job.status = "queued"
+                else:
+                    job.status = "failed" if job.failed else "done"
+            self.save()
+            return job
+
+    # --- Queue state for the UI / CLI ---
+    def summary(self, statuses=None) -> list:
+        self.load()
+        rows = []
+        for job in sorted(self.jobs.values(), key=lambda j: (-j.priority, j.submitted_at)):
+            if statuses and job.status not in statuses:
+                continue
+            rows.append({
+                "id": job.id,
+                "project": job.project,
+                "shot": job.shot,
+                "rsv": job.rsv,
+                "priority": job.priority,
+                "status": job.status,
+                "progress": f"{len(job.done)}/{len(job.frames)}",
+                "failed": len(job.failed),
+                "submitted_at": job.submitted_at,
+            })
+        return rows
+
+
+def engine_executor(job: RenderJob, frames) -> tuple:
+    """
+    Default executor: render frames of job through core.rendering.RenderEngine
+    with the render version's stored settings. Returns (done, failed).
+    """
+    metadata = load_metadata(os.path.join(job.project_dir, "Config"))
+    manager = RenderManager(os.path.join(job.project_dir, "Config", "renders.yaml"))
+    try:
+        renderer = Renderer(manager.get_settings(job.rsv), metadata=metadata, rsv=job.rsv,
+                            telemetry=TelemetryStore(os.path.join(job.project_dir, "Config")))
+        engine = RenderEngine(renderer, manager=manager, chunk_size=None)
+        try:
+            engine.run(frames)
+        except RuntimeError as e:
+            # Unfinished frames are reported as failed below; log why, with the first cause's traceback
+            causes = sorted({repr(error) for error in engine.failed.values()}) or [repr(e)]
+            logger.error("Job %s: %s frames %s failed: %s", job.id, job.rsv, FrameSet(sorted(engine.failed) or frames),
+                         "; ".join(causes), exc_info=next(iter(engine.failed.values()), e))
+        failed = sorted(engine.failed)
+        return [f for f in frames if f not in engine.failed], failed
+    finally:
+        manager.close()  # a scheduler runs many slices: do not leak a database connection per slice
+
+
+class Scheduler:
+    """
+    Pulls slices of frames off a RenderQueue and dispatches them to an executor,
+    executor(job, frames) -> (done_frames, failed_frames).
+    """
+    def __init__(self, queue: RenderQueue, executor=engine_executor, slice_size: int | None = None):
+        self.queue = queue
+        self.executor = executor
+        self.slice_size = slice_size or default_concurrency()
+
+    def run_once(self) -> RenderJob | None:
+        """Dispatch one slice of the job that should run next; None when the queue is empty."""
+        job = self.queue.next_job()
+        if job is None:
+            return None
+        frames = job.remaining()[:self.slice_size]
+        self.queue.start_slice(job.id, frames)
+        try:
+            done, failed = self.executor(job, frames)
+        except Exception as e:
+            print(f"[Scheduler] {job.id} slice {frames[0]}-{frames[-1]} failed: {e}")
+            done, failed = [], frames
+        return self.queue.finish_slice(job.id, done, failed)
+
+    def run(self, max_slices: int | None = None):
+        """Work through the queue until it is empty (or max_slices have been dispatched)."""
+        self.queue.requeue_interrupted()
+        for count in itertools.count():
+            if max_slices is not None and count >= max_slices:
+                break
+            if self.run_once() is None:
+                break
+
+
+def parse_frames(spec: str) -> List[int]:
+    """'1-10,15,20-26x2' → [1, ..., 10, 15, 20, 22, 24, 26]"""
+    return list(FrameSet(spec))
+
+
+def cli():
+    p = argparse.ArgumentParser(description="Render queue")
+    p.add_argument("--queue", default=None, help=f"Queue file (default: ROOT_DIR/{QUEUE_FILE})")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    ls = sub.add_parser("list")
+    ls.add_argument("--status", action="append", choices=STATUSES)
+
+    s = sub.add_parser("submit")
+    s.add_argument("--project-dir", required=True)
+    s.add_argument("--rsv", required=True)
+    s.add_argument("--frames", required=True, help="e.g. 1-100, 1-10,20 or 1-99x2")
+    s.add_argument("--shot", default="")
+    s.add_argument("--priority", type=int, default=0)
+
+    c = sub.add_parser("cancel")
+    c.add_argument("job_id")
+
+    pr = sub.add_parser("priority")
+    pr.add_argument("job_id")
+    pr.add_argument("priority", type=int)
+
+    sub.add_parser("run")
+
+    args = p.parse_args()
+    queue = RenderQueue(args.queue)
+
+    if args.cmd == "list":
+        for row in queue.summary(args.status):
+            print(f"{row['id']}  {row['status']:<9} p{row['priority']:<3} {row['project']}/{row['shot'] or '-'} "
+                  f"{row['rsv']}  {row['progress']} ({row['failed']} failed)")
+    elif args.cmd == "submit":
+        job = queue.submit(args.project_dir, args.rsv, parse_frames(args.frames), args.shot, args.priority)
+        print(f"Queued {job.id}")
+    elif args.cmd == "cancel":
+        queue.cancel(args.job_id)
+    elif args.cmd == "priority":
+        queue.set_priority(args.job_id, args.priority)
+    elif args.cmd == "run":
+        Scheduler(queue).run()
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,539 @@
+# core/storage.py
+"""
+Crash-safe storage for the pipeline's metadata files.
+
+atomic_write_yaml replaces a file in one step, so readers see either the old
+or the new content and never a half-written file. RenderJournal is the
+append-only log RenderManager writes finished frames to, so recording a frame
+costs one small append instead of re-serializing all of renders.yaml.
+
+FileLock serializes read-modify-write cycles across processes.
+
+read_yaml is the one way metadata YAML is parsed: a process-wide cache keyed
+by path and validated against the file's mtime/size/inode, so the many code
+paths that open the same project parse each file once, with libyaml's C
+loader when PyYAML was built with it.
+
+SqliteBackend is the alternative to the YAML files: one indexed database per
+project that ProjectConfig and RenderManager update a row at a time. A project
+uses it once Config/project.db exists (see migrate_yaml_project).
+"""
+import os
+import json
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+
+import yaml
+
+from core.models import FrameVersion, Project
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: locking becomes a no-op
+    fcntl = None
+
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
+
+def _clone(data):
+    """Copy of parsed YAML (dicts, lists and immutable scalars); much cheaper than copy.deepcopy."""
+    if isinstance(data, dict):
+        return {k: _clone(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_clone(v) for v in data]
+    return data
+
+
+class MetadataCache:
+    """
+    Parsed YAML files keyed by absolute path. An entry is reused while the
+    file's (mtime_ns, size, inode) is unchanged; atomic writes replace the
+    inode, so a rewrite is always noticed. Callers get their own copy and may
+    mutate it freely.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def load(self, path):
+        """Parsed content of path; raises FileNotFoundError like open()."""
+        key = os.path.abspath(path)
+        stamp = self._stamp(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return _clone(entry[1])
+            self.misses += 1
+        with open(key, "r") as f:
+            data = yaml.load(f, Loader=YamlLoader)
+        with self._lock:
+            self._entries[key] = (stamp, data)
+        return _clone(data)
+
+    def store(self, path, data):
+        """Record what was just written to path, so the writer's next read is a hit."""
+        key = os.path.abspath(path)
+        try:
+            stamp = self._stamp(key)
+        except OSError:
+            self.invalidate(key)
+            return
+        with self._lock:
+            self._entries[key] = (stamp, _clone(data))
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+
+METADATA_CACHE = MetadataCache()
+
+
+def read_yaml(path):
+    """Parsed YAML file through the process-wide METADATA_CACHE."""
+    return METADATA_CACHE.load(path)
+
+
+class FileLock:
+    """
+    Exclusive advisory lock (fcntl.flock) on a sidecar file such as
+    renders.yaml.lock, coordinating every process that writes the same
+    metadata. Re-entrant for the thread holding it, so locked methods can
+    call each other.
+
+        with FileLock(f"{path}.lock"):
+            ...read, modify, write path...
+    """
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._rlock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._rlock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._rlock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def atomic_write_yaml(path, data, **dump_kwargs):
+    """
+    Dump data to a temporary file next to path, flush it to disk and rename it
+    over path.
+    """
+    path = os.fspath(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            yaml.dump(data, f, Dumper=YamlDumper, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        METADATA_CACHE.store(path, data)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_bytes(path, data: bytes):
+    """Write data to a temporary file next to path, flush it to disk and rename it over path."""
+    path = os.fspath(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_project_binary(project: Project, path):
+    """Project in core.models' binary format; loads far faster than YAML for large projects."""
+    atomic_write_bytes(path, project.to_bytes())
+
+
+def load_project_binary(path) -> Project:
+    with open(path, "rb") as f:
+        return Project.from_bytes(f.read())
+
+
+class RenderJournal:
+    """
+    Frame-completion records, one JSON object per line:
+
+        {"rsv": "rsv003", "frame": 42}
+
+    Each record is written with a single O_APPEND write, so concurrent writers
+    never interleave and a crash can only leave a partial last line, which
+    replay() ignores.
+    """
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.entries = 0  # records since the last compaction, as far as this process knows
+
+    def __len__(self):
+        return self.entries
+
+    def append(self, rsv, frame):
+        line = json.dumps({"rsv": rsv, "frame": int(frame)}) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+        self.entries += 1
+
+    def replay(self) -> list:
+        """[(rsv, frame), ...] in the order they were journaled."""
+        if not os.path.exists(self.path):
+            self.entries = 0
+            return []
+        records = []
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # torn write from a crash; the frame is re-rendered on resume
+                try:
+                    record = json.loads(line)
+                    records.append((record["rsv"], int(record["frame"])))
+                except (ValueError, KeyError, TypeError):
+                    continue
+        self.entries = len(records)
+        return records
+
+    def truncate(self):
+        """Drop every record; call only once they are safely in the snapshot."""
+        if os.path.exists(self.path):
+            os.truncate(self.path, 0)
+        self.entries = 0
+
+
+# --- SQLite backend ---
+
+METADATA_FILE = "metadata.yaml"
+RENDERS_FILE = "renders.yaml"
+DB_FILE = "project.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS project (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL                 -- JSON
+);
+CREATE TABLE IF NOT EXISTS shots (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    frame_start INTEGER,
+    frame_end INTEGER
+);
+CREATE TABLE IF NOT EXISTS render_settings_versions (
+    id TEXT PRIMARY KEY,
+    settings TEXT NOT NULL,             -- JSON
+    frame_start INTEGER,
+    frame_end INTEGER
+);
+CREATE TABLE IF NOT EXISTS frame_versions (
+    render_settings_id TEXT NOT NULL REFERENCES render_settings_versions(id) ON DELETE CASCADE,
+    frame_number INTEGER NOT NULL,
+    version_number INTEGER NOT NULL,
+    output_path TEXT,
+    PRIMARY KEY (render_settings_id, frame_number)
+);
+CREATE INDEX IF NOT EXISTS frame_versions_by_frame ON frame_versions (frame_number);
+-- ProjectConfig's own renderSettings / renders entries
+CREATE TABLE IF NOT EXISTS project_render_settings (
+    id TEXT PRIMARY KEY,
+    settings TEXT NOT NULL              -- JSON
+);
+CREATE TABLE IF NOT EXISTS project_renders (
+    rsv TEXT NOT NULL,
+    frame_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS project_renders_by_rsv ON project_renders (rsv);
+"""
+
+
+def uses_database(config_dir) -> bool:
+    """True once a project's Config dir holds project.db."""
+    return os.path.exists(os.path.join(config_dir, DB_FILE))
+
+
+def open_backend(config_dir):
+    """SqliteBackend for a project whose Config dir holds project.db, else None (YAML files)."""
+    return SqliteBackend(os.path.join(config_dir, DB_FILE)) if uses_database(config_dir) else None
+
+
+def load_metadata(config_dir) -> dict:
+    """Project metadata from whichever backend the project uses."""
+    if uses_database(config_dir):
+        backend = open_backend(config_dir)
+        try:
+            return backend.load_metadata() or {}
+        finally:
+            backend.close()
+    return read_yaml(os.path.join(config_dir, METADATA_FILE)) or {}
+
+
+def save_metadata(config_dir, data):
+    if uses_database(config_dir):
+        backend = open_backend(config_dir)
+        try:
+            backend.save_metadata(data)
+        finally:
+            backend.close()
+    else:
+        atomic_write_yaml(os.path.join(config_dir, METADATA_FILE), data)
+
+
+class SqliteBackend:
+    """
+    Project storage in one SQLite database (Config/project.db) with tables
+    mirroring core.models: shots, render_settings_versions and frame_versions,
+    the last indexed by frame number.
+
+    ProjectConfig and RenderManager keep their in-memory dicts and call the
+    matching method here for each change, so a mutation is one small
+    transaction instead of a rewrite of the whole document.
+    """
+    def __init__(self, db_path):
+        self.path = os.fspath(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._depth = 0
+
+    def close(self):
+        self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group several changes into one atomic commit; nests."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    # --- Project metadata (ProjectConfig) ---
+    def load_metadata(self) -> dict | None:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM project").fetchall()
+            if not rows:
+                return None
+            data = {key: json.loads(value) for key, value in rows}
+            shots = self._conn.execute(
+                "SELECT id, frame_start, frame_end FROM shots ORDER BY position").fetchall()
+            data["shots"] = [shot for shot, _, _ in shots]
+            data["shot_struct"] = {shot: [start, end] for shot, start, end in shots if start is not None}
+            data["renderSettings"] = {rsv: json.loads(settings) for rsv, settings in
+                                      self._conn.execute("SELECT id, settings FROM project_render_settings")}
+            renders = {rsv: [] for rsv in data["renderSettings"]}
+            for rsv, frame_id in self._conn.execute("SELECT rsv, frame_id FROM project_renders ORDER BY rowid"):
+                renders.setdefault(rsv, []).append(frame_id)
+            data["renders"] = renders
+            return data
+
+    def save_metadata(self, data):
+        """Replace the whole project document."""
+        with self.transaction() as db:
+            db.execute("DELETE FROM project")
+            db.executemany("INSERT INTO project (key, value) VALUES (?, ?)", [
+                (key, json.dumps(value)) for key, value in data.items()
+                if key not in ("shots", "shot_struct", "renderSettings", "renders")
+            ])
+            db.execute("DELETE FROM shots")
+            shot_struct = data.get("shot_struct") or {}
+            for shot in list(data.get("shots") or []) + [s for s in shot_struct if s not in (data.get("shots") or [])]:
+                self.put_shot(shot, shot_struct.get(shot))
+            db.execute("DELETE FROM project_render_settings")
+            db.execute("DELETE FROM project_renders")
+            for rsv, settings in (data.get("renderSettings") or {}).items():
+                self.put_render_setting(rsv, settings)
+            for rsv, frame_ids in (data.get("renders") or {}).items():
+                db.executemany("INSERT INTO project_renders (rsv, frame_id) VALUES (?, ?)",
+                               [(rsv, frame_id) for frame_id in frame_ids])
+
+    def put_shot(self, shot, frame_range):
+        start, end = (frame_range or (None, None))[:2]
+        with self.transaction() as db:
+            position = db.execute("SELECT position FROM shots WHERE id = ?", (shot,)).fetchone()
+            if position is None:
+                position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM shots").fetchone()
+            db.execute("INSERT OR REPLACE INTO shots (id, position, frame_start, frame_end) VALUES (?, ?, ?, ?)",
+                       (shot, position[0], start, end))
+
+    def delete_shot(self, shot):
+        with self.transaction() as db:
+            db.execute("DELETE FROM shots WHERE id = ?", (shot,))
+            db.execute("DELETE FROM project_renders WHERE frame_id = ? OR frame_id LIKE ? ESCAPE '\\'",
+                       (shot, f"{shot}_".replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"))
+
+    def rename_shot(self, shot, new_name):
+        with self.transaction() as db:
+            db.execute("UPDATE shots SET id = ? WHERE id = ?", (new_name, shot))
+            db.execute("UPDATE project_renders SET frame_id = ? || substr(frame_id, ?) "
+                       "WHERE frame_id LIKE ? ESCAPE '\\'",
+                       (new_name, len(shot) + 1,
+                        f"{shot}_".replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"))
+
+    def put_render_setting(self, rsv, settings):
+        with self.transaction() as db:
+            db.execute("INSERT OR REPLACE INTO project_render_settings (id, settings) VALUES (?, ?)",
+                       (rsv, json.dumps(settings)))
+
+    def add_render(self, rsv, frame_id):
+        with self.transaction() as db:
+            db.execute("INSERT INTO project_renders (rsv, frame_id) VALUES (?, ?)", (rsv, frame_id))
+
+    # --- Render versions (RenderManager) ---
+    def load_renders(self) -> dict:
+        with self._lock:
+            renders = {}
+            for rsv, settings, start, end in self._conn.execute(
+                    "SELECT id, settings, frame_start, frame_end FROM render_settings_versions ORDER BY id"):
+                renders[rsv] = {"settings": json.loads(settings), "frames": []}
+                if start is not None:
+                    renders[rsv]["frame_range"] = [start, end]
+            for rsv, frame in self._conn.execute(
+                    "SELECT render_settings_id, frame_number FROM frame_versions "
+                    "ORDER BY render_settings_id, frame_number"):
+                renders[rsv]["frames"].append(frame)
+            return {"renders": renders}
+
+    def put_render_version(self, rsv, info):
+        frame_range = info.get("frame_range") or (None, None)
+        with self.transaction() as db:
+            db.execute("INSERT OR REPLACE INTO render_settings_versions (id, settings, frame_start, frame_end) "
+                       "VALUES (?, ?, ?, ?)", (rsv, json.dumps(info["settings"]), frame_range[0], frame_range[1]))
+
+    def add_frame(self, rsv, frame_number, version_number, output_path=None):
+        with self.transaction() as db:
+            db.execute("INSERT OR IGNORE INTO frame_versions "
+                       "(render_settings_id, frame_number, version_number, output_path) VALUES (?, ?, ?, ?)",
+                       (rsv, int(frame_number), int(version_number), output_path))
+
+    def frame_versions(self, frame_number) -> list:
+        """Every rendered version of one frame (an index lookup on frame_number)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT frame_number, version_number, render_settings_id, output_path FROM frame_versions "
+                "WHERE frame_number = ? ORDER BY render_settings_id", (int(frame_number),)).fetchall()
+        return [FrameVersion(*row) for row in rows]
+
+
+def migrate_yaml_project(project_dir) -> SqliteBackend:
+    """
+    Copy a YAML project (metadata.yaml, renders.yaml and its journal) into
+    Config/project.db. The database is built under a temporary name and
+    renamed into place, and the YAML files are then renamed to *.migrated so
+    nothing keeps reading stale copies.
+    """
+    from core.rendering import RenderManager, rsv_version  # rendering imports this module
+
+    config_dir = os.path.join(os.fspath(project_dir), "Config")
+    db_path = os.path.join(config_dir, DB_FILE)
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists; project is already migrated.")
+
+    metadata = read_yaml(os.path.join(config_dir, METADATA_FILE)) or {}
+    renders_path = os.path.join(config_dir, RENDERS_FILE)
+    manager = RenderManager(renders_path)
+
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    backend = SqliteBackend(tmp_path)
+    try:
+        with backend.transaction():
+            backend.save_metadata(metadata)
+            for rsv, info in manager.data["renders"].items():
+                backend.put_render_version(rsv, info)
+                for frame in info.get("frames", []):
+                    backend.add_frame(rsv, frame, rsv_version(rsv), str(manager.frame_path(rsv, frame)))
+        backend._conn.execute("PRAGMA journal_mode=DELETE")  # fold the WAL in before renaming
+        backend.close()
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        backend.close()
+        for path in (tmp_path, f"{tmp_path}-wal", f"{tmp_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    for path in (os.path.join(config_dir, METADATA_FILE), renders_path, manager.journal.path,
+                 os.fspath(manager.history_dir)):
+        if os.path.exists(path):
+            os.replace(path, f"{path}.migrated")
+    return SqliteBackend(db_path)
+
+
+def cli():
+    p = argparse.ArgumentParser(description="Project storage")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="Move a YAML project into Config/project.db")
+    m.add_argument("project_dir")
+    args = p.parse_args()
+
+    if args.cmd == "migrate":
+        migrate_yaml_project(args.project_dir).close()
+        print(f"Migrated {args.project_dir} to {os.path.join(args.project_dir, 'Config', DB_FILE)}")
+
+
+if __name__ == "__main__":
+    cli()
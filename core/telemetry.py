@@ -0,0 +1,195 @@
+# core/telemetry.py
+"""
+Per-frame render telemetry: wall time, CPU time, peak memory, exit status and
+output size of the DCC subprocesses.
+
+Renderer launches the DCC through this file run as a script
+(`python core/telemetry.py -- <cmd>`). The wrapper reaps the DCC with wait4
+and prints its resource usage as a final "[TELEMETRY] {...}" line on the
+shared stdout. CPU time covers the DCC and the children it waited for;
+peak_rss_kb_max_process is the largest resident set of any one of those
+processes (ru_maxrss is a per-process high-water mark, not the sum over the
+process tree), and children the DCC never waited for, such as daemonized
+render slaves, are not counted at all.
+
+Records are appended, one JSON object per line, to
+Config/telemetry/<rsv>.jsonl next to renders.yaml.
+"""
+import os
+import sys
+import json
+import time
+import socket
+from datetime import datetime
+from pathlib import Path
+
+PREFIX = "[TELEMETRY] "
+WRAPPER = str(Path(__file__).resolve())
+TELEMETRY_DIR = "telemetry"
+
+
+def wrap_command(cmd: list) -> list:
+    """cmd, launched through the telemetry wrapper."""
+    return [sys.executable, WRAPPER, "--", *cmd]
+
+
+def parse(line: str):
+    """Return the usage dict carried by a wrapper line, or None for anything else."""
+    if not line.startswith(PREFIX):
+        return None
+    return json.loads(line[len(PREFIX):])
+
+
+class ChunkTelemetry:
+    """
+    Collects telemetry for one DCC launch rendering one or more frames.
+    Per-frame wall time is the gap between FRAME_DONE reports (the first frame
+    also carries DCC startup); CPU time is split evenly across the frames and
+    peak RSS is that of the launch's largest process.
+    """
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.usage = None
+        self.wall = {}
+        self.outputs = {}
+        self._start = self._last = time.monotonic()
+
+    def on_line(self, line: str) -> bool:
+        """Feed a stdout line; True if it was the wrapper's report."""
+        usage = parse(line)
+        if usage is not None:
+            self.usage = usage
+        return usage is not None
+
+    def frame_done(self, frame, output):
+        now = time.monotonic()
+        self.wall[frame] = now - self._last
+        self.outputs[frame] = output
+        self._last = now
+
+    def records(self, exit_status: int | None) -> list:
+        usage = self.usage or {}
+        share = 1 / max(len(self.frames), 1)
+        if exit_status is None:
+            exit_status = usage.get("exit_status")
+        host = socket.gethostname()
+        records = []
+        for frame in self.frames:
+            output = self.outputs.get(frame)
+            try:
+                size = os.path.getsize(output) if output else 0
+            except OSError:
+                size = 0
+            records.append({
+                "frame": frame,
+                "ok": frame in self.outputs,
+                "wall_seconds": round(self.wall.get(frame, time.monotonic() - self._last), 4),
+                "user_cpu_seconds": round(usage["user_cpu_seconds"] * share, 4) if usage else None,
+                "system_cpu_seconds": round(usage["system_cpu_seconds"] * share, 4) if usage else None,
+                "peak_rss_kb_max_process": usage.get("peak_rss_kb_max_process"),
+                "exit_status": exit_status,
+                "output_bytes": size,
+                "chunk_size": len(self.frames),
+                "host": host,
+                "recorded_at": datetime.now().isoformat(),
+            })
+        return records
+
+
+class TelemetryStore:
+    """Append-only per-rsv telemetry files plus the queries used to size farm slots."""
+    def __init__(self, config_dir):
+        self.dir = Path(config_dir) / TELEMETRY_DIR
+
+    def _path(self, rsv) -> Path:
+        return self.dir / f"{rsv}.jsonl"
+
+    def record(self, rsv, records):
+        if not records:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(r) + "\n" for r in records)
+        # One O_APPEND write per batch so concurrent renderers do not interleave lines
+        fd = os.open(self._path(rsv), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode())
+        finally:
+            os.close(fd)
+
+    def rsvs(self) -> list:
+        return sorted(p.stem for p in self.dir.glob("*.jsonl")) if self.dir.exists() else []
+
+    def load(self, rsv=None) -> list:
+        """All records of one render version, or of every version when rsv is None."""
+        records = []
+        for name in ([rsv] if rsv else self.rsvs()):
+            path = self._path(name)
+            if not path.exists():
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    if line.endswith("\n"):  # skip a line still being written
+                        records.append(dict(json.loads(line), rsv=name))
+        return records
+
+    # --- Queries ---
+    def slowest_frames(self, rsv=None, n=10) -> list:
+        finished = [r for r in self.load(rsv) if r["ok"]]
+        return sorted(finished, key=lambda r: r["wall_seconds"], reverse=True)[:n]
+
+    def mean_frame_time(self, rsv=None, frames=None) -> float | None:
+        wanted = set(frames) if frames is not None else None
+        times = [r["wall_seconds"] for r in self.load(rsv)
+                 if r["ok"] and (wanted is None or r["frame"] in wanted)]
+        return sum(times) / len(times) if times else None
+
+    def mean_per_shot(self, shot_struct: dict, rsv=None) -> dict:
+        """{shot: mean seconds per frame} using the shot frame ranges from project metadata."""
+        records = [r for r in self.load(rsv) if r["ok"]]
+        means = {}
+        for shot, (start, end) in shot_struct.items():
+            times = [r["wall_seconds"] for r in records if start <= r["frame"] <= end]
+            if times:
+                means[shot] = sum(times) / len(times)
+        return means
+
+    def peak_rss_kb_max_process(self, rsv=None) -> int | None:
+        """Largest resident set of any single process of any DCC launch (see the module docstring)."""
+        peaks = [r.get("peak_rss_kb_max_process") or r.get("peak_rss_kb") for r in self.load(rsv)]  # older records
+        peaks = [p for p in peaks if p]
+        return max(peaks) if peaks else None
+
+    def summary(self, rsv=None) -> dict:
+        records = self.load(rsv)
+        finished = [r for r in records if r["ok"]]
+        return {
+            "frames": len(finished),
+            "failed": len(records) - len(finished),
+            "mean_seconds": self.mean_frame_time(rsv),
+            "cpu_seconds": sum((r["user_cpu_seconds"] or 0) + (r["system_cpu_seconds"] or 0) for r in records),
+            "peak_rss_kb_max_process": self.peak_rss_kb_max_process(rsv),
+            "output_bytes": sum(r["output_bytes"] for r in finished),
+        }
+
+
+def _exec_and_report(cmd):
+    """Run cmd to completion and print its resource usage; exit with its status."""
+    start = time.monotonic()
+    pid = os.posix_spawnp(cmd[0], cmd, os.environ)
+    _, status, usage = os.wait4(pid, 0)
+    exit_status = os.waitstatus_to_exitcode(status)
+    print(PREFIX + json.dumps({
+        "wall_seconds": round(time.monotonic() - start, 4),
+        "user_cpu_seconds": usage.ru_utime,
+        "system_cpu_seconds": usage.ru_stime,
+        "peak_rss_kb_max_process": usage.ru_maxrss,  # kilobytes on Linux; the largest process, not the tree
+        "exit_status": exit_status,
+    }), flush=True)
+    sys.exit(exit_status if exit_status >= 0 else 128 - exit_status)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "--":
+        print("usage: telemetry.py -- <command> [args...]", file=sys.stderr)
+        sys.exit(2)
+    _exec_and_report(sys.argv[2:])
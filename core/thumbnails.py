@@ -0,0 +1,162 @@
+# core/thumbnails.py
+"""
+Persistent thumbnail cache for rendered frames.
+
+Thumbnails are small PNGs under Config/thumbnails/, named by a hash of the
+source image's path, mtime and size (and the thumbnail size), so a frame is
+decoded and scaled once and every later gallery open reads the small file. A
+re-rendered frame gets a new key; its stale thumbnail simply ages out. EXR
+frames are read at a mip level (or every Nth row and column) near the
+thumbnail size and shown through the gallery's default sRGB view transform.
+
+The cache is bounded by THUMBNAIL_CACHE_BYTES: each hit touches the file's
+mtime and, when a new thumbnail pushes the total over the limit, the least
+recently used ones are deleted. Several processes may share the directory;
+thumbnails are written atomically and eviction tolerates files vanishing.
+"""
+import os
+import hashlib
+import tempfile
+import threading
+
+from PIL import Image
+
+from core import exr
+from core.imagecache import decode_image, display_view, preview_step
+
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_SIZE = (120, 80)
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ThumbnailCache:
+    def __init__(self, directory, max_bytes=None, size=None):
+        self.directory = os.fspath(directory)
+        self.max_bytes = THUMBNAIL_CACHE_BYTES if max_bytes is None else max_bytes
+        self.size = tuple(size or THUMBNAIL_SIZE)
+        self.hits = 0
+        self.misses = 0
+        self._total = None  # bytes on disk, counted on first write
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_project(cls, project_dir, **kwargs) -> "ThumbnailCache":
+        return cls(os.path.join(project_dir, "Config", THUMBNAIL_DIR), **kwargs)
+
+    def key(self, image_path):
+        """Cache key of an image as it is now; None if it does not exist."""
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        ident = f"{os.path.abspath(image_path)}\0{st.st_mtime_ns}\0{st.st_size}\0{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(ident.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def get(self, image_path):
+        """Path of the cached thumbnail, or None if there is none yet."""
+        key = self.key(image_path)
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        self.hits += 1
+        return path
+
+    def thumbnail(self, image_path):
+        """
+        Path of the thumbnail of image_path, generating it on a miss. None if
+        the image is missing or cannot be decoded.
+        """
+        cached = self.get(image_path)
+        if cached is not None:
+            return cached
+        key = self.key(image_path)
+        if key is None:
+            return None
+        self.misses += 1
+        try:
+            thumb = self._render(image_path)
+        except Exception as e:
+            print(f"[Thumbnails] Cannot read {image_path}: {e}")
+            return None
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                thumb.save(f, "PNG")
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self._added(os.path.getsize(path))
+        return path
+
+    def _entries(self):
+        """(mtime, size, path) of every thumbnail on disk."""
+        entries = []
+        for dirpath, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        return entries
+
+    def _render(self, image_path) -> Image.Image:
+        if exr.is_exr(image_path):
+            width, height = exr.read_header(image_path).size
+            pixels = decode_image(image_path, preview_step((height, width), self.size))
+            im = Image.fromarray(display_view(pixels))
+            im.thumbnail(self.size)
+            return im
+        with Image.open(image_path) as im:
+            im.draft("RGB", self.size)  # JPEG: decode at reduced scale
+            im.thumbnail(self.size)
+            return im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+
+    def _added(self, nbytes):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += nbytes
+            if self._total > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Delete least recently used thumbnails until the cache fits in max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # removed by another process
+            total -= size
+        self._total = total
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._total = 0
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
@@ -2,11 +2,11 @@ import sys
 import os
 import subprocess
 from pathlib import Path
-import yaml
 
 from pxr import Usd, UsdGeom
 
-from core.models import Project, Shot, RenderSettingsVersion, FrameVersion
+from core.models import Project
+from core.storage import atomic_write_yaml, read_yaml, save_project_binary, load_project_binary
 
 
 MAYAPY = "/opt/autodesk/maya2023/bin/mayapy"
@@ -77,13 +77,10 @@ def get_default_render_path(project_path: str):
     return render_path
 
 def save_project_to_yaml(project: Project, filepath: str):
-    with open(filepath, "w") as f:
-        yaml.dump(project.__dict__, f, sort_keys=False)
+    atomic_write_yaml(filepath, project.to_dict(), sort_keys=False)
 
 def load_project_from_yaml(filepath: str) -> Project:
-    with open(filepath, "r") as f:
-        data = yaml.safe_load(f)
-    return Project(**data)
+    return Project.from_dict(read_yaml(filepath))
 
 def list_cameras_in_usd(usd_path: str):
     """
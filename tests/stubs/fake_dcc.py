@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Stand-in for mayapy / hython in tests.
+
+Invoked exactly like the real executables: fake_dcc.py <adapter.py> <command> [args].
+Writes a small placeholder image with a valid header for every requested frame.
+FAKE_DCC_SLEEP (seconds per frame) and FAKE_DCC_FAIL_FRAMES (comma separated)
+control timing and failures; FAKE_DCC_LOG names a file that gets one
+"<pid> <argv>" line per launch.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+HEADERS = {
+    "exr": b"\x76\x2f\x31\x01",
+    "png": b"\x89PNG\r\n\x1a\n",
+    "jpeg": b"\xff\xd8\xff",
+}
+
+
+class FrameFailed(Exception):
+    pass
+
+
+def write_frame(path, frame):
+    if str(frame) in os.environ.get("FAKE_DCC_FAIL_FRAMES", "").split(","):
+        print(f"[FAKE] ERROR: frame {frame} failed", file=sys.stderr)
+        raise FrameFailed(f"frame {frame} failed")
+    time.sleep(float(os.environ.get("FAKE_DCC_SLEEP", "0")))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = HEADERS.get(path.suffix.lstrip(".").lower(), b"")
+    path.write_bytes(header + b"\0" * 64)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("adapter")
+    parser.add_argument("command")
+    args, rest = parser.parse_known_args(argv)
+
+    log = os.environ.get("FAKE_DCC_LOG")
+    if log:
+        with open(log, "a") as f:
+            f.write(f"{os.getpid()} " + " ".join(argv) + "\n")
+
+    opts = argparse.ArgumentParser()
+    opts.add_argument("--outputr")
+    opts.add_argument("--output")
+    opts.add_argument("--startf", type=int)
+    opts.add_argument("--endf", type=int)
+    opts.add_argument("--frame", type=int)
+    opts.add_argument("--start", type=int)
+    opts.add_argument("--end", type=int)
+    opts, _ = opts.parse_known_args(rest)
+
+    if args.command == "render":
+        for frame in range(opts.startf, opts.endf + 1):
+            if "{frame}" in opts.outputr:
+                output = opts.outputr.format(frame=frame)
+                write_frame(output, frame)
+                print(f"[MAYA] FRAME_DONE {frame} {output}", flush=True)
+            else:
+                write_frame(opts.outputr, frame)
+    elif args.command == "render-frame":
+        write_frame(opts.output, opts.frame)
+    elif args.command == "render-range":
+        for frame in range(opts.start, opts.end + 1):
+            output = opts.output.format(frame=frame)
+            write_frame(output, frame)
+            print(f"[HOUDINI] FRAME_DONE {frame} {output}", flush=True)
+    elif args.command == "serve":
+        # Fake warm worker: the real job loop from the adapters, rendering placeholders
+        sys.path.insert(0, str(Path(args.adapter).parent))
+        from worker_protocol import serve
+
+        def render_job(job):
+            write_frame(job["output"], job["frame"])
+            return job["output"]
+
+        print("[FAKE] scene loaded")  # log noise the client must skip
+        serve(render_job)
+    else:
+        print(f"[FAKE] unknown command {args.command}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    try:
+        main(sys.argv[1:])
+    except FrameFailed:
+        sys.exit(1)
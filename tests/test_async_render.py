@@ -0,0 +1,100 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from core.rendering import RenderSettings, Renderer, RenderManager, RenderEngine
+
+FAKE_DCC = str(Path(__file__).parent / "stubs" / "fake_dcc.py")
+
+
+@pytest.fixture
+def renderer(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_LOG", str(tmp_path / "launches.log"))
+    (tmp_path / "Scene").mkdir()
+    (tmp_path / "Scene" / "scene.mb").write_bytes(b"")
+    (tmp_path / "Config").mkdir()
+    project = {"project_name": "TestProject", "project_dir": str(tmp_path), "scene_file": ["scene.mb"]}
+    settings = RenderSettings("Arnold", 24, tmp_path / "Renders")
+    return Renderer(settings, metadata=project, rsv="rsv001", mayapy=FAKE_DCC)
+
+
+def launched_pids(tmp_path):
+    return [int(line.split()[0]) for line in (tmp_path / "launches.log").read_text().splitlines()]
+
+
+def assert_dead(pid):
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def test_render_frames_streams_output(renderer):
+    lines, done = [], []
+    outputs = asyncio.run(renderer.render_frames(
+        [1, 2, 3],
+        on_frame=lambda frame, path: done.append(frame),
+        on_output=lambda stream, line: lines.append((stream, line)),
+    ))
+
+    assert [p.name for p in outputs] == ["rf1v001.exr", "rf2v001.exr", "rf3v001.exr"]
+    assert done == [1, 2, 3]
+    assert ("stdout", f"[MAYA] FRAME_DONE 2 {outputs[1]}") in lines
+
+
+def test_frame_timeout_kills_hung_render(renderer, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_SLEEP", "30")
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(renderer.render_frames([1], frame_timeout=0.5))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 2
+    assert_dead(launched_pids(tmp_path)[0])
+
+
+def test_timeout_resets_after_each_frame(renderer, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_SLEEP", "0.3")
+    # 4 x 0.3s exceeds the timeout overall, but every single frame is within it
+    outputs = asyncio.run(renderer.render_frames([1, 2, 3, 4], frame_timeout=1.0))
+    assert len(outputs) == 4
+
+
+def test_cancel_kills_process_group(renderer, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_SLEEP", "30")
+
+    async def cancel_soon():
+        task = asyncio.ensure_future(renderer.render_frames([1, 2]))
+        await asyncio.sleep(0.5)
+        start = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.monotonic() - start
+
+    assert asyncio.run(cancel_soon()) < 1
+    assert_dead(launched_pids(tmp_path)[0])
+
+
+def test_engine_run_async_cancellation(renderer, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_SLEEP", "30")
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    renderer.rsv = manager.new_render_version(renderer.settings)
+    engine = RenderEngine(renderer, manager=manager, max_workers=3, chunk_size=1)
+
+    async def cancel_soon():
+        task = asyncio.ensure_future(engine.run_async(range(1, 10)))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_soon())
+
+    pids = launched_pids(tmp_path)
+    assert len(pids) == 3  # only max_workers chunks were ever started
+    for pid in pids:
+        assert_dead(pid)
+    assert manager.get_frames(renderer.rsv) == []
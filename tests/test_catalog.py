@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import pytest
+
+import core.catalog
+import core.project
+from core.catalog import ProjectCatalog, CATALOG_FILE
+from core.project import ProjectConfig, SceneProject
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setattr(core.project, "ROOT_DIR", str(tmp_path))
+    for name, shots in [("ShowReel", 3), ("Shorts", 1), ("Commercial", 0)]:
+        config = ProjectConfig(name, str(tmp_path / name))
+        config.add_shots({f"SH{i:03d}": [1, 10] for i in range(shots)})
+    return tmp_path
+
+
+def test_rebuild_scans_root(root):
+    catalog = ProjectCatalog(str(root))
+    entries = catalog.projects()  # no catalog yet: stale, so it scans
+    assert [(e["tag"], e["shot_count"]) for e in entries] == [("@Commercial", 0), ("@Shorts", 1), ("@ShowReel", 3)]
+    assert (root / CATALOG_FILE).exists()
+    assert catalog.get("@Shorts")["created_by"] == "ADMIN"
+    assert not catalog.is_stale()
+
+
+def test_search_ranks_prefix_then_fuzzy(root):
+    catalog = ProjectCatalog(str(root))
+    assert [e["name"] for e in catalog.search("@sh")] == ["Shorts", "ShowReel"]
+    assert [e["name"] for e in catalog.search("real")] == []
+    assert [e["name"] for e in catalog.search("srl")] == ["ShowReel"]  # letters in order
+    assert [e["name"] for e in catalog.search("comercial")] == ["Commercial"]  # typo
+
+
+def test_stale_when_projects_change_behind_its_back(root, monkeypatch):
+    catalog = ProjectCatalog(str(root))
+    catalog.rebuild()
+    shutil.rmtree(root / "Shorts")
+    ProjectConfig("Archive", str(root / "Archive"))
+    assert catalog.is_stale()
+    assert [e["name"] for e in catalog.projects()] == ["Archive", "Commercial", "ShowReel"]
+
+    monkeypatch.setattr(core.catalog, "CATALOG_MAX_AGE", -1)
+    assert catalog.is_stale()
+
+
+def test_search_without_refresh_never_scans(root, monkeypatch):
+    catalog = ProjectCatalog(str(root))
+    catalog.rebuild()
+    ProjectConfig("Shorter", str(root / "Shorter"))  # not in the catalog yet
+    monkeypatch.setattr(ProjectCatalog, "is_stale", lambda *a: pytest.fail("checked staleness"))
+    assert "Shorter" not in [e["name"] for e in catalog.search("short", refresh=False)]
+
+
+def test_rebuild_rereads_only_changed_projects(root, monkeypatch):
+    catalog = ProjectCatalog(str(root))
+    catalog.rebuild()
+    ProjectConfig("ShowReel", str(root / "ShowReel")).add_shot("SH100", [1, 5])
+
+    read = []
+    real_load = core.catalog.load_metadata
+    monkeypatch.setattr(core.catalog, "load_metadata", lambda d: read.append(d) or real_load(d))
+    catalog.rebuild()
+    assert read == [os.path.join(str(root), "ShowReel", "Config")]
+    assert catalog.get("ShowReel")["shot_count"] == 4
+
+
+def test_scene_project_records_new_and_opened_projects(root, tmp_path_factory):
+    scene = tmp_path_factory.mktemp("src") / "shot.usda"
+    scene.write_text("#usda 1.0\n")
+    sp = SceneProject()
+    sp.create_new("Teaser", str(scene), "usd")
+
+    data = ProjectCatalog(str(root))._read()
+    assert data["projects"]["Teaser"]["tag"] == "@Teaser"
+    assert data["scanned_at"] is None  # recorded, not scanned
+
+    ProjectConfig("Teaser", str(root / "Teaser")).add_shot("SH010", [1, 10])
+    sp.load_existing("@Teaser")
+    assert ProjectCatalog(str(root))._read()["projects"]["Teaser"]["shot_count"] == 1
+    assert [e["name"] for e in sp.list_projects("tea")] == ["Teaser"]
@@ -0,0 +1,110 @@
+import pytest
+
+from core import events
+from core.events import EventBus, ProjectEvent, bus_for
+from core.project import ProjectConfig
+from core.rendering import RenderManager, RenderSettings
+from core.storage import SqliteBackend, load_metadata, DB_FILE
+
+
+@pytest.fixture
+def config(tmp_path):
+    return ProjectConfig("Events", str(tmp_path))
+
+
+def record(bus):
+    received = []
+    bus.subscribe(received.append)
+    return received
+
+
+def test_bus_filters_and_unsubscribes():
+    bus = EventBus()
+    received, shots = [], []
+    unsubscribe = bus.subscribe(received.append)
+    bus.subscribe(shots.append, kinds={events.SHOT_ADDED})
+    bus.subscribe(lambda e: 1 / 0)  # a broken listener does not stop the rest
+
+    bus.emit(ProjectEvent(events.SHOT_ADDED, "SH010"))
+    bus.emit(ProjectEvent(events.RSV_CREATED, rsv="rsv001"))
+    unsubscribe()
+    bus.emit(ProjectEvent(events.SHOT_REMOVED, "SH010"))
+
+    assert [e.kind for e in received] == [events.SHOT_ADDED, events.RSV_CREATED]
+    assert [e.shot for e in shots] == ["SH010"]
+    assert bus_for("a/../Config") is bus_for("Config")
+
+
+def test_config_emits_after_saving(config):
+    received = record(config.events)
+    on_disk = []
+    config.events.subscribe(lambda e: on_disk.append(load_metadata(config.config_dir)["shots"]))
+
+    config.add_shot("SH010", [1, 10])
+    config.add_shot("SH020", [11, 20])
+    config.add_shot("SH010", [1, 12])
+    config.rename_shot("SH010", "SH005")
+    config.remove_shot("SH020")
+
+    assert received == [
+        ProjectEvent(events.SHOT_ADDED, "SH010", frame_range=(1, 10), index=0),
+        ProjectEvent(events.SHOT_ADDED, "SH020", frame_range=(11, 20), index=1),
+        ProjectEvent(events.SHOT_UPDATED, "SH010", frame_range=(1, 12)),
+        ProjectEvent(events.SHOT_RENAMED, "SH005", old_shot="SH010"),
+        ProjectEvent(events.SHOT_REMOVED, "SH020"),
+    ]
+    assert on_disk[-2] == ["SH005", "SH020"]  # listeners see the change already persisted
+
+
+def test_batch_emits_on_success_only(config):
+    received = record(config.events)
+    with pytest.raises(RuntimeError):
+        with config.batch():
+            config.add_shot("SH010", [1, 10])
+            raise RuntimeError("abort")
+    assert received == []
+
+    with config.batch():
+        config.add_shot("SH010", [1, 10])
+        config.add_shot("SH020", [11, 20])
+        assert received == []
+    assert [e.shot for e in received] == ["SH010", "SH020"]
+
+
+@pytest.mark.parametrize("database", [False, True])
+def test_rename_shot_keeps_position_and_renders(tmp_path, database):
+    (tmp_path / "Config").mkdir()
+    backend = SqliteBackend(tmp_path / "Config" / DB_FILE) if database else None
+    config = ProjectConfig("Rename", str(tmp_path), backend=backend)
+    config.add_shots({"SH010": [1, 10], "SH020": [11, 20], "SH0100": [21, 30]})
+    config.add_render("rsv001", "SH010_rf3")
+    config.add_render("rsv001", "SH0100_rf21")
+
+    config.rename_shot("SH010", "SH015")
+    with pytest.raises(ValueError):
+        config.rename_shot("SH020", "SH015")
+
+    stored = load_metadata(config.config_dir)
+    for data in (config.data, stored):
+        assert data["shots"] == ["SH015", "SH020", "SH0100"]
+        assert list(data["shot_struct"]["SH015"]) == [1, 10]
+        assert sorted(data["renders"]["rsv001"]) == ["SH0100_rf21", "SH015_rf3"]
+
+
+def test_open_writes_nothing_until_changed(tmp_path):
+    path = tmp_path / "metadata.yaml"
+    config = ProjectConfig.open(str(path))
+    assert config.data == {} and not path.exists()
+    config.add_shot("SH010", [1, 10])
+    assert ProjectConfig.open(str(path)).data["shot_struct"] == {"SH010": [1, 10]}
+
+
+def test_render_manager_emits_new_versions_and_frames(tmp_path):
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    received = record(bus_for(tmp_path / "Config"))
+    rsv = manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), (1, 10))
+    manager.update_frame(rsv, 4)
+    manager.update_frame(rsv, 4)  # already recorded: no event
+
+    assert received == [ProjectEvent(events.RSV_CREATED, rsv=rsv, frame_range=(1, 10)),
+                        ProjectEvent(events.FRAME_COMPLETED, rsv=rsv, frame=4)]
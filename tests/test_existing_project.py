@@ -1,7 +1,10 @@
+import time
+
 import pytest
 from unittest.mock import patch
-from ui.start_window import ExistingProjectWindow
+from ui.start_window import ExistingProjectWindow, SUGGEST_DELAY_MS
 from PySide2.QtWidgets import QApplication
+from PySide2.QtTest import QTest
 
 # Ensure a QApplication exists for the tests
 app = QApplication.instance() or QApplication([])
@@ -54,3 +57,23 @@ def test_load_project_generic_error(window):
         window.progress.on_complete()
 
     assert "Error loading project: Something broke" in window.windowTitle()
+
+def test_tag_suggestions_come_from_catalog(window):
+    entries = [{"tag": "@ShowReel"}, {"tag": "@Shorts"}]
+    with patch("core.project.SceneProject.list_projects", return_value=entries) as mock_list:
+        window.suggest_projects("@sh")
+
+    mock_list.assert_called_once_with("@sh", refresh=False)
+    assert window.tag_model.stringList() == ["@ShowReel", "@Shorts"]
+
+def test_tag_suggestions_wait_for_a_typing_pause(window):
+    with patch("core.project.SceneProject.list_projects", return_value=[{"tag": "@ShowReel"}]) as mock_list:
+        QTest.keyClicks(window.tag_input, "@sho")
+        assert mock_list.call_count == 0 and window.suggest_timer.isActive()  # nothing looked up while typing
+        deadline = time.monotonic() + SUGGEST_DELAY_MS * 10 / 1000
+        while not mock_list.called and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+
+    mock_list.assert_called_once_with("@sho", refresh=False)
+    assert window.tag_model.stringList() == ["@ShowReel"]
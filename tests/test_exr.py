@@ -0,0 +1,139 @@
+import math
+import zlib
+import struct
+
+import numpy as np
+import pytest
+
+from core import exr
+from core.imagecache import DecodedImageCache, decode_image, display_view, image_size
+
+
+def _attr(name, kind, data):
+    return name.encode() + b"\0" + kind.encode() + b"\0" + struct.pack("<i", len(data)) + data
+
+
+def _compress(compression, raw):
+    if compression == "NONE":
+        return raw
+    t = np.frombuffer(raw, np.uint8)
+    t = np.concatenate([t[0::2], t[1::2]])  # interleave
+    d = t.copy()
+    d[1:] = t[1:] - t[:-1] + 128  # predictor
+    return zlib.compress(d.tobytes())
+
+
+def _rows(planes, y0, y1, x0, x1):
+    """Row-interleaved pixel data: each row holds every channel (sorted by name) in turn."""
+    names = sorted(planes)
+    return b"".join(planes[n][y, x0:x1].tobytes() for y in range(y0, y1) for n in names)
+
+
+def write_exr(path, planes, compression="NONE", tile=None):
+    """Minimal single-part EXR writer: scanline, or tiled with mip levels (ROUND_DOWN) when tile is given."""
+    names = sorted(planes)
+    height, width = planes[names[0]].shape
+    chlist = b"".join(n.encode() + b"\0" + struct.pack("<iB3xii", 1 if planes[n].dtype == np.float16 else 2, 0, 1, 1)
+                      for n in names) + b"\0"
+    header = (_attr("channels", "chlist", chlist)
+              + _attr("compression", "compression", bytes([exr.COMPRESSIONS.index(compression)]))
+              + _attr("dataWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1))
+              + _attr("displayWindow", "box2i", struct.pack("<4i", 0, 0, width - 1, height - 1))
+              + _attr("lineOrder", "lineOrder", b"\0"))
+    chunks = []
+    if tile is None:
+        per_block = exr.LINES_PER_BLOCK[compression]
+        for y in range(0, height, per_block):
+            data = _compress(compression, _rows(planes, y, min(y + per_block, height), 0, width))
+            chunks.append(struct.pack("<ii", y, len(data)) + data)
+        version = 2
+    else:
+        header += _attr("tiles", "tiledesc", struct.pack("<IIB", tile, tile, exr.MIPMAP_LEVELS))
+        levels = int(math.floor(math.log2(max(width, height)))) + 1
+        for level in range(levels):
+            h, w = max(1, height >> level), max(1, width >> level)
+            level_planes = {n: p[::2 ** level, ::2 ** level][:h, :w] for n, p in planes.items()}  # stand-in for filtering
+            for ty in range(math.ceil(h / tile)):
+                for tx in range(math.ceil(w / tile)):
+                    raw = _rows(level_planes, ty * tile, min(ty * tile + tile, h), tx * tile, min(tx * tile + tile, w))
+                    data = _compress(compression, raw)
+                    chunks.append(struct.pack("<5i", tx, ty, level, level, len(data)) + data)
+        version = 2 | exr.TILED_FLAG
+    start = 8 + len(header) + 1 + 8 * len(chunks)
+    offsets = np.cumsum([start] + [len(c) for c in chunks[:-1]]).astype("<u8")
+    with open(path, "wb") as f:
+        f.write(exr.MAGIC + struct.pack("<i", version) + header + b"\0" + offsets.tobytes() + b"".join(chunks))
+    return str(path)
+
+
+@pytest.fixture
+def planes():
+    height, width = 37, 50
+    ramp = np.linspace(0, 4, width * height, dtype=np.float32).reshape(height, width)
+    return {"R": ramp.astype(np.float16), "G": (ramp / 2).astype(np.float16),
+            "B": np.full((height, width), 0.18, np.float16), "A": np.ones((height, width), np.float16),
+            "Z": ramp * 100}
+
+
+@pytest.mark.parametrize("compression", ["NONE", "ZIPS", "ZIP"])
+def test_scanline_channels_and_step(tmp_path, planes, compression):
+    path = write_exr(tmp_path / "frame.exr", planes, compression)
+    header = exr.read_header(path)
+    assert header.size == (50, 37) and header.native and header.channel_names == ["A", "B", "G", "R", "Z"]
+
+    rgba = exr.read_exr(path)
+    assert rgba.dtype == np.float16 and rgba.shape == (37, 50, 4)
+    assert np.array_equal(rgba[..., 0], planes["R"]) and np.array_equal(rgba[..., 3], planes["A"])
+
+    subset = exr.read_exr(path, channels=["Z", "G"], step=3)
+    assert subset.dtype == np.float32 and subset.shape == (13, 17, 2)
+    assert np.array_equal(subset[..., 0], planes["Z"][::3, ::3])
+    assert np.array_equal(subset[..., 1], planes["G"][::3, ::3].astype(np.float32))
+    assert np.array_equal(exr.read_exr(path, level=1)[..., 0], planes["R"][::2, ::2])  # no mips: subsampled
+
+    with pytest.raises(ValueError):
+        exr.read_exr(path, channels=["N.x"])
+
+
+def test_tiled_mip_level_reads_only_that_level(tmp_path, planes):
+    path = write_exr(tmp_path / "tiled.exr", planes, "ZIP", tile=16)
+    assert exr.read_header(path).level_count() == 6
+    assert np.array_equal(exr.read_exr(path)[..., 1], planes["G"])
+    level = exr.read_exr(path, level=2)
+    assert level.shape == (9, 12, 4) and np.array_equal(level[..., 0], planes["R"][::4, ::4][:9, :12])
+    assert np.array_equal(exr.read_exr(path, ["R"], level=1, step=2)[..., 0], planes["R"][::2, ::2][:18, :25][::2, ::2])
+
+    assert decode_image(path, 4).shape == (9, 12, 4)  # the gallery's preview reads the mip level
+    for step in (3, 6, 12):  # not powers of two: mip level 0, 1 and 2, then every 3rd pixel
+        sizes = zip(decode_image(path, step).shape, planes["R"][::step, ::step].shape)
+        assert all(0 <= full - got <= 1 for got, full in sizes)  # mip levels round down
+    assert np.array_equal(decode_image(path, 6)[..., 0], planes["R"][::2, ::2][:18, :25][::3, ::3])
+    assert DecodedImageCache().get(path, 3).shape[:2] == (13, 17)  # cached under the step it really has
+    assert exr.read_exr(path, level=8).shape[:2] == (1, 1)  # past the last level: subsampled from it
+
+
+def test_hdr_display_transform(tmp_path, planes):
+    path = write_exr(tmp_path / "frame.exr", planes)
+    assert image_size(path) == (50, 37)
+    pixels = DecodedImageCache().get(path)
+    assert display_view(pixels, "B")[0, 0] == 118  # 0.18 linear, sRGB encoded
+    assert display_view(pixels, "B", transform="linear")[0, 0] == 46
+    assert display_view(pixels, "B", transform="gamma", gamma=2.2)[0, 0] == 117
+    assert display_view(pixels, "B", exposure=-1)[0, 0] == display_view(pixels.astype(np.float32), "B", exposure=-1)[0, 0]
+    assert display_view(pixels, "R")[-1, -1] == 255  # over 1.0: clipped
+    assert display_view(pixels, "A")[0, 0] == 255 and display_view(pixels, "L").shape == (37, 50)
+    with pytest.raises(ValueError):
+        display_view(pixels.astype(np.float32), transform="ACES")
+
+
+def test_other_compressions_need_openimageio(tmp_path, planes, monkeypatch):
+    path = write_exr(tmp_path / "frame.exr", planes)
+    with open(path, "r+b") as f:  # claim PIZ
+        data = f.read()
+        at = data.index(b"compression\0compression\0") + len("compression\0compression\0") + 4
+        f.seek(at)
+        f.write(bytes([exr.COMPRESSIONS.index("PIZ")]))
+    monkeypatch.setattr(exr, "oiio", None)
+    assert not exr.read_header(path).native
+    with pytest.raises(ValueError, match="OpenImageIO"):
+        exr.read_exr(path)
@@ -0,0 +1,218 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from core.farm import FarmCoordinator
+from core.rendering import RenderSettings, RenderManager
+
+REPO = Path(__file__).resolve().parents[1]
+FAKE_DCC = str(Path(__file__).parent / "stubs" / "fake_dcc.py")
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "Scene").mkdir()
+    (tmp_path / "Scene" / "scene.mb").write_bytes(b"")
+    (tmp_path / "Config").mkdir()
+    metadata = {"project_name": "FarmProject", "project_dir": str(tmp_path), "scene_file": ["scene.mb"]}
+    with open(tmp_path / "Config" / "metadata.yaml", "w") as f:
+        yaml.safe_dump(metadata, f)
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    rsv = manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), frame_range=(1, 24))
+    return tmp_path, rsv
+
+
+def start_worker(port, name, env=None):
+    return subprocess.Popen(
+        [sys.executable, "-m", "core.farm", "worker", "--port", str(port), "--name", name, "--mayapy", FAKE_DCC],
+        cwd=REPO, env=dict(os.environ, **(env or {})), start_new_session=True,
+    )
+
+
+def kill_dccs(log):
+    """DCCs run in their own session so a lost task can be aborted; killing a worker's group leaves them."""
+    for line in log.read_text().splitlines() if log.exists() else []:
+        try:
+            os.killpg(os.getpgid(int(line.split()[0])), signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def recorded_frames(project_dir, rsv):
+    return RenderManager(str(project_dir / "Config" / "renders.yaml")).get_frames(rsv)
+
+
+def test_local_workers_render_every_frame(project):
+    project_dir, rsv = project
+    coordinator = FarmCoordinator(project_dir, rsv, range(1, 25), task_size=4, port=0).start()
+    workers = [start_worker(coordinator.address[1], f"w{i}") for i in range(3)]
+    try:
+        assert coordinator.wait(timeout=60)
+        for worker in workers:
+            assert worker.wait(timeout=10) == 0  # workers exit once the farm is drained
+    finally:
+        coordinator.stop()
+
+    assert recorded_frames(project_dir, rsv) == list(range(1, 25))
+    assert all((project_dir / "Renders" / rsv / f"rf{f}v001.exr").exists() for f in range(1, 25))
+
+
+def test_killed_worker_tasks_are_requeued(project, tmp_path):
+    project_dir, rsv = project
+    coordinator = FarmCoordinator(project_dir, rsv, range(1, 13), task_size=4, port=0).start()
+    port = coordinator.address[1]
+    log = tmp_path / "doomed.log"
+    doomed = start_worker(port, "doomed", env={"FAKE_DCC_SLEEP": "30", "FAKE_DCC_LOG": str(log)})
+    try:
+        deadline = time.monotonic() + 10
+        while not (log.exists() and log.read_text()):  # leased and rendering
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        os.killpg(doomed.pid, signal.SIGKILL)
+        kill_dccs(log)
+
+        survivor = start_worker(port, "survivor")
+        assert coordinator.wait(timeout=60)
+        assert survivor.wait(timeout=10) == 0
+    finally:
+        coordinator.stop()
+
+    assert recorded_frames(project_dir, rsv) == list(range(1, 13))
+
+
+def test_expired_lease_is_reassigned(project):
+    project_dir, rsv = project
+    coordinator = FarmCoordinator(project_dir, rsv, range(1, 5), task_size=4, lease_seconds=1.0, port=0).start()
+    port = coordinator.address[1]
+
+    # A worker that takes a task, then hangs without heartbeating or disconnecting
+    hung = socket.create_connection(("127.0.0.1", port))
+    reader = hung.makefile("r")
+    for msg in ({"type": "hello", "worker": "hung"}, {"type": "lease"}):
+        hung.sendall((json.dumps(msg) + "\n").encode())
+        reply = json.loads(reader.readline())
+    assert reply["type"] == "task"
+
+    worker = start_worker(port, "healthy")
+    try:
+        assert coordinator.wait(timeout=30)
+        assert worker.wait(timeout=10) == 0
+    finally:
+        hung.close()
+        coordinator.stop()
+
+    assert recorded_frames(project_dir, rsv) == [1, 2, 3, 4]
+
+
+def farm_request(sock, reader, msg):
+    sock.sendall((json.dumps(msg) + "\n").encode())
+    line = reader.readline()
+    return json.loads(line) if line else None
+
+
+def test_workers_must_present_the_farm_token(project):
+    project_dir, rsv = project
+    coordinator = FarmCoordinator(project_dir, rsv, range(1, 5), task_size=4, port=0, token="s3cret").start()
+    port = coordinator.address[1]
+    for hello in ({"type": "lease"}, {"type": "hello", "worker": "intruder", "token": "guess"}):
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            reader = sock.makefile("r")
+            assert farm_request(sock, reader, hello)["type"] == "error"
+            assert reader.readline() == ""  # refused connections are closed
+    assert coordinator.status()["workers"] == [] and coordinator.status()["pending"] == 1
+
+    worker = start_worker(port, "trusted", env={"FARM_TOKEN": "s3cret"})
+    try:
+        assert coordinator.wait(timeout=30)
+        assert worker.wait(timeout=10) == 0
+    finally:
+        coordinator.stop()
+    assert recorded_frames(project_dir, rsv) == [1, 2, 3, 4]
+
+
+def test_worker_aborts_a_task_whose_lease_was_lost(project, tmp_path):
+    project_dir, rsv = project
+    log = tmp_path / "launches.log"
+    coordinator = FarmCoordinator(project_dir, rsv, range(1, 5), task_size=4, lease_seconds=0.6, port=0).start()
+    worker = start_worker(coordinator.address[1], "slow", env={"FAKE_DCC_SLEEP": "30", "FAKE_DCC_LOG": str(log)})
+    try:
+        deadline = time.monotonic() + 10
+        while not (log.exists() and log.read_text()):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        with coordinator._cond:  # as if the lease had expired and the task gone back in the queue
+            coordinator._requeue(next(iter(coordinator._leases)))
+
+        # The worker hears "lost" on its next heartbeat, kills the DCC and leases the task again
+        deadline = time.monotonic() + 5
+        while len(log.read_text().splitlines()) < 2:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+    finally:
+        os.killpg(worker.pid, signal.SIGKILL)
+        kill_dccs(log)
+        coordinator.stop()
+
+
+def test_results_are_recorded_without_holding_up_heartbeats(project, monkeypatch):
+    project_dir, rsv = project
+    coordinator = FarmCoordinator(project_dir, rsv, range(1, 5), task_size=4, port=0).start()
+    coordinator.handle("w", {"type": "hello"})
+    task = coordinator.handle("w", {"type": "lease"})["task"]
+    heartbeats = []
+    record = coordinator.manager.update_frame
+
+    def slow_update_frame(rsv, frame):
+        beat = threading.Thread(target=lambda: heartbeats.append(
+            coordinator.handle("w", {"type": "heartbeat", "task": task["id"]})["type"]))
+        beat.start()
+        beat.join(timeout=5)
+        record(rsv, frame)
+
+    monkeypatch.setattr(coordinator.manager, "update_frame", slow_update_frame)
+    try:
+        coordinator.handle("w", {"type": "result", "task": task["id"], "done": task["frames"], "failed": []})
+    finally:
+        coordinator.stop()
+    assert heartbeats == ["ok"] * 4  # answered while the frames were being recorded
+    assert coordinator.wait(timeout=0) and recorded_frames(project_dir, rsv) == [1, 2, 3, 4]
+
+
+def test_worker_aborts_when_the_coordinator_goes_away(project, tmp_path):
+    project_dir, rsv = project
+    log = tmp_path / "launches.log"
+    settings = RenderManager(str(project_dir / "Config" / "renders.yaml")).get_render_info(rsv)["settings"]
+    metadata = yaml.safe_load((project_dir / "Config" / "metadata.yaml").read_text())
+    with socket.create_server(("127.0.0.1", 0)) as server:  # a coordinator that hands out a task, then dies
+        worker = start_worker(server.getsockname()[1], "orphan", env={"FAKE_DCC_SLEEP": "30", "FAKE_DCC_LOG": str(log)})
+        try:
+            conn, _ = server.accept()
+            with conn, conn.makefile("r") as reader:
+                task = {"id": "t0001", "rsv": rsv, "frames": [1, 2], "settings": settings, "metadata": metadata}
+                for reply in ({"type": "welcome", "heartbeat": 0.2}, {"type": "task", "task": task}):
+                    reader.readline()
+                    conn.sendall((json.dumps(reply) + "\n").encode())
+                deadline = time.monotonic() + 10
+                while not (log.exists() and log.read_text()):
+                    assert time.monotonic() < deadline
+                    time.sleep(0.05)
+
+            assert worker.wait(timeout=10) != 0  # render aborted, then the result could not be sent
+            dcc = Path("/proc") / log.read_text().split()[0] / "stat"
+            deadline = time.monotonic() + 5
+            while dcc.exists() and dcc.read_text().split(")")[1].split()[0] != "Z":
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+        finally:
+            if worker.poll() is None:
+                os.killpg(worker.pid, signal.SIGKILL)
+            kill_dccs(log)
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+import yaml
+
+import core.project
+
+from core.frameset import FrameSet
+from core.project import ProjectConfig
+from core.rendering import RenderManager, RenderSettings
+from core.scheduler import parse_frames
+
+
+def test_spec_round_trip():
+    frames = FrameSet("1-100,120-140x2,200")
+    assert len(frames) == 100 + 11 + 1
+    assert str(frames) == "1-100,120-140x2,200"
+    assert FrameSet(str(frames)) == frames
+    assert str(FrameSet([5, 1, 2, 3, 3, 7, 9, 11])) == "1-3,5-11x2"
+    assert str(FrameSet([1, 3])) == "1,3"
+    assert str(FrameSet()) == ""
+    assert list(FrameSet("-2-1")) == [-2, -1, 0, 1]
+
+
+@pytest.mark.parametrize("spec", ["1-", "a", "5-3", "1-9x0"])
+def test_invalid_spec(spec):
+    with pytest.raises(ValueError):
+        FrameSet(spec)
+
+
+def test_operations_match_python_sets():
+    rng = random.Random(7)
+    for _ in range(200):
+        a = {rng.randint(0, 60) for _ in range(rng.randint(0, 40))}
+        b = {rng.randint(0, 60) for _ in range(rng.randint(0, 40))}
+        fa, fb = FrameSet(a), FrameSet(b)
+        assert list(fa | fb) == sorted(a | b)
+        assert list(fa - fb) == sorted(a - b)
+        assert list(fa & fb) == sorted(a & b)
+        assert list(fa.missing(10, 50)) == sorted(set(range(10, 51)) - a)
+        assert all((f in fa) == (f in a) for f in range(-1, 62))
+
+        incremental = FrameSet()
+        for f in rng.sample(sorted(a), len(a)):
+            assert incremental.add(f)
+        assert incremental == fa and len(incremental) == len(a)
+        lo, hi = sorted(rng.sample(range(61), 2))
+        incremental.discard_range(lo, hi)
+        assert list(incremental) == sorted(f for f in a if not lo <= f <= hi)
+        assert len(incremental) == len(list(incremental))
+
+
+def test_render_manager_reads_list_files_and_writes_ranges(tmp_path):
+    path = tmp_path / "renders.yaml"
+    path.write_text(yaml.safe_dump({"renders": {"rsv001": {
+        "settings": {"renderer": "Arnold", "output_dir": str(tmp_path), "output_format": "EXR"},
+        "frame_range": [1, 10], "frames": [1, 2, 3, 7]}}}))
+
+    manager = RenderManager(str(path))
+    assert manager.get_frames("rsv001") == [1, 2, 3, 7]
+    assert manager.get_frame_set("rsv001") == FrameSet("1-3,7")
+    assert [v.render_settings_id for v in manager.frame_versions(7)] == ["rsv001"]
+
+    manager.update_frame("rsv001", 4)
+    manager.compact()
+    assert yaml.safe_load((tmp_path / "renders" / "rsv001.yaml").read_text())["frames"] == "1-4,7"
+    assert RenderManager(str(path)).get_frames("rsv001") == [1, 2, 3, 4, 7]
+
+
+def test_new_versions_start_empty(tmp_path):
+    manager = RenderManager(str(tmp_path / "renders.yaml"))
+    rsv = manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), (1, 3))
+    assert manager.get_frames(rsv) == []
+    assert manager.missing_frames(rsv) == [1, 2, 3]
+
+
+def test_project_config_frame_queries(tmp_path):
+    config = ProjectConfig("Frames", str(tmp_path))
+    config.add_shots({"SH01": [1, 10], "SH010": [11, 20]})
+    config.add_renders("rsv001", ["SH01_rf1", "SH01_rf2", "SH01_rf5", "SH010_rf11"])
+
+    assert config.rendered_frames("rsv001", "SH01") == FrameSet("1-2,5")
+    assert str(config.missing_frames("rsv001", "SH01")) == "3-4,6-10"
+
+    config.remove_shot("SH01")
+    assert config.data["renders"]["rsv001"] == ["SH010_rf11"]  # a prefix of another shot's name
+
+
+def test_project_config_frame_index_is_kept_current(tmp_path, monkeypatch):
+    config = ProjectConfig("Frames", str(tmp_path))
+    config.add_shots({"SH01": [1, 10], "SH02": [11, 20]})
+    config.add_renders("rsv001", ["SH01_rf1", "SH02_rf11"])
+    assert str(config.missing_frames("rsv001", "SH01")) == "2-10"  # index built once
+
+    scans = []
+    real_match = core.project.FRAME_ID_RE
+    monkeypatch.setattr(core.project, "FRAME_ID_RE", type("Counting", (), {
+        "match": staticmethod(lambda s: scans.append(s) or real_match.match(s))}))
+    config.add_render("rsv001", "SH01_rf2")
+    config.rename_shot("SH02", "SH03")
+    assert str(config.missing_frames("rsv001", "SH01")) == "3-10"
+    assert str(config.rendered_frames("rsv001", "SH03")) == "11"
+    assert scans == ["SH01_rf2"]  # only the new frame was parsed
+
+    config.remove_shot("SH01")
+    assert config.rendered_frames("rsv001", "SH01") == FrameSet()
+
+    other = ProjectConfig("Frames", str(tmp_path))  # another process records a frame
+    other.add_render("rsv001", "SH03_rf12")
+    config.add_render("rsv001", "SH03_rf13")  # merged with the other write on save
+    assert str(config.rendered_frames("rsv001", "SH03")) == "11-13"
+
+
+def test_parse_frames_accepts_steps():
+    assert parse_frames("1-9x4, 20") == [1, 5, 9, 20]
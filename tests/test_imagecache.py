@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import core.imagecache
+from core.imagecache import DecodedImageCache, display_view, preview_step
+
+
+@pytest.fixture
+def frame(tmp_path):
+    pixels = np.zeros((40, 60, 4), np.uint8)
+    pixels[..., 0], pixels[..., 1], pixels[..., 2], pixels[..., 3] = 200, 100, 50, 128
+    path = tmp_path / "rf1v001.png"
+    Image.fromarray(pixels, "RGBA").save(path)
+    return str(path)
+
+
+def test_frames_are_decoded_once_and_evicted_lru(tmp_path, frame, monkeypatch):
+    cache = DecodedImageCache()
+    pixels = cache.get(frame)
+    assert pixels.shape == (40, 60, 4) and not pixels.flags.writeable
+
+    monkeypatch.setattr(core.imagecache, "decode_image", lambda *a: pytest.fail("decoded again"))
+    assert cache.get(frame) is pixels and cache.hits == 1
+
+    other = tmp_path / "rf2v001.png"
+    Image.new("RGB", (60, 40)).save(other)
+    cache.max_bytes = pixels.nbytes
+    cache.get(str(other), decode=lambda p, step: np.zeros((40, 60, 3), np.uint8))
+    assert frame not in cache and str(other) in cache and cache.nbytes == 40 * 60 * 3
+
+
+def test_display_views(frame):
+    pixels = DecodedImageCache().get(frame)
+    rgb = display_view(pixels)
+    assert rgb.shape == (40, 60, 3) and rgb.flags.c_contiguous
+    assert rgb[0, 0].tolist() == [200, 100, 50]
+    assert display_view(pixels, "G")[0, 0] == 100
+    assert display_view(pixels, "A")[0, 0] == 128
+    assert display_view(pixels, "L")[0, 0] == int(0.2126 * 200 + 0.7152 * 100 + 0.0722 * 50)
+    assert display_view(pixels, "B", exposure=1)[0, 0] == 100
+    assert display_view(pixels, "R", exposure=1)[0, 0] == 255  # clipped
+    assert display_view(pixels[..., :3], "A")[0, 0] == 255  # no alpha: opaque
+
+    step = preview_step(pixels.shape, (30, 20))
+    assert step == 2 and display_view(pixels, step=step).shape == (20, 30, 3)
@@ -109,3 +109,120 @@ def test_delete_shot_removes_metadata(app, sample_metadata):
 
     assert "ShotB" not in window.metadata["shots"]
     assert "ShotB" not in window.metadata["shot_struct"]
+
+
+def test_windows_patch_rows_on_project_events(app, sample_metadata):
+    from core.project import ProjectConfig
+
+    file_path, _ = sample_metadata
+    window = MainProjectWindow(metadata_file=str(file_path))
+    shots_win = ManageShotsWindow(window)
+    shot_a = window._shot_items["ShotA"]
+
+    # A change made elsewhere on the same project (another ProjectConfig, same bus)
+    other = ProjectConfig.open(str(file_path))
+    other.add_shot("ShotB", [1, 3])
+    other.rename_shot("ShotA", "ShotZ")
+
+    structure = window.get_project_structure_dict()
+    assert [c["name"] for c in structure[0]["children"]] == ["ShotZ", "ShotB"]
+    assert [shots_win.shot_list.item(i).text() for i in range(shots_win.shot_list.count())] == [
+        "ShotZ (1-5)", "ShotB (1-3)"]
+
+    other.add_shot("ShotB", [1, 4])
+    assert window._shot_items["ShotB"].childCount() == 4
+    assert window._shot_items["ShotZ"] is not shot_a  # renamed row rebuilt, untouched rows kept
+
+    other.remove_shot("ShotZ")
+    other.remove_shot("ShotB")
+    assert window.get_project_structure_dict()[0]["children"] == [{"name": "No shots found", "children": []}]
+    assert shots_win.shot_list.count() == 0
+
+
+def test_manage_shots_without_metadata_file(app):
+    metadata = {"project_name": "Unsaved", "shots": ["ShotA"], "shot_struct": {"ShotA": [1, 5]}}
+    window = MainProjectWindow(metadata=metadata)
+    shots_win = ManageShotsWindow(window)
+
+    shots_win.shot_name_input.setText("ShotB")
+    shots_win.range_input.setText("10-20")
+    shots_win.add_shot()
+    assert metadata["shots"] == ["ShotA", "ShotB"]
+
+    shots_win.shot_list.setCurrentRow(1)
+    shots_win.shot_name_input.setText("ShotC")
+    shots_win.update_shot()
+    assert metadata["shots"] == ["ShotA", "ShotC"] and metadata["shot_struct"]["ShotC"] == [10, 20]
+    assert shots_win.shot_list.item(1).text() == "ShotC (10-20)"
+
+    shots_win.shot_list.setCurrentRow(0)
+    shots_win.delete_shot()
+    assert metadata["shots"] == ["ShotC"] and "ShotA" not in metadata["shot_struct"]
+    assert [c["name"] for c in window.get_project_structure_dict()[0]["children"]] == ["ShotC"]
+
+
+def test_project_view_inserts_added_shots_at_their_index(app, sample_metadata):
+    from core import events
+    from ui.render_gallery import ManageShotsWindow3Panel
+
+    file_path, data = sample_metadata
+    file_path = file_path.parent / "Config" / "metadata.yaml"  # where projects keep it: same bus as renders
+    file_path.parent.mkdir()
+    file_path.write_text(yaml.safe_dump(data))
+    window = MainProjectWindow(metadata_file=str(file_path))
+    panel = ManageShotsWindow3Panel(main_window=window)
+    window.config.add_shot("ShotB", [1, 3])
+
+    # A shot placed first in the shot list (e.g. a tool restoring a deleted shot)
+    window.metadata["shots"].insert(0, "Shot0")
+    window.metadata["shot_struct"]["Shot0"] = [1, 2]
+    window.config.save()
+    window.config.events.emit(events.ProjectEvent(events.SHOT_ADDED, "Shot0", index=0))
+
+    tree = [panel.shot_tree.topLevelItem(i).text(0) for i in range(panel.shot_tree.topLevelItemCount())]
+    assert tree == window.metadata["shots"] == ["Shot0", "ShotA", "ShotB"]
+    assert [c["name"] for c in window.get_project_structure_dict()[0]["children"]] == tree
+
+
+def test_closing_the_project_view_closes_its_render_manager(app, sample_metadata, monkeypatch):
+    from PySide2.QtCore import QCoreApplication, QEvent
+    from core.rendering import RenderManager
+
+    closed = []
+    monkeypatch.setattr(RenderManager, "close", lambda manager: closed.append(manager))
+    window = MainProjectWindow(metadata_file=str(sample_metadata[0]))
+    window.open_shots_dir()
+    view = window.project_view
+    manager = view.manager
+    view.close()
+    QCoreApplication.sendPostedEvents(view, QEvent.DeferredDelete)
+
+    assert closed == [manager] and window.project_view is None
+    window.open_shots_dir()  # reopening builds a fresh view with its own manager
+    assert window.project_view.manager is not manager
+    view = window.project_view
+    view.close()
+    QCoreApplication.sendPostedEvents(view, QEvent.DeferredDelete)
+
+
+def test_project_view_reads_the_project_model(app, sample_metadata, tmp_path):
+    from PySide2.QtCore import QCoreApplication, QEvent
+    from core.rendering import RenderSettings
+    from ui.render_gallery import ManageShotsWindow3Panel
+
+    window = MainProjectWindow(metadata_file=str(sample_metadata[0]))
+    panel = ManageShotsWindow3Panel(main_window=window)
+    assert panel.model is window.config.model and panel.manager.model is window.config.model
+    assert [s.id for s in panel.model.shots] == ["ShotA"]
+
+    rsv = panel.manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), frame_range=(1, 5))
+    panel.manager.update_frame(rsv, 2)
+    assert [v.frame_number for v in window.config.model.frame_versions.for_rsv(rsv)] == [2]
+
+    panel.show_render_settings(str(panel.manager.frame_path(rsv, 2)))
+    rows = {panel.settings_form.itemAt(i, panel.settings_form.LabelRole).widget().text()
+            for i in range(panel.settings_form.rowCount())}
+    assert "renderer" in rows
+    panel.close()
+    QCoreApplication.sendPostedEvents(panel, QEvent.DeferredDelete)
+    assert (tmp_path / "Config" / "renders.model").exists()
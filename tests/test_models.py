@@ -0,0 +1,95 @@
+import pytest
+
+from core.frameset import FrameSet
+from core.models import Project, Shot, RenderSettingsVersion, FrameVersion, FrameVersionTable
+from core.project import ProjectConfig
+from core.rendering import RenderManager, RenderSettings
+from core.utils import save_project_to_yaml, load_project_from_yaml, save_project_binary, load_project_binary
+
+
+@pytest.fixture
+def project():
+    table = FrameVersionTable([(12, 2, "rsv002", "/r/rsv002/rf12v002.exr"),
+                               (3, 1, "rsv001", "/r/rsv001/rf3v001.exr"),
+                               (12, 1, "rsv001", "/r/rsv001/rf12v001.exr")])
+    table.append(FrameVersion(5, 2, "rsv002", "/r/rsv002/rf5v002.exr"))
+    return Project("Demo", "@Demo",
+                   [Shot("SH010", (1, 10)), Shot("SH020", (11, 20))],
+                   [RenderSettingsVersion("rsv001", {"renderer": "Arnold"}, FrameSet("3,12"), (1, 20)),
+                    RenderSettingsVersion("rsv002", {"renderer": "Karma"}, FrameSet("5,12"))],
+                   table)
+
+
+def test_models_are_slotted():
+    with pytest.raises(AttributeError):
+        Shot("SH010", (1, 10)).notes = "typo"
+
+
+def test_table_is_sorted_and_indexed(project):
+    table = project.frame_versions
+    assert [(fv.frame_number, fv.version_number) for fv in table] == [(3, 1), (5, 2), (12, 1), (12, 2)]
+    assert [fv.render_settings_id for fv in table.for_frame(12)] == ["rsv001", "rsv002"]
+    assert [fv.frame_number for fv in table.for_rsv("rsv002")] == [5, 12]
+    assert [fv.frame_number for fv in project.frame_versions_for_shot("SH020")] == [12, 12]
+    assert table.for_rsv("rsv999") == []
+
+    table.add(12, 1, "rsv001", "/moved.exr")  # same record: path replaced, no duplicate
+    table.add(1, 3, "rsv003", "/r/rsv003/rf1v003.exr")
+    assert len(table) == 5
+    assert table[0] == FrameVersion(1, 3, "rsv003", "/r/rsv003/rf1v003.exr")
+    assert table.for_frame(12)[0].output_path == "/moved.exr"
+    assert [fv.frame_number for fv in table.for_rsv("rsv002")] == [5, 12]  # index rebuilt after inserts
+
+
+def test_yaml_round_trip(project, tmp_path):
+    path = tmp_path / "project.yaml"
+    save_project_to_yaml(project, str(path))
+    assert load_project_from_yaml(str(path)) == project
+
+
+def test_binary_round_trip(project, tmp_path):
+    path = tmp_path / "project.bin"
+    save_project_binary(project, str(path))
+    loaded = load_project_binary(str(path))
+    assert loaded == project
+    assert [fv.frame_number for fv in loaded.frame_versions.for_rsv("rsv001")] == [3, 12]
+
+    path.write_bytes(b"nonsense")
+    with pytest.raises(ValueError):
+        load_project_binary(str(path))
+
+
+def test_failed_binary_save_leaves_no_temp_file(project, tmp_path, monkeypatch):
+    path = tmp_path / "project.bin"
+    monkeypatch.setattr(Project, "to_bytes", lambda self: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        save_project_binary(project, str(path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_project_from_stored_metadata(tmp_path):
+    config = ProjectConfig("Disk", str(tmp_path))
+    config.add_shots({"SH010": [1, 10], "SH020": [11, 20]})
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    rsv = manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), (1, 20))
+    for frame in (2, 15):
+        manager.update_frame(rsv, frame)
+
+    model = Project.from_metadata(config.data, manager.data, manager.frame_version_table())
+    assert model.tag == "@Disk"
+    assert model.shot("SH020").frame_range == (11, 20)
+    assert model.render_settings_version(rsv).frames == FrameSet("2,15")
+    assert model.frame_versions_for_shot("SH020") == [
+        FrameVersion(15, 1, rsv, str(manager.frame_path(rsv, 15)))]
+
+
+def test_lookups_follow_changes(project):
+    project.add_shot(Shot("SH030", (21, 30)))
+    project.add_shot(Shot("SH010", (1, 12)))
+    assert [s.id for s in project.shots] == ["SH010", "SH020", "SH030"]
+    assert project.shot("SH010").frame_range == (1, 12) and project.shot("SH030").frame_range == (21, 30)
+    project.remove_shot("SH030")
+    assert project.shot("SH030") is None
+
+    project.render_settings_versions = [RenderSettingsVersion("rsv009", {})]  # replaced wholesale
+    assert project.render_settings_version("rsv009") is not None and project.render_settings_version("rsv001") is None
@@ -1,3 +1,4 @@
+import gc
 import sys
 import pytest
 from unittest.mock import patch, MagicMock
@@ -12,9 +13,12 @@ def app():
     return app
 
 @pytest.fixture
-def window():
+def window(app):
     """Fresh NewProjectWindow for each test."""
-    return NewProjectWindow(on_cancel=lambda: None, on_success=lambda: None)
+    yield NewProjectWindow(on_cancel=lambda: None, on_success=lambda: None)
+    # The window is kept alive by reference cycles: collect it here, on the GUI thread,
+    # not whenever a later test's worker thread happens to trigger a collection
+    gc.collect()
 
 import pytest
 from unittest.mock import MagicMock, patch
@@ -16,8 +16,8 @@ def test_initialization_sets_data(tmp_path):
     project_dir.mkdir()
     
     with patch("os.makedirs") as mock_makedirs, \
-         patch("builtins.open", mock_open()) as m_open, \
-         patch("core.project.yaml.dump") as mock_yaml_dump:
+         patch("core.project.FileLock"), \
+         patch("core.project.atomic_write_yaml") as mock_write:
         
         pc = ProjectConfig("TestProject", str(project_dir), ["scene1.usd"])
 
@@ -30,7 +30,7 @@ def test_initialization_sets_data(tmp_path):
         # Ensure os.makedirs called for config_dir
         mock_makedirs.assert_called_with(pc.config_dir)
         # Ensure YAML was saved
-        mock_yaml_dump.assert_called()
+        mock_write.assert_called_with(pc.yaml_path, pc.data)
 
 def test_add_shot_calls_save(mock_project_config):
     pc = mock_project_config
@@ -75,17 +75,56 @@ def test_load_returns_yaml_data(mock_project_config):
     pc = mock_project_config
     mock_yaml_data = {"shots": ["ShotX"]}
 
-    with patch("builtins.open", mock_open(read_data="data")) as m_open, \
-         patch("core.project.yaml.safe_load", return_value=mock_yaml_data):
+    with patch("core.project.read_yaml", return_value=mock_yaml_data):
         path, data = pc.load()
         assert path == pc.yaml_path
         assert data == mock_yaml_data
 
-def test_save_calls_yaml_dump(mock_project_config):
+def test_save_writes_yaml_atomically(mock_project_config):
     pc = mock_project_config
 
-    with patch("builtins.open", mock_open()) as m_open, \
-         patch("core.project.yaml.dump") as mock_yaml_dump:
+    with patch("core.project.atomic_write_yaml") as mock_write:
         pc.save()
-        # YAML dump should be called with data and file handle
-        mock_yaml_dump.assert_called()
+        # Written through a temporary file renamed over metadata.yaml
+        mock_write.assert_called_once_with(pc.yaml_path, pc.data)
+
+
+def test_batch_saves_once(mock_project_config):
+    pc = mock_project_config
+    with patch.object(pc, "save") as mock_save:
+        with pc.batch():
+            pc.add_shot("Shot001", (1, 10))
+            with pc.batch():
+                pc.add_render("rsv001", "Shot001_rf1")
+            mock_save.assert_not_called()
+        mock_save.assert_called_once()
+    assert pc.data["renders"]["rsv001"] == ["Shot001_rf1"]
+
+def test_batch_rolls_back_on_error(mock_project_config):
+    pc = mock_project_config
+    pc.add_shot("Shot001", (1, 10))
+    with patch.object(pc, "save") as mock_save:
+        with pytest.raises(RuntimeError):
+            with pc.batch():
+                pc.add_shot("Shot002", (11, 20))
+                pc.remove_shot("Shot001")
+                raise RuntimeError("import failed")
+        mock_save.assert_not_called()
+    assert pc.data["shots"] == ["Shot001"]
+    assert pc.data["shot_struct"] == {"Shot001": (1, 10)}
+
+def test_bulk_add_shots_and_renders(mock_project_config):
+    pc = mock_project_config
+    with patch.object(pc, "save") as mock_save:
+        pc.add_shots({f"Shot{i:03d}": (i * 10, i * 10 + 9) for i in range(300)})
+        pc.add_renders("rsv001", [f"Shot000_rf{f}" for f in range(1, 11)])
+        assert mock_save.call_count == 2
+    assert len(pc.data["shots"]) == 300
+    assert len(pc.data["renders"]["rsv001"]) == 10
+
+def test_batch_writes_yaml_on_exit(mock_project_config):
+    pc = mock_project_config
+    pc.add_shots([("Shot001", [1, 10]), ("Shot002", [11, 20])])
+    reloaded = ProjectConfig("TestProject", pc.project_dir)
+    assert reloaded.data["shots"] == ["Shot001", "Shot002"]
+    assert reloaded.data["shot_struct"]["Shot002"] == [11, 20]
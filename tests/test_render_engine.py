@@ -0,0 +1,166 @@
+import time
+import threading
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+from core.rendering import RenderSettings, Renderer, RenderManager, RenderEngine, order_frames
+
+FAKE_DCC = str(Path(__file__).parent / "stubs" / "fake_dcc.py")
+
+
+@pytest.fixture
+def project(tmp_path):
+    scene_dir = tmp_path / "Scene"
+    scene_dir.mkdir()
+    (scene_dir / "scene.mb").write_bytes(b"")
+    (tmp_path / "Config").mkdir()
+    return {
+        "project_name": "TestProject",
+        "project_dir": str(tmp_path),
+        "scene_file": ["scene.mb", "scene.usda"],
+    }
+
+
+def make_engine(project, max_workers, chunk_size=1, ordering="sequential"):
+    settings = RenderSettings("Arnold", 24, Path(project["project_dir"]) / "Renders")
+    manager = RenderManager(str(Path(project["project_dir"]) / "Config" / "renders.yaml"))
+    rsv = manager.new_render_version(settings)
+    renderer = Renderer(settings, metadata=project, rsv=rsv, mayapy=FAKE_DCC)
+    engine = RenderEngine(renderer, manager=manager, max_workers=max_workers, chunk_size=chunk_size,
+                          ordering=ordering)
+    return engine, manager, rsv
+
+
+def test_engine_records_every_frame(project):
+    engine, manager, rsv = make_engine(project, max_workers=4)
+    progress = []
+    engine.subscribe(lambda done, total, frame: progress.append((done, total, frame)))
+
+    outputs = engine.run(range(1, 9))
+
+    assert [p.name for p in outputs] == [f"rf{f}v001.exr" for f in range(1, 9)]
+    assert all(p.exists() for p in outputs)
+    assert manager.get_frames(rsv) == list(range(1, 9))
+    assert [done for done, _, _ in progress] == list(range(1, 9))
+    assert sorted(frame for _, _, frame in progress) == list(range(1, 9))
+
+
+def test_frames_are_recorded_outside_the_engine_lock(project, monkeypatch):
+    engine, manager, rsv = make_engine(project, max_workers=2)
+    engine._total, engine._done, engine._outputs = 2, 0, {}
+    both_recording = threading.Barrier(2, timeout=5)
+    real_update = manager.update_frame
+
+    def update_frame(*args):
+        both_recording.wait()
+        real_update(*args)
+    monkeypatch.setattr(manager, "update_frame", update_frame)
+
+    workers = [threading.Thread(target=engine._frame_done, args=(f, Path(f"rf{f}.exr"))) for f in (1, 2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert not both_recording.broken  # both workers were inside update_frame at once
+    assert manager.get_frames(rsv) == [1, 2] and engine._done == 2
+
+
+def test_engine_runs_frames_concurrently(project, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_SLEEP", "0.5")
+    engine, _, _ = make_engine(project, max_workers=4)
+
+    start = time.monotonic()
+    engine.run(range(1, 5))
+    elapsed = time.monotonic() - start
+
+    # Four half-second frames on four workers should take well under 4 x 0.5s
+    assert elapsed < 1.5
+
+
+def test_engine_reports_failed_frames(project, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_FAIL_FRAMES", "3")
+    engine, manager, rsv = make_engine(project, max_workers=2)
+
+    with pytest.raises(RuntimeError, match=r"\[3\]"):
+        engine.run(range(1, 5))
+
+    assert manager.get_frames(rsv) == [1, 2, 4]
+    assert list(engine.failed) == [3]
+
+
+def test_chunked_render_launches_once_per_chunk(project, tmp_path, monkeypatch):
+    log = tmp_path / "launches.log"
+    monkeypatch.setenv("FAKE_DCC_LOG", str(log))
+    engine, manager, rsv = make_engine(project, max_workers=2, chunk_size=10)
+    progress = []
+    engine.subscribe(lambda done, total, frame: progress.append(frame))
+
+    outputs = engine.run(range(1, 26))
+
+    assert len(log.read_text().splitlines()) == 3  # 1-10, 11-20, 21-25
+    assert [p.name for p in outputs] == [f"rf{f}v001.exr" for f in range(1, 26)]
+    assert sorted(progress) == list(range(1, 26))
+    assert manager.get_frames(rsv) == list(range(1, 26))
+
+
+def test_chunks_never_span_gaps(project):
+    engine, _, _ = make_engine(project, max_workers=1, chunk_size=10)
+    pending = deque([1, 2, 3, 7, 8, 20])
+
+    assert engine._next_chunk(pending) == [1, 2, 3]
+    assert engine._next_chunk(pending) == [7, 8]
+    assert engine._next_chunk(pending) == [20]
+
+
+def test_auto_chunk_size_grows_with_fast_frames(project):
+    engine, _, _ = make_engine(project, max_workers=2, chunk_size=None)
+    assert engine._chunk_limit(1000) == 1  # no measurement yet
+
+    engine._frame_seconds = [2.0]
+    assert engine._chunk_limit(1000) == 60  # CHUNK_TARGET_SECONDS / 2s
+    assert engine._chunk_limit(10) == 5  # spread the tail across both workers
+
+
+def test_karma_chunk_uses_one_hython_session(project, tmp_path, monkeypatch):
+    log = tmp_path / "launches.log"
+    monkeypatch.setenv("FAKE_DCC_LOG", str(log))
+    (Path(project["project_dir"]) / "Scene" / "scene.usda").write_text("#usda 1.0\n")
+    settings = RenderSettings("Karma", 24, Path(project["project_dir"]) / "Renders")
+    settings.camera, settings.light = "/cam1", "None"
+    renderer = Renderer(settings, metadata=project, rsv="rsv002", hython=FAKE_DCC)
+    done = []
+
+    outputs = renderer.render_chunk(range(5, 9), on_frame=lambda frame, path: done.append(frame))
+
+    assert [p.name for p in outputs] == [f"rf{f}v002.exr" for f in range(5, 9)]
+    assert done == [5, 6, 7, 8]
+    launches = log.read_text().splitlines()
+    assert len(launches) == 1
+    assert "render-range" in launches[0] and "--light" not in launches[0]
+
+
+def test_progressive_ordering_subdivides_the_range():
+    assert order_frames(range(1, 10), "progressive") == [1, 9, 5, 3, 7, 2, 4, 6, 8]
+    assert sorted(order_frames(range(1, 101), "progressive")) == list(range(1, 101))
+    assert order_frames([4, 8], "progressive") == [4, 8]
+
+
+def test_stride_ordering_fills_in_after_every_nth_frame():
+    assert order_frames(range(1, 8), "stride", stride=3) == [1, 4, 7, 2, 3, 5, 6]
+    with pytest.raises(ValueError):
+        order_frames(range(1, 8), "random")
+
+
+def test_progressive_render_starts_with_first_and_last(project):
+    engine, manager, rsv = make_engine(project, max_workers=1, chunk_size=10, ordering="progressive")
+    progress = []
+    engine.subscribe(lambda done, total, frame: progress.append(frame))
+
+    outputs = engine.run(range(1, 10))
+
+    assert progress[:3] == [1, 9, 5]
+    assert [p.name for p in outputs] == [f"rf{f}v001.exr" for f in range(1, 10)]
+    assert manager.get_frames(rsv) == list(range(1, 10))
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from PIL import Image
+from PySide2.QtWidgets import QApplication
+
+import ui.render_gallery
+from ui.render_gallery import RenderGallery, ThumbnailWidget
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+@pytest.fixture
+def frames(tmp_path):
+    paths = []
+    for v, colour in enumerate([(255, 0, 0), (0, 255, 0), (0, 0, 255)], start=1):
+        path = tmp_path / f"rsv{v:03d}" / f"rf1v{v:03d}.png"
+        path.parent.mkdir()
+        Image.new("RGB", (320, 240), colour).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def settle(gallery):
+    gallery.pool.waitForDone()
+    QApplication.processEvents()
+
+
+def test_images_decode_off_the_gui_thread(app, frames, monkeypatch):
+    threads = []
+    real_decode = ui.render_gallery.decode_view
+    monkeypatch.setattr(ui.render_gallery, "decode_view",
+                        lambda *a: threads.append(threading.current_thread()) or real_decode(*a))
+    gallery = RenderGallery()
+    gallery.set_main_image(frames[2], "rsv003")
+    gallery.add_version_thumb(frames[0], "rsv001", "v001")
+    thumb = gallery.thumb_layout.itemAt(0).widget()
+    assert isinstance(thumb, ThumbnailWidget) and thumb.image_label.text() == "Loading..."
+
+    settle(gallery)
+    assert threads and threading.main_thread() not in threads
+    assert gallery.displayed_image == (frames[2], None, 0.0)
+    assert not gallery.main_image_label.pixmap().isNull()
+    assert not thumb.image_label.pixmap().isNull()
+
+    gallery.show_channel("G")
+    settle(gallery)
+    assert gallery.displayed_image == (frames[2], "G", 0.0)
+    assert gallery.main_image_label.pixmap().toImage().pixelColor(5, 5).value() == 0  # blue frame, green channel
+
+
+def test_stale_requests_are_dropped(app, frames, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    real_decode = ui.render_gallery.decode_view
+
+    def slow_decode(path, *view):
+        if path == frames[0]:
+            started.set()
+            release.wait(5)
+        return real_decode(path, *view)
+    monkeypatch.setattr(ui.render_gallery, "decode_view", slow_decode)
+
+    gallery = RenderGallery()
+    gallery.set_main_image(frames[0], "rsv001")
+    assert started.wait(5)  # still decoding when the user clicks another frame
+    gallery.clear_gallery()
+    gallery.set_main_image(frames[1], "rsv002")
+    gallery.pool.waitForDone(200)
+    QApplication.processEvents()
+    assert gallery.displayed_image == (frames[1], None, 0.0)  # not held up by the stale decode
+
+    release.set()
+    settle(gallery)
+    assert gallery.displayed_image == (frames[1], None, 0.0)  # and the stale result never lands
+    assert gallery._requests == []
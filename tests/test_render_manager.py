@@ -1,5 +1,12 @@
+import tempfile
+import threading
 import unittest
-from core.rendering import RenderManager
+from unittest.mock import patch
+
+import yaml
+
+from core.models import Project
+from core.rendering import RenderManager, RenderSettings
 from pathlib import Path
 
 class TestRenderManager(unittest.TestCase):
@@ -23,3 +30,235 @@ class TestRenderManager(unittest.TestCase):
         info = self.manager.get_render_info("rsv001")
         self.assertIn("settings", info)
         self.assertEqual(info["settings"]["output_format"], "png")
+
+
+class TestResumeRenderVersion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.manager = RenderManager(str(root / "renders.yaml"))
+        self.settings = RenderSettings("Arnold", 24, root / "Renders", output_format="EXR")
+        self.settings.camera = "persp"
+        self.rsv = self.manager.new_render_version(self.settings, frame_range=(1, 6))
+        self.render_dir = root / "Renders" / self.rsv
+        self.render_dir.mkdir(parents=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_frame(self, frame, data=b"\x76\x2f\x31\x01" + b"\0" * 64):
+        (self.render_dir / f"rf{frame}v001.exr").write_bytes(data)
+
+    def test_missing_frames_checks_records_and_files(self):
+        for frame in (1, 2, 3, 4):
+            self.write_frame(frame)
+            self.manager.update_frame(self.rsv, frame)
+        self.write_frame(2, b"")  # truncated
+        self.write_frame(3, b"garbage" * 10)  # wrong header
+        self.write_frame(5)  # on disk but never recorded as finished
+
+        self.assertEqual(self.manager.missing_frames(self.rsv), [2, 3, 5, 6])
+
+    def test_reloaded_settings_match_original(self):
+        reloaded = RenderManager(self.manager.yaml_path)
+        settings = reloaded.get_settings(self.rsv)
+        self.assertEqual(settings.renderer, "Arnold")
+        self.assertEqual(settings.output_dir, self.settings.output_dir)
+        self.assertEqual(settings.camera, "persp")
+        self.assertEqual(reloaded.get_frame_range(self.rsv), (1, 6))
+
+
+class TestRenderJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.yaml_path = root / "renders.yaml"
+        self.manager = RenderManager(str(self.yaml_path))
+        self.rsv = self.manager.new_render_version(RenderSettings("Arnold", 24, root / "Renders"))
+        self.version_file = root / "renders" / f"{self.rsv}.yaml"
+        self.snapshot = self.version_file.read_text()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_update_frame_appends_without_rewriting_snapshot(self):
+        for frame in (3, 1, 2, 2):
+            self.manager.update_frame(self.rsv, frame)
+
+        self.assertEqual(self.version_file.read_text(), self.snapshot)
+        self.assertEqual(len(self.manager.journal), 3)
+        self.assertEqual(self.manager.get_frames(self.rsv), [1, 2, 3])
+        self.assertEqual(RenderManager(str(self.yaml_path)).get_frames(self.rsv), [1, 2, 3])
+
+    def test_torn_journal_line_is_ignored(self):
+        self.manager.update_frame(self.rsv, 1)
+        with open(self.manager.journal.path, "a") as f:
+            f.write('{"rsv": "%s", "fra' % self.rsv)
+
+        self.assertEqual(RenderManager(str(self.yaml_path)).get_frames(self.rsv), [1])
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        with patch("core.rendering.JOURNAL_COMPACT_EVERY", 4):
+            for frame in range(1, 6):
+                self.manager.update_frame(self.rsv, frame)
+
+        self.assertEqual(len(self.manager.journal), 1)  # frame 5, after compacting 1-4
+        reloaded = RenderManager(str(self.yaml_path))
+        self.assertEqual(reloaded.get_frames(self.rsv), [1, 2, 3, 4, 5])
+        with open(self.version_file) as f:
+            self.assertEqual(yaml.safe_load(f)["frames"], "1-4")
+
+    def test_threads_record_while_versions_are_read_and_created(self):
+        errors = []
+
+        def record(frames):
+            try:
+                for frame in frames:
+                    self.manager.update_frame(self.rsv, frame)
+            except Exception as e:
+                errors.append(e)
+
+        with patch("core.rendering.JOURNAL_COMPACT_EVERY", 25):
+            workers = [threading.Thread(target=record, args=(range(i, 400, 8),)) for i in range(8)]
+            for worker in workers:
+                worker.start()
+            for _ in range(5):  # what the render window does meanwhile on the GUI thread
+                self.manager.new_render_version(RenderSettings("Arnold", 24, Path(self.tmp.name) / "Renders"))
+                self.manager.get_render_versions()
+                self.manager.frame_version_table()
+            for worker in workers:
+                worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.manager.get_frames(self.rsv), list(range(400)))
+        self.assertEqual(RenderManager(str(self.yaml_path)).get_frames(self.rsv), list(range(400)))
+
+
+class TestRenderHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.yaml_path = str(self.root / "renders.yaml")
+        manager = RenderManager(self.yaml_path)
+        for i in range(5):
+            rsv = manager.new_render_version(RenderSettings("Arnold", 24, self.root / "Renders"), (1, 10))
+            manager.update_frame(rsv, i + 1)
+        manager.compact()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_opening_reads_only_the_index(self):
+        manager = RenderManager(self.yaml_path)
+        self.assertEqual(manager.get_render_versions(), ["rsv001", "rsv002", "rsv003", "rsv004", "rsv005"])
+        self.assertEqual(manager.get_frame_range("rsv003"), (1, 10))
+        self.assertEqual(manager.get_summary("rsv003")["frame_count"], 1)
+        self.assertEqual([v.render_settings_id for v in manager.frame_versions(3)], ["rsv003"])
+        self.assertEqual(manager.history.loads, 1)  # frame_versions skipped versions the index rules out
+
+        self.assertEqual(manager.get_frames("rsv002"), [2])
+        self.assertEqual(manager.history.loaded(), ["rsv003", "rsv002"])
+
+    def test_attached_model_is_cached_and_reread_only_where_frames_changed(self):
+        manager = RenderManager(self.yaml_path)
+        project = manager.attach_model(Project("P", "@P"))
+        self.assertEqual([r.id for r in project.render_settings_versions], manager.get_render_versions())
+        self.assertEqual([(v.frame_number, v.render_settings_id) for v in project.frame_versions],
+                         [(1, "rsv001"), (2, "rsv002"), (3, "rsv003"), (4, "rsv004"), (5, "rsv005")])
+        manager.update_frame("rsv001", 6)  # kept current as frames finish
+        self.assertEqual(list(project.render_settings_version("rsv001").frames), [1, 6])
+        manager.close()
+        self.assertTrue(Path(self.root / "renders.model").exists())
+
+        other = RenderManager(self.yaml_path)  # another process renders more
+        other.update_frame("rsv004", 8)
+        other.compact()
+        other.update_frame("rsv002", 7)  # journaled only
+
+        reopened = RenderManager(self.yaml_path)
+        project = reopened.attach_model(Project("P", "@P"))
+        self.assertEqual(reopened.history.loaded(), ["rsv004"])  # its frame count in the index changed
+        self.assertEqual(list(project.render_settings_version("rsv002").frames), [2, 7])
+        self.assertEqual(list(project.render_settings_version("rsv004").frames), [4, 8])
+        self.assertEqual([(v.render_settings_id, v.output_path) for v in reopened.frame_versions(6)],
+                         [("rsv001", str(reopened.frame_path("rsv001", 6)))])
+
+    def test_unreadable_model_cache_is_rebuilt(self):
+        (self.root / "renders.model").write_bytes(b"not a project")
+        manager = RenderManager(self.yaml_path)
+        project = manager.attach_model(Project("P", "@P"))
+        self.assertEqual(len(project.frame_versions), 5)
+        self.assertEqual(len(RenderManager(self.yaml_path).attach_model(Project("P", "@P")).frame_versions), 5)
+
+    def test_lru_eviction_keeps_journaled_frames(self):
+        with patch("core.rendering.VERSION_CACHE_SIZE", 2):
+            manager = RenderManager(self.yaml_path)
+        manager.update_frame("rsv001", 9)
+        for rsv in ("rsv002", "rsv003", "rsv004"):
+            manager.get_render_info(rsv)
+        self.assertEqual(manager.history.loaded(), ["rsv003", "rsv004"])
+
+        self.assertEqual(manager.get_frames("rsv001"), [1, 9])  # reloaded from file + journal
+        self.assertEqual(RenderManager(self.yaml_path).get_frames("rsv001"), [1, 9])
+
+    def test_single_file_layout_is_split_on_first_write(self):
+        legacy = self.root / "legacy"
+        legacy.mkdir()
+        path = legacy / "renders.yaml"
+        path.write_text(yaml.safe_dump({"renders": {"rsv001": {
+            "settings": {"renderer": "Arnold", "output_dir": str(legacy), "output_format": "EXR"},
+            "frame_range": [1, 4], "frames": [1, 2]}}}))
+
+        manager = RenderManager(str(path))
+        self.assertEqual(manager.get_frames("rsv001"), [1, 2])
+        manager.new_render_version(RenderSettings("Karma", 24, legacy / "Renders"))
+
+        self.assertFalse(path.exists())
+        self.assertTrue((legacy / "renders.yaml.migrated").exists())
+        reloaded = RenderManager(str(path))
+        self.assertEqual(reloaded.get_render_versions(), ["rsv001", "rsv002"])
+        self.assertEqual(reloaded.get_frames("rsv001"), [1, 2])
+
+
+class TestRenderOutputIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.yaml_path = str(self.root / "renders.yaml")
+        self.manager = RenderManager(self.yaml_path)
+        self.rsvs = [self.manager.new_render_version(RenderSettings("Arnold", 24, self.root / "Renders"), (1, 10))
+                     for _ in range(3)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, rsv, frame, data=b"exr"):
+        path = self.manager.frame_path(rsv, frame)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self.manager.update_frame(rsv, frame, path)
+        return str(path)
+
+    def test_frames_are_indexed_as_they_complete(self):
+        first = self.render("rsv001", 4)
+        latest = self.render("rsv003", 4)
+        self.render("rsv002", 5)
+
+        with patch("os.scandir", side_effect=AssertionError("gallery query listed a folder")):
+            outputs = RenderManager(self.yaml_path).output_files(4)
+        self.assertEqual([(o.rsv, o.version, o.path) for o in outputs], [("rsv001", 1, first), ("rsv003", 3, latest)])
+        self.assertEqual(outputs[0].size, 3)
+
+        self.render("rsv001", 4, b"re-rendered")  # same version again: the newer record wins
+        self.assertEqual(self.manager.output_files(4)[0].size, 11)
+
+    def test_rebuild_scans_output_folders(self):
+        self.render("rsv002", 7)
+        (self.root / "Renders" / "rsv001").mkdir(parents=True)
+        (self.root / "Renders" / "rsv001" / "rf7v001.exr").write_bytes(b"copied in by hand")
+        (self.root / "Renders" / "rsv001" / "rf7v001.png").write_bytes(b"other format")
+        Path(self.manager.outputs.path).unlink()
+
+        manager = RenderManager(self.yaml_path)
+        self.assertEqual([o.rsv for o in manager.output_files(7)], ["rsv001", "rsv002"])
+        self.assertEqual(manager.output_files(8), [])
@@ -0,0 +1,114 @@
+import logging
+
+import pytest
+import yaml
+
+from core import storage
+from core.rendering import RenderManager, RenderSettings
+from core.scheduler import RenderQueue, Scheduler, engine_executor, parse_frames
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return RenderQueue(str(tmp_path / "render_queue.yaml"))
+
+
+class RecordingExecutor:
+    """Renders nothing; remembers which job each slice went to."""
+    def __init__(self, fail=()):
+        self.slices = []
+        self.fail = set(fail)
+        self.before_slice = None
+
+    def __call__(self, job, frames):
+        if self.before_slice:
+            self.before_slice(len(self.slices))
+        self.slices.append((job.id, list(frames)))
+        return [f for f in frames if f not in self.fail], [f for f in frames if f in self.fail]
+
+
+def test_higher_priority_preempts_at_slice_boundary(queue, tmp_path):
+    low = queue.submit(tmp_path / "ProjA", "rsv001", range(1, 7), shot="sh010")
+    executor = RecordingExecutor()
+
+    def submit_urgent(slice_index):
+        if slice_index == 1:
+            queue.submit(tmp_path / "ProjB", "rsv001", [50, 51], shot="sh020", priority=10)
+
+    executor.before_slice = submit_urgent
+    Scheduler(queue, executor, slice_size=2).run()
+
+    assert [job_id for job_id, _ in executor.slices] == [low.id, low.id, "job0002", low.id]
+    assert queue.jobs[low.id].status == "done"
+    assert queue.jobs[low.id].done == list(range(1, 7))
+
+
+def test_fair_share_alternates_between_projects(queue, tmp_path):
+    a = queue.submit(tmp_path / "ProjA", "rsv001", range(1, 7))
+    b = queue.submit(tmp_path / "ProjB", "rsv001", range(1, 7))
+    executor = RecordingExecutor()
+
+    Scheduler(queue, executor, slice_size=2).run()
+
+    assert [job_id for job_id, _ in executor.slices] == [a.id, b.id, a.id, b.id, a.id, b.id]
+
+
+def test_fair_share_ignores_finished_work(queue, tmp_path):
+    old = queue.submit(tmp_path / "ProjA", "rsv001", range(1, 101))
+    Scheduler(queue, RecordingExecutor(), slice_size=50).run()  # last week's render
+    assert queue.jobs[old.id].status == "done" and queue.served == {}
+
+    a = queue.submit(tmp_path / "ProjA", "rsv002", range(1, 7))
+    b = queue.submit(tmp_path / "ProjB", "rsv001", range(1, 7))
+    executor = RecordingExecutor()
+    Scheduler(queue, executor, slice_size=2).run()
+
+    assert [job_id for job_id, _ in executor.slices] == [a.id, b.id, a.id, b.id, a.id, b.id]
+
+
+def test_queue_survives_restart(queue, tmp_path):
+    job = queue.submit(tmp_path / "ProjA", "rsv001", range(1, 5), shot="sh010", priority=3)
+    queue.start_slice(job.id, [1, 2])  # scheduler dies mid-slice
+
+    reopened = RenderQueue(queue.path)
+    reopened.requeue_interrupted()
+    executor = RecordingExecutor(fail=[4])
+    Scheduler(reopened, executor, slice_size=4).run()
+
+    restored = RenderQueue(queue.path).jobs[job.id]
+    assert (restored.shot, restored.priority) == ("sh010", 3)
+    assert restored.done == [1, 2, 3]
+    assert restored.failed == [4]
+    assert restored.status == "failed"
+
+
+def test_cancelled_jobs_are_skipped(queue, tmp_path):
+    job = queue.submit(tmp_path / "ProjA", "rsv001", range(1, 5))
+    queue.cancel(job.id)
+
+    assert Scheduler(queue, RecordingExecutor()).run_once() is None
+    assert queue.summary()[0]["status"] == "cancelled"
+
+
+def test_engine_executor_logs_failures_and_closes_the_database(queue, tmp_path, monkeypatch, caplog):
+    (tmp_path / "Config").mkdir()
+    (tmp_path / "Config" / "metadata.yaml").write_text(yaml.safe_dump({"project_name": "P", "project_dir": str(tmp_path)}))
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    rsv = manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), frame_range=(1, 4))
+    storage.migrate_yaml_project(tmp_path).close()
+    job = queue.submit(tmp_path, rsv, range(1, 5))
+
+    opened, closed = [], []
+    init, close = storage.SqliteBackend.__init__, storage.SqliteBackend.close
+    monkeypatch.setattr(storage.SqliteBackend, "__init__", lambda backend, path: opened.append(backend) or init(backend, path))
+    monkeypatch.setattr(storage.SqliteBackend, "close", lambda backend: closed.append(backend) or close(backend))
+    with caplog.at_level(logging.ERROR, logger="core.scheduler"):
+        done, failed = engine_executor(job, [1, 2])  # metadata names no scene file
+
+    assert (done, failed) == ([], [1, 2])
+    assert opened and opened == closed
+    assert "scene_file" in caplog.text  # the renderer's own error, not just "2 frame(s) failed"
+
+
+def test_parse_frames():
+    assert parse_frames("1-3,7, 9-10") == [1, 2, 3, 7, 9, 10]
@@ -0,0 +1,191 @@
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from core.models import FrameVersion
+from core.project import ProjectConfig
+from core.rendering import RenderManager, RenderSettings
+from core.storage import (SqliteBackend, MetadataCache, METADATA_CACHE, migrate_yaml_project, load_metadata,
+                          read_yaml, atomic_write_yaml, DB_FILE)
+
+
+@pytest.fixture
+def yaml_project(tmp_path):
+    project_dir = tmp_path / "YamlProject"
+    project_dir.mkdir()
+    config = ProjectConfig("YamlProject", str(project_dir), ["scene.mb"])
+    config.add_shot("SH010", [1, 10])
+    config.add_shot("SH020", [11, 20])
+    config.add_render_setting("rsv001", {"renderer": "Arnold"})
+    config.add_render("rsv001", "SH010_rf1")
+
+    manager = RenderManager(str(project_dir / "Config" / "renders.yaml"))
+    for frame_range in [(1, 20), (50, 60)]:
+        rsv = manager.new_render_version(RenderSettings("Arnold", 24, project_dir / "Renders"), frame_range)
+        for frame in (1, 2, 57):
+            manager.update_frame(rsv, frame)
+    return project_dir
+
+
+def test_sqlite_project_config_round_trip(tmp_path):
+    project_dir = tmp_path / "DbProject"
+    project_dir.mkdir()
+    (project_dir / "Config").mkdir()
+    backend = SqliteBackend(project_dir / "Config" / DB_FILE)
+
+    config = ProjectConfig("DbProject", str(project_dir), ["scene.mb"], backend=backend)
+    config.add_shot("SH010", [1, 10])
+    config.add_shot("SH020", [11, 20])
+    config.add_shot("SH010", [1, 12])
+    config.add_render_setting("rsv001", {"renderer": "Karma"})
+    config.add_render("rsv001", "SH010_rf1")
+    config.add_render("rsv001", "SH020_rf11")
+    config.remove_shot("SH020")
+
+    assert not (project_dir / "Config" / "metadata.yaml").exists()
+    reloaded = ProjectConfig("DbProject", str(project_dir))  # picks project.db up on its own
+    assert reloaded.data["shots"] == ["SH010"]
+    assert reloaded.data["shot_struct"] == {"SH010": [1, 12]}
+    assert reloaded.data["renderSettings"] == {"rsv001": {"renderer": "Karma"}}
+    assert reloaded.data["renders"] == {"rsv001": ["SH010_rf1"]}
+    assert reloaded.data["project_tag"] == "@DbProject"
+
+
+def test_sqlite_render_manager_records_frames(tmp_path):
+    backend = SqliteBackend(tmp_path / DB_FILE)
+    manager = RenderManager(str(tmp_path / "renders.yaml"), backend=backend)
+    rsv = manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), (1, 5))
+    for frame in (3, 1, 3):
+        manager.update_frame(rsv, frame)
+
+    assert not (tmp_path / "renders.yaml").exists()
+    reloaded = RenderManager(str(tmp_path / "renders.yaml"))
+    assert reloaded.get_frames(rsv) == [1, 3]
+    assert reloaded.get_frame_range(rsv) == (1, 5)
+    assert reloaded.get_settings(rsv).renderer == "Arnold"
+
+
+def test_frame_lookup_uses_index(tmp_path):
+    backend = SqliteBackend(tmp_path / DB_FILE)
+    plan = " ".join(row[-1] for row in backend._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM frame_versions WHERE frame_number = 57"))
+    assert "frame_versions_by_frame" in plan
+
+
+def test_transaction_rolls_back(tmp_path):
+    backend = SqliteBackend(tmp_path / DB_FILE)
+    with pytest.raises(RuntimeError):
+        with backend.transaction():
+            backend.put_shot("SH010", [1, 10])
+            raise RuntimeError("boom")
+    assert backend._conn.execute("SELECT COUNT(*) FROM shots").fetchone()[0] == 0
+
+
+def test_migrate_yaml_project(yaml_project):
+    config_dir = yaml_project / "Config"
+    before = RenderManager(str(config_dir / "renders.yaml"))
+    expected_versions = [FrameVersion(57, 1, "rsv001", str(before.frame_path("rsv001", 57))),
+                         FrameVersion(57, 2, "rsv002", str(before.frame_path("rsv002", 57)))]
+    assert before.frame_versions(57) == expected_versions
+
+    migrate_yaml_project(yaml_project).close()
+
+    assert (config_dir / "metadata.yaml.migrated").exists()
+    assert not (config_dir / "renders.yaml").exists()
+    assert not (config_dir / "renders").exists()
+    metadata = load_metadata(config_dir)
+    assert metadata["shots"] == ["SH010", "SH020"]
+    assert metadata["shot_struct"] == {"SH010": [1, 10], "SH020": [11, 20]}
+    assert metadata["renders"] == {"rsv001": ["SH010_rf1"]}
+
+    after = RenderManager(str(config_dir / "renders.yaml"))
+    assert after.backend is not None
+    assert after.get_render_versions() == ["rsv001", "rsv002"]
+    assert after.get_frames("rsv002") == [1, 2, 57]
+    assert after.frame_versions(57) == expected_versions
+
+    with pytest.raises(FileExistsError):
+        migrate_yaml_project(yaml_project)
+
+
+def test_sqlite_batch_is_one_transaction(tmp_path):
+    (tmp_path / "Config").mkdir()
+    backend = SqliteBackend(tmp_path / "Config" / DB_FILE)
+    config = ProjectConfig("DbProject", str(tmp_path), backend=backend)
+    config.add_shots({"SH010": [1, 10], "SH020": [11, 20]})
+
+    with pytest.raises(RuntimeError):
+        with config.batch():
+            config.add_shot("SH030", [21, 30])
+            config.remove_shot("SH010")
+            raise RuntimeError("import failed")
+
+    assert config.data["shots"] == ["SH010", "SH020"]
+    assert ProjectConfig("DbProject", str(tmp_path)).data["shots"] == ["SH010", "SH020"]
+
+
+def test_metadata_cache_reuses_parse_until_file_changes(tmp_path):
+    cache = MetadataCache()
+    path = tmp_path / "metadata.yaml"
+    path.write_text("shots: [SH010]\n")
+
+    first = cache.load(path)
+    first["shots"].append("mutated")
+    assert cache.load(path) == {"shots": ["SH010"]}  # callers get private copies
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    path.write_text("shots: [SH010, SH020]\n")  # in-place rewrite: size changes
+    assert cache.load(path) == {"shots": ["SH010", "SH020"]}
+    assert cache.misses == 2
+
+
+def test_atomic_write_refreshes_shared_cache(tmp_path):
+    path = tmp_path / "renders.yaml"
+    atomic_write_yaml(path, {"renders": {"rsv001": {"frames": [1]}}})
+    misses = METADATA_CACHE.misses
+    assert read_yaml(path) == {"renders": {"rsv001": {"frames": [1]}}}
+    assert METADATA_CACHE.misses == misses  # the writer's own data was cached
+
+    atomic_write_yaml(path, {"renders": {"rsv001": {"frames": [2]}}})
+    assert RenderManager(str(path)).get_frames("rsv001") == [2]
+
+
+STRESS_WORKER = """
+import sys
+import core.rendering
+from core.rendering import RenderManager
+from core.project import ProjectConfig
+
+core.rendering.JOURNAL_COMPACT_EVERY = 7  # compact constantly, racing the other workers
+project_dir, worker, workers, frames = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+manager = RenderManager(project_dir + "/Config/renders.yaml")
+config = ProjectConfig("Stress", project_dir)
+for frame in range(1 + worker, frames + 1, workers):
+    manager.update_frame("rsv001", frame)
+    if frame % 5 == 0:
+        config.add_render("rsv001", f"SH010_rf{frame}")
+config.add_shot(f"SH{worker:03d}", [worker, worker])
+"""
+
+
+def test_concurrent_processes_lose_no_frames(tmp_path):
+    workers, frames = 8, 400
+    ProjectConfig("Stress", str(tmp_path))
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    manager.new_render_version(RenderSettings("Arnold", 24, tmp_path / "Renders"), (1, frames))
+
+    repo_root = Path(__file__).resolve().parents[1]
+    procs = [subprocess.Popen([sys.executable, "-c", STRESS_WORKER, str(tmp_path), str(w), str(workers), str(frames)],
+                              cwd=repo_root, stderr=subprocess.PIPE, text=True) for w in range(workers)]
+    for proc in procs:
+        _, err = proc.communicate(timeout=120)
+        assert proc.returncode == 0, err
+
+    reloaded = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    assert reloaded.get_frames("rsv001") == list(range(1, frames + 1))
+    metadata = ProjectConfig("Stress", str(tmp_path)).data
+    assert sorted(metadata["shots"]) == [f"SH{w:03d}" for w in range(workers)]
+    expected = sorted(f"SH010_rf{f}" for f in range(5, frames + 1, 5))
+    assert sorted(metadata["renders"]["rsv001"]) == expected
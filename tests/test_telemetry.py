@@ -0,0 +1,88 @@
+import asyncio
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from core.rendering import RenderSettings, Renderer, RenderManager, RenderEngine
+from core.telemetry import TelemetryStore
+
+FAKE_DCC = str(Path(__file__).parent / "stubs" / "fake_dcc.py")
+
+
+@pytest.fixture
+def project(tmp_path):
+    scene_dir = tmp_path / "Scene"
+    scene_dir.mkdir()
+    (scene_dir / "scene.mb").write_bytes(b"")
+    (tmp_path / "Config").mkdir()
+    return {
+        "project_name": "TestProject",
+        "project_dir": str(tmp_path),
+        "scene_file": ["scene.mb", "scene.usda"],
+    }
+
+
+def make_renderer(project):
+    settings = RenderSettings("Arnold", 24, Path(project["project_dir"]) / "Renders")
+    manager = RenderManager(str(Path(project["project_dir"]) / "Config" / "renders.yaml"))
+    rsv = manager.new_render_version(settings)
+    store = TelemetryStore(Path(project["project_dir"]) / "Config")
+    renderer = Renderer(settings, metadata=project, rsv=rsv, mayapy=FAKE_DCC, telemetry=store)
+    return renderer, manager, store
+
+
+def test_engine_records_telemetry_per_frame(project):
+    renderer, manager, store = make_renderer(project)
+    RenderEngine(renderer, manager=manager, max_workers=2, chunk_size=3).run(range(1, 7))
+
+    records = store.load(renderer.rsv)
+    assert sorted(r["frame"] for r in records) == list(range(1, 7))
+    assert (Path(project["project_dir"]) / "Config" / "telemetry" / f"{renderer.rsv}.jsonl").exists()
+    for r in records:
+        assert r["ok"] and r["exit_status"] == 0
+        assert r["chunk_size"] == 3
+        assert r["wall_seconds"] >= 0
+        assert r["user_cpu_seconds"] is not None and r["peak_rss_kb_max_process"] > 0
+        assert r["output_bytes"] > 0
+
+
+def test_failed_chunk_records_exit_status(project, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_FAIL_FRAMES", "2")
+    renderer, _, store = make_renderer(project)
+
+    with pytest.raises(subprocess.CalledProcessError):
+        renderer.render_chunk([1, 2, 3])
+
+    records = {r["frame"]: r for r in store.load(renderer.rsv)}
+    assert records[1]["ok"] and not records[2]["ok"] and not records[3]["ok"]
+    assert all(r["exit_status"] != 0 for r in records.values())
+
+
+def test_async_render_records_telemetry(project):
+    renderer, _, store = make_renderer(project)
+    asyncio.run(renderer.render_frames([1, 2]))
+    assert sorted(r["frame"] for r in store.load(renderer.rsv)) == [1, 2]
+
+
+def test_query_helpers(tmp_path):
+    store = TelemetryStore(tmp_path)
+
+    def rec(frame, wall, rss, ok=True):
+        return {"frame": frame, "ok": ok, "wall_seconds": wall, "user_cpu_seconds": 1.0,
+                "system_cpu_seconds": 0.5, "peak_rss_kb_max_process": rss, "exit_status": 0 if ok else 1,
+                "output_bytes": 10 if ok else 0, "chunk_size": 1}
+
+    store.record("rsv001", [rec(1, 2.0, 100), rec(2, 9.0, 300), rec(3, 4.0, 200)])
+    store.record("rsv002", [rec(11, 6.0, 900), rec(12, 50.0, 50, ok=False)])
+
+    assert [r["frame"] for r in store.slowest_frames(n=2)] == [2, 11]
+    assert store.mean_frame_time("rsv001") == pytest.approx(5.0)
+    assert store.mean_per_shot({"SH010": [1, 2], "SH020": [3, 10], "SH030": [11, 20]}) == \
+        pytest.approx({"SH010": 5.5, "SH020": 4.0, "SH030": 6.0})
+    assert store.peak_rss_kb_max_process("rsv001") == 300
+    assert store.peak_rss_kb_max_process() == 900
+    legacy = dict(rec(21, 1.0, None), peak_rss_kb=1200)  # written before the field was renamed
+    store.record("rsv003", [legacy])
+    assert store.peak_rss_kb_max_process() == 1200
+    assert store.summary("rsv002")["failed"] == 1
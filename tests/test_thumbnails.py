@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from PIL import Image
+
+import core.thumbnails
+from core.thumbnails import ThumbnailCache, THUMBNAIL_SIZE
+
+
+@pytest.fixture
+def renders(tmp_path):
+    paths = []
+    for v in range(1, 4):
+        path = tmp_path / "Renders" / f"rsv{v:03d}" / f"rf1v{v:03d}.png"
+        path.parent.mkdir(parents=True)
+        Image.new("RGB", (1920, 1080), (40 * v, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_thumbnail_is_generated_once(tmp_path, renders, monkeypatch):
+    cache = ThumbnailCache.for_project(str(tmp_path))
+    thumb = cache.thumbnail(renders[0])
+    assert thumb.startswith(str(tmp_path / "Config" / "thumbnails"))
+    with Image.open(thumb) as im:
+        assert im.size[0] <= THUMBNAIL_SIZE[0] and im.size[1] <= THUMBNAIL_SIZE[1]
+
+    opened = []
+    monkeypatch.setattr(core.thumbnails.Image, "open", lambda *a: opened.append(a))
+    again = ThumbnailCache.for_project(str(tmp_path))  # a later gallery open
+    assert again.thumbnail(renders[0]) == thumb
+    assert opened == [] and again.hits == 1
+
+
+def test_rerendered_frame_gets_a_new_thumbnail(tmp_path, renders):
+    cache = ThumbnailCache.for_project(str(tmp_path))
+    first = cache.thumbnail(renders[0])
+    Image.new("RGB", (640, 480), (0, 255, 0)).save(renders[0])
+    os.utime(renders[0], ns=(1, 1))
+    assert cache.thumbnail(renders[0]) != first
+    assert cache.thumbnail(str(tmp_path / "missing.png")) is None
+
+
+def test_least_recently_used_are_evicted(tmp_path, renders):
+    cache = ThumbnailCache.for_project(str(tmp_path))
+    thumbs = [cache.thumbnail(p) for p in renders]
+    for i, thumb in enumerate(thumbs):
+        os.utime(thumb, ns=(i, i))
+    cache.get(renders[0])  # most recently used now
+
+    cache.max_bytes = os.path.getsize(thumbs[0]) + os.path.getsize(thumbs[2])
+    cache.evict()
+    assert [os.path.exists(t) for t in thumbs] == [True, False, True]
+    assert cache.total_bytes() <= cache.max_bytes
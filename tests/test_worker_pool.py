@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+from core.rendering import RenderSettings, Renderer, RenderManager, RenderEngine, WorkerPool
+
+FAKE_DCC = str(Path(__file__).parent / "stubs" / "fake_dcc.py")
+
+
+@pytest.fixture
+def project(tmp_path):
+    scene_dir = tmp_path / "Scene"
+    scene_dir.mkdir()
+    (scene_dir / "scene.mb").write_bytes(b"")
+    (tmp_path / "Config").mkdir()
+    return {
+        "project_name": "TestProject",
+        "project_dir": str(tmp_path),
+        "scene_file": ["scene.mb"],
+    }
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=2)
+    yield pool
+    pool.close()
+
+
+def new_renderer(project, pool, manager):
+    settings = RenderSettings("Arnold", 24, Path(project["project_dir"]) / "Renders")
+    rsv = manager.new_render_version(settings)
+    return Renderer(settings, metadata=project, rsv=rsv, mayapy=FAKE_DCC, pool=pool)
+
+
+def test_warm_workers_are_reused_across_render_versions(project, pool, tmp_path, monkeypatch):
+    log = tmp_path / "launches.log"
+    monkeypatch.setenv("FAKE_DCC_LOG", str(log))
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+
+    for _ in range(2):
+        renderer = new_renderer(project, pool, manager)
+        outputs = RenderEngine(renderer, manager=manager, max_workers=2).run(range(1, 7))
+        assert [p.name for p in outputs] == [f"rf{f}v{renderer.rsv[3:]}.exr" for f in range(1, 7)]
+        assert all(p.exists() for p in outputs)
+        assert manager.get_frames(renderer.rsv) == list(range(1, 7))
+
+    # Two render versions, twelve frames, but only the two pooled processes were started
+    assert len(log.read_text().splitlines()) == 2
+
+
+def test_failed_job_keeps_worker_alive(project, pool, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_DCC_FAIL_FRAMES", "2")
+    manager = RenderManager(str(tmp_path / "Config" / "renders.yaml"))
+    renderer = new_renderer(project, pool, manager)
+
+    with pytest.raises(RuntimeError, match="Frame 2 failed"):
+        renderer.render_shot({"frame": 2})
+
+    assert renderer.render_shot({"frame": 3}).exists()
+    assert sum(len(idle) for idle in pool._idle.values()) == 1
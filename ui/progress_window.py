@@ -1,8 +1,9 @@
-from PySide2.QtWidgets import QWidget, QLabel, QVBoxLayout, QProgressBar
+from PySide2.QtWidgets import QWidget, QLabel, QVBoxLayout, QProgressBar, QPushButton
 from PySide2.QtCore import Qt, QTimer, QThreadPool
 
 class ProgressWindow(QWidget):
-    def __init__(self, message="Processing...", duration=None, worker=None, on_complete=None, determinate=False, maximum=100):
+    def __init__(self, message="Processing...", duration=None, worker=None, on_complete=None, determinate=False, maximum=100,
+                 on_cancel=None):
         super().__init__()
         self.setWindowTitle("Please Wait")
         self.setFixedSize(300, 100)
@@ -23,6 +24,14 @@ class ProgressWindow(QWidget):
         layout = QVBoxLayout()
         layout.addWidget(self.label, alignment=Qt.AlignCenter)
         layout.addWidget(self.progress_bar)
+
+        # Optional cancel button
+        self.on_cancel = on_cancel
+        if callable(on_cancel):
+            self.setFixedSize(300, 130)
+            self.cancel_button = QPushButton("Cancel")
+            self.cancel_button.clicked.connect(self.cancel)
+            layout.addWidget(self.cancel_button, alignment=Qt.AlignCenter)
         self.setLayout(layout)
 
         self.on_complete = on_complete
@@ -52,6 +61,12 @@ class ProgressWindow(QWidget):
         if self.progress_bar.maximum() > 0:
             self.progress_bar.setValue(value)
 
+    def cancel(self):
+        """Ask the running task to stop; the owner closes the window once it has."""
+        self.cancel_button.setEnabled(False)
+        self.update_message("Cancelling...")
+        self.on_cancel()
+
     def task_done(self):
         self.close()
         if callable(self.on_complete):
@@ -1,6 +1,5 @@
 import os
 import logging
-import yaml
 
 from PySide2.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,  QLineEdit, QListWidget,QListWidgetItem,
@@ -14,14 +13,25 @@ from PySide2.QtGui import QIcon, QImage, QPainter, QPixmap
 from ui.progress_window import ProgressWindow
 from ui.render_window import RenderSettingsWindow
 from ui.render_gallery import ManageShotsWindow3Panel
+from ui.workers import EventRelay
+from core import events
+from core.project import ProjectConfig
 
 
 class MainProjectWindow(QWidget):
     def __init__(self, metadata_file=None, metadata=None):
         super().__init__()
         self.metadata_file = metadata_file
-        self.metadata = self.load_metadata(self.metadata_file)
-    
+        # Shots are changed through self.config, which saves each change and
+        # announces it on the project's event bus; open panels patch their rows.
+        # Without a metadata file the config edits the given dict in memory
+        if metadata_file:
+            self.config = ProjectConfig.open(metadata_file)
+            self.config.follow()
+        else:
+            self.config = ProjectConfig.in_memory(metadata if metadata is not None else {})
+        self._shot_items = {}  # shot name -> QTreeWidgetItem
+
         self.scene_file = self.metadata.get("scene_file", "No scene file")
         self.project_path = self.metadata.get("project_dir", "")
 
@@ -91,13 +101,16 @@ class MainProjectWindow(QWidget):
 
         self.refresh_project_structure()
 
-    def load_metadata(self, file_path):
-        try:
-            with open(file_path, "r") as f:
-                return yaml.safe_load(f) or {}
-        except FileNotFoundError:
-            return {}
+        self.event_relay = EventRelay(self.config.events, parent=self)
+        self.event_relay.received.connect(self.on_project_event)
+
+    @property
+    def metadata(self):
+        return self.config.data
 
+    @metadata.setter
+    def metadata(self, value):
+        self.config.data = value
 
     def get_project_structure_dict(self):
         """
@@ -120,8 +133,8 @@ class MainProjectWindow(QWidget):
         """Scan project 'Shots' directory and list shots + renders."""
         # Shots
         self.project_structure.clear()
-        shot_list = self.metadata.get('shots', [])
-        shot_struct = self.metadata.get("shot_struct", {})
+        self._shot_items = {}
+        shot_list = self.config.model.shots
 
         # Renders
         renders = self.metadata.get("renders", {})
@@ -134,39 +147,71 @@ class MainProjectWindow(QWidget):
         self.project_structure.addTopLevelItem(shots_item)
         
         if shot_list:
-            for shot_name in shot_list:
-                frames = shot_struct.get(shot_name, [1, 100])
-                shot_item = QTreeWidgetItem([shot_name])
-                shot_item.setIcon(0, QIcon.fromTheme("image-x-generic"))
-
-                shots_item.addChild(shot_item)                
-                
-                # Frames
-                frames = shot_struct.get(shot_name)
-
-                # Add Render Icon to NamedShot Top Level
-                render_btn = QPushButton()
-                render_btn.setIcon(QIcon.fromTheme("media-playback-start"))  # or your custom icon
-                render_btn.setMaximumSize(10, 15)     
-                render_btn.setToolTip(f"Render {shot_name}")
-                render_btn.clicked.connect(lambda checked=False, s=shot_name, f=frames: self.open_render_for_shot(s, f))
-
-                if self.project_structure.columnCount() < 2:
-                    self.project_structure.setColumnCount(2)
-                self.project_structure.setItemWidget(shot_item, 1, render_btn)
-
-                if frames and isinstance(frames, (tuple, list)) and len(frames) == 2:
-                    for i in range(frames[0], frames[1] + 1):  # ✅ inclusive range
-                        frame_item = QTreeWidgetItem([f"Frame {i}"])
-                        frame_item.setIcon(0, QIcon.fromTheme("text-x-generic"))
-                        shot_item.addChild(frame_item)
-
-                else:
-                    self.logger.warning(f"Invalid frame data for shot '{shot_name}': {frames}")                   
+            for shot in shot_list:
+                self._add_shot_item(shot.id)
         else:
             no_shots_item = QTreeWidgetItem(["No shots found"])
             shots_item.addChild(no_shots_item)
 
+    def _add_shot_item(self, shot_name, index=None):
+        """Shot row with its render button and frame children, appended or inserted at index under 'Shots'."""
+        shots_item = self.project_structure.topLevelItem(0)
+        shot = self.config.model.shot(shot_name)
+        frames = shot.frame_range if shot is not None else None
+        shot_item = QTreeWidgetItem([shot_name])
+        shot_item.setIcon(0, QIcon.fromTheme("image-x-generic"))
+
+        if index is None:
+            shots_item.addChild(shot_item)
+        else:
+            shots_item.insertChild(index, shot_item)
+        self._shot_items[shot_name] = shot_item
+
+        # Add Render Icon to NamedShot Top Level
+        render_btn = QPushButton()
+        render_btn.setIcon(QIcon.fromTheme("media-playback-start"))  # or your custom icon
+        render_btn.setMaximumSize(10, 15)
+        render_btn.setToolTip(f"Render {shot_name}")
+        render_btn.clicked.connect(lambda checked=False, s=shot_name, f=frames: self.open_render_for_shot(s, f))
+
+        if self.project_structure.columnCount() < 2:
+            self.project_structure.setColumnCount(2)
+        self.project_structure.setItemWidget(shot_item, 1, render_btn)
+
+        if frames is not None:
+            for i in range(frames[0], frames[1] + 1):  # ✅ inclusive range
+                frame_item = QTreeWidgetItem([f"Frame {i}"])
+                frame_item.setIcon(0, QIcon.fromTheme("text-x-generic"))
+                shot_item.addChild(frame_item)
+        else:
+            self.logger.warning(f"Invalid frame data for shot '{shot_name}': {frames}")
+        return shot_item
+
+    def _take_shot_item(self, shot_name):
+        """Remove a shot row; returns its position, or None if it is not shown."""
+        shot_item = self._shot_items.pop(shot_name, None)
+        if shot_item is None:
+            return None
+        shots_item = self.project_structure.topLevelItem(0)
+        index = shots_item.indexOfChild(shot_item)
+        self.project_structure.removeItemWidget(shot_item, 1)
+        shots_item.takeChild(index)
+        return index
+
+    def on_project_event(self, event):
+        """Patch the shot rows a change touched instead of rebuilding the tree."""
+        if event.kind == events.SHOT_ADDED:
+            if not self._shot_items:  # drop the "No shots found" placeholder
+                self.project_structure.topLevelItem(0).takeChildren()
+            self._add_shot_item(event.shot, event.index)
+        elif event.kind in (events.SHOT_UPDATED, events.SHOT_RENAMED):
+            index = self._take_shot_item(event.old_shot or event.shot)
+            self._add_shot_item(event.shot, index)
+        elif event.kind == events.SHOT_REMOVED:
+            self._take_shot_item(event.shot)
+            if not self._shot_items:
+                self.project_structure.topLevelItem(0).addChild(QTreeWidgetItem(["No shots found"]))
+
     def open_render_for_shot(self, shot_name, frames):
         """Open the RenderSettingsWindow with the shot's frame range prefilled."""
         start_frame, end_frame = frames
@@ -184,10 +229,14 @@ class MainProjectWindow(QWidget):
     def open_shots_dir(self):
         if not hasattr(self, "project_view") or self.project_view is None:
             self.project_view = ManageShotsWindow3Panel(main_window=self)
+            self.project_view.destroyed.connect(self._forget_project_view)  # deleted on close
         self.project_view.show()
         self.project_view.raise_()
         self.project_view.activateWindow()
 
+    def _forget_project_view(self):
+        self.project_view = None
+
 
     def test_render(self):
         print("Simulating test render…")
@@ -211,6 +260,7 @@ class ManageShotsWindow(QWidget):
         self.setWindowTitle("Manage Shots")
         self.setFixedSize(500, 400)
         self.main_window = main_window  # reference to MainProjectWindow
+        self.config = main_window.config
 
         # Simulated frame range (placeholder if needed)
         self.frame_count = 100  
@@ -236,6 +286,9 @@ class ManageShotsWindow(QWidget):
         self.shot_list = QListWidget()
         self.refresh_shot_list()
 
+        self.event_relay = EventRelay(self.config.events, parent=self)
+        self.event_relay.received.connect(self.on_project_event)
+
         # Done / Cancel buttons
         done_button = QPushButton("Done")
         cancel_button = QPushButton("Cancel")
@@ -266,15 +319,48 @@ class ManageShotsWindow(QWidget):
         self.setLayout(layout)
 
     def refresh_shot_list(self):
-        """Load shots from main_window metadata into the list widget."""
+        """Load the project's shots into the list widget."""
         self.shot_list.clear()
-        shots = self.main_window.metadata.get("shots", [])
-        shot_struct = self.main_window.metadata.get("shot_struct", {})
-
-        for shot_name in shots:
-            frames = shot_struct.get(shot_name, [])
-            item_text = f"{shot_name} ({frames[0]}-{frames[1]})" if frames else shot_name
-            self.shot_list.addItem(QListWidgetItem(item_text))
+        for shot in self.config.model.shots:
+            self.shot_list.addItem(self._shot_list_item(shot.id))
+
+    def _shot_list_item(self, shot_name):
+        shot = self.config.model.shot(shot_name)
+        frames = shot.frame_range if shot is not None else None
+        item = QListWidgetItem(f"{shot_name} ({frames[0]}-{frames[1]})" if frames else shot_name)
+        item.setData(Qt.UserRole, shot_name)
+        return item
+
+    def _shot_row(self, shot_name):
+        for row in range(self.shot_list.count()):
+            if self.shot_list.item(row).data(Qt.UserRole) == shot_name:
+                return row
+        return None
+
+    def on_project_event(self, event):
+        """Patch the affected list row; changes arrive from this window or any other on the project."""
+        if event.kind == events.SHOT_ADDED:
+            self.shot_list.insertItem(event.index if event.index is not None else self.shot_list.count(),
+                                      self._shot_list_item(event.shot))
+            return
+        row = self._shot_row(event.old_shot or event.shot)
+        if row is None:
+            return
+        if event.kind == events.SHOT_REMOVED:
+            self.shot_list.takeItem(row)
+        else:  # updated or renamed: rewrite the row in place, keeping the selection
+            item = self.shot_list.item(row)
+            fresh = self._shot_list_item(event.shot)
+            item.setText(fresh.text())
+            item.setData(Qt.UserRole, event.shot)
+
+    def _parse_range(self, range_text):
+        try:
+            start, end = [int(x) for x in range_text.split("-")]
+        except Exception:
+            QMessageBox.warning(self, "Input Error", "Frame range must be in format start-end (e.g. 1-24).")
+            return None
+        return [start, end]
 
     def add_shot(self):
         name = self.shot_name_input.text().strip()
@@ -284,101 +370,54 @@ class ManageShotsWindow(QWidget):
             QMessageBox.warning(self, "Input Error", "Please provide both shot name and frame range.")
             return
 
-        try:
-            start, end = [int(x) for x in range_text.split("-")]
-        except Exception:
-            QMessageBox.warning(self, "Input Error", "Frame range must be in format start-end (e.g. 1-24).")
+        frames = self._parse_range(range_text)
+        if frames is None:
             return
 
-        # Update main_window metadata
-        shots = self.main_window.metadata.setdefault("shots", [])
-        shot_struct = self.main_window.metadata.setdefault("shot_struct", {})
-
-        if name in shots:
+        if self.config.model.shot(name) is not None:
             QMessageBox.warning(self, "Duplicate Shot", f"Shot '{name}' already exists.")
             return
 
-        shots.append(name)
-        shot_struct[name] = [start, end]
+        # Saved and announced by the config; both windows patch their rows from the event
+        self.config.add_shot(name, frames)
 
-        # Update UI
         self.shot_name_input.clear()
         self.range_input.clear()
-        self.refresh_shot_list()
-        self.main_window.refresh_project_structure()
-        self.save_metadata()
 
     def update_shot(self):
         selected_item = self.shot_list.currentItem()
         if not selected_item:
             return
 
-        old_text = selected_item.text()
-        old_name = old_text.split()[0]
-
+        old_name = selected_item.data(Qt.UserRole)
         new_name = self.shot_name_input.text().strip() or old_name
         range_text = self.range_input.text().strip()
-        shot_struct = self.main_window.metadata.get("shot_struct", {})
 
+        frames = None
         if range_text:
-            try:
-                start, end = [int(x) for x in range_text.split("-")]
-            except Exception:
-                QMessageBox.warning(self, "Input Error", "Frame range must be in format start-end (e.g. 1-24).")
+            frames = self._parse_range(range_text)
+            if frames is None:
                 return
-            shot_struct[new_name] = [start, end]
-
-        # Rename if necessary
-        shots = self.main_window.metadata.get("shots", [])
-        
-        if new_name != old_name:
-            if new_name in shots:
-                QMessageBox.warning(self, "Duplicate Shot", f"Shot '{new_name}' already exists.")
-                return
-            shots[shots.index(old_name)] = new_name
-            if old_name in shot_struct and new_name not in shot_struct:
-                shot_struct[new_name] = shot_struct.pop(old_name)
-            elif old_name in shot_struct:
-                shot_struct.pop(old_name)
 
+        if new_name != old_name and self.config.model.shot(new_name) is not None:
+            QMessageBox.warning(self, "Duplicate Shot", f"Shot '{new_name}' already exists.")
+            return
 
-        # if new_name != old_name:
-        #     if new_name in shots:
-        #         QMessageBox.warning(self, "Duplicate Shot", f"Shot '{new_name}' already exists.")
-        #         return
-        #     shots[shots.index(old_name)] = new_name
-        #     if old_name in shot_struct:
-        #         shot_struct[new_name] = shot_struct.pop(old_name)
+        with self.config.batch():
+            if new_name != old_name:
+                self.config.rename_shot(old_name, new_name)
+            if frames is not None:
+                self.config.add_shot(new_name, frames)
 
         self.shot_name_input.clear()
         self.range_input.clear()
-        self.refresh_shot_list()
-        self.main_window.refresh_project_structure()
-        self.save_metadata()
 
     def delete_shot(self):
         selected_item = self.shot_list.currentItem()
         if not selected_item:
             return
 
-        name = selected_item.text().split()[0]
-        shots = self.main_window.metadata.get("shots", [])
-        shot_struct = self.main_window.metadata.get("shot_struct", {})
-
-        if name in shots:
-            shots.remove(name)
-        if name in shot_struct:
-            shot_struct.pop(name)
-
-        self.refresh_shot_list()
-        self.main_window.refresh_project_structure()
-        self.save_metadata()
-
-    def save_metadata(self):
-        """Write current metadata to YAML file."""
-        if hasattr(self.main_window, "metadata_file"):
-            with open(self.main_window.metadata_file, "w") as f:
-                yaml.safe_dump(self.main_window.metadata, f)
+        self.config.remove_shot(selected_item.data(Qt.UserRole))
 
     def done(self):
         self.close()
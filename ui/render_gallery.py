@@ -4,15 +4,66 @@ from pathlib import Path
 from PySide2.QtWidgets import (
     QWidget, QSplitter, QTreeWidget, QTreeWidgetItem, QLabel,
     QVBoxLayout, QHBoxLayout, QFormLayout, QPushButton, QSizePolicy,
-    QScrollArea
+    QScrollArea, QDoubleSpinBox
 )
 
 from PySide2.QtGui import QImage, QPixmap
-from PySide2.QtCore import Qt, Signal
+from PySide2.QtCore import Qt, Signal, QThreadPool
 from PIL import Image
 import numpy as np
 
 from core.rendering import RenderManager   # your class from rendering.py
+from core import events
+from core.thumbnails import ThumbnailCache, THUMBNAIL_SIZE
+from core.imagecache import IMAGE_CACHE, display_view, preview_step, image_size
+from ui.workers import EventRelay, ImageDecodeWorker
+
+MAIN_IMAGE_SIZE = (600, 400)
+VIEW_TRANSFORM = "sRGB"  # for float (EXR) frames; see core.imagecache.VIEW_TRANSFORMS
+DECODE_THREADS = 4  # images decoded at once per gallery; mostly waiting on disk or the network share
+
+
+def pil_to_qimage(im: Image.Image) -> QImage:
+    """QImage owning a copy of a PIL image's pixels, safe to hand to another thread."""
+    if im.mode not in ("RGB", "L"):
+        im = im.convert("RGB")
+    fmt, channels = (QImage.Format_RGB888, 3) if im.mode == "RGB" else (QImage.Format_Grayscale8, 1)
+    data = im.tobytes("raw", im.mode)
+    return QImage(data, im.size[0], im.size[1], im.size[0] * channels, fmt).copy()
+
+
+def decode_thumbnail(image_path: str, thumbnails=None) -> QImage:
+    """Version-strip thumbnail, from the project's ThumbnailCache when there is one. Runs on a pool thread."""
+    source = thumbnails.thumbnail(image_path) if thumbnails is not None else image_path
+    image = QImage(source) if source else QImage()
+    if image.isNull():
+        raise ValueError(f"Cannot read {image_path}")
+    return image.scaled(*THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def array_to_qimage(pixels: np.ndarray) -> QImage:
+    """
+    QImage over an 8-bit C-contiguous H x W (greyscale) or H x W x 3 (RGB)
+    array, sharing its memory; the image keeps a reference to the array.
+    """
+    fmt = QImage.Format_Grayscale8 if pixels.ndim == 2 else QImage.Format_RGB888
+    image = QImage(pixels.data, pixels.shape[1], pixels.shape[0], pixels.strides[0], fmt)
+    image.pixels = pixels
+    return image
+
+
+def decode_view(image_path: str, channel: str = None, exposure: float = 0.0) -> QImage:
+    """
+    Main viewer image (all of RGB, or one channel, luminance or alpha as
+    greyscale) scaled to fit. Frames are decoded at the coarsest pixel step
+    that still fills the viewer (an EXR mip level where there is one) and kept
+    in IMAGE_CACHE, so only the first view of a frame reads the file. Runs on
+    a pool thread.
+    """
+    width, height = image_size(image_path)
+    pixels = IMAGE_CACHE.get(image_path, preview_step((height, width), MAIN_IMAGE_SIZE))
+    view = display_view(pixels, channel, exposure, transform=VIEW_TRANSFORM)
+    return array_to_qimage(view).scaled(*MAIN_IMAGE_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
 
 
 class ThumbnailWidget(QWidget):
@@ -26,15 +77,10 @@ class ThumbnailWidget(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(2, 2, 2, 2)
 
-        self.image_label = QLabel()
+        # Placeholder until the gallery's decode worker delivers the thumbnail (set_image)
+        self.image_label = QLabel("Loading...")
         self.image_label.setAlignment(Qt.AlignCenter)
-        pixmap = QPixmap(image_path)
-        if not pixmap.isNull():
-            self.image_label.setPixmap(
-                pixmap.scaled(120, 80, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            )
-        else:
-            self.image_label.setText("No Image")
+        self.image_label.setFixedSize(*THUMBNAIL_SIZE)
 
         self.text_label = QLabel(version_label)
         self.text_label.setAlignment(Qt.AlignCenter)
@@ -46,6 +92,12 @@ class ThumbnailWidget(QWidget):
         self.image_label.mousePressEvent = self.on_click
         self.text_label.mousePressEvent = self.on_click
 
+    def set_image(self, image: QImage):
+        self.image_label.setPixmap(QPixmap.fromImage(image))
+
+    def set_failed(self, message=None):
+        self.image_label.setText("No Image")
+
     def on_click(self, event):
         self.clicked.emit(self.image_path, self.rsv)
 
@@ -55,13 +107,22 @@ class RenderGallery(QWidget):
     """Middle panel: main image + version thumbnails + button group."""
     image_selected = Signal(str)  # emits the current main image path
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, thumbnails: ThumbnailCache = None):
         super().__init__(parent)
+        self.thumbnails = thumbnails  # optional core.thumbnails.ThumbnailCache for the version strip
         self.layout = QVBoxLayout(self)
 
         self.current_image_path = None
         self.current_rsv = None
-        self.current_channel = None  # None, "R","G","B"
+        self.current_channel = None  # None, "R","G","B","A" or "L" (luminance)
+        self.exposure = 0.0  # stops
+        self.displayed_image = None  # (path, channel, exposure) on screen, once decoded
+
+        # Images are decoded on this pool, never on the GUI thread
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(DECODE_THREADS)
+        self._requests = []  # outstanding ImageDecodeWorkers for the frame being shown
+        self._main_request = None
 
         # Main image
         self.main_image_label = QLabel("No image")
@@ -74,14 +135,29 @@ class RenderGallery(QWidget):
         self.btn1 = QPushButton("Channel R")
         self.btn2 = QPushButton("Channel G")
         self.btn3 = QPushButton("Channel B")
+        self.btn_rgb = QPushButton("RGB")
+        self.btn_luma = QPushButton("Luma")
+        self.btn_alpha = QPushButton("Alpha")
+        self.exposure_input = QDoubleSpinBox()
+        self.exposure_input.setRange(-10.0, 10.0)
+        self.exposure_input.setSingleStep(0.5)
+        self.exposure_input.setPrefix("Exposure ")
+        btn_row.addWidget(self.btn_rgb)
         btn_row.addWidget(self.btn1)
         btn_row.addWidget(self.btn2)
         btn_row.addWidget(self.btn3)
+        btn_row.addWidget(self.btn_luma)
+        btn_row.addWidget(self.btn_alpha)
+        btn_row.addWidget(self.exposure_input)
         self.layout.addLayout(btn_row)
 
+        self.btn_rgb.clicked.connect(lambda: self.show_channel(None))
         self.btn1.clicked.connect(lambda: self.show_channel("R"))
         self.btn2.clicked.connect(lambda: self.show_channel("G"))
         self.btn3.clicked.connect(lambda: self.show_channel("B"))
+        self.btn_luma.clicked.connect(lambda: self.show_channel("L"))
+        self.btn_alpha.clicked.connect(lambda: self.show_channel("A"))
+        self.exposure_input.valueChanged.connect(self.set_exposure)
 
         # Scroll area for version thumbnails
         self.thumb_scroll = QScrollArea()
@@ -93,8 +169,10 @@ class RenderGallery(QWidget):
 
     # ---------- public API ----------
     def clear_gallery(self):
-        """Reset viewer and thumbnails."""
+        """Reset viewer and thumbnails, dropping decodes still pending for the previous frame."""
+        self.cancel_pending()
         self.main_image_label.setText("No image")
+        self.displayed_image = None
         self.current_image_path = None
         self.current_rsv = None
         self.current_channel = None
@@ -121,15 +199,52 @@ class RenderGallery(QWidget):
         tw = ThumbnailWidget(path, version_label, rsv)
         tw.clicked.connect(self._on_thumb_clicked)
         self.thumb_layout.addWidget(tw)
+        self._decode(decode_thumbnail, (path, self.thumbnails), tw.set_image, tw.set_failed)
 
     def show_channel(self, channel: str):
-        """Set current channel (R/G/B) and update the main image view."""
+        """Set current channel (R/G/B/A, L for luminance, None for RGB) and update the main image view."""
         if not self.current_image_path:
             return
         self.current_channel = channel
         self._update_view()
 
+    def set_exposure(self, stops: float):
+        self.exposure = stops
+        if self.current_image_path:
+            self._update_view()
+
+    def cancel_pending(self):
+        """Cancel every decode not delivered yet; their results are dropped."""
+        for worker in self._requests:
+            worker.cancel()
+        self._requests = []
+        self._main_request = None
+
     # ---------- internals ----------
+    def _decode(self, decode, args, on_done, on_error):
+        """Run decode(*args) on the pool; on_done(QImage) or on_error(message) runs on the GUI thread."""
+        worker = ImageDecodeWorker(decode, *args)
+
+        def finished(image):
+            self._forget(worker)
+            if not worker.cancelled:  # may have been cancelled while the result was queued
+                on_done(image)
+
+        def failed(message):
+            self._forget(worker)
+            if not worker.cancelled:
+                on_error(message)
+
+        worker.signals.finished.connect(finished)
+        worker.signals.error.connect(failed)
+        self._requests.append(worker)
+        self.pool.start(worker)
+        return worker
+
+    def _forget(self, worker):
+        if worker in self._requests:
+            self._requests.remove(worker)
+
     def _on_thumb_clicked(self, path: str, rsv: str):
         """Swap clicked thumb with main image (and keep versions labeled)."""
         prev_main = self.current_image_path
@@ -160,36 +275,27 @@ class RenderGallery(QWidget):
         return "v?"
 
     def _update_view(self):
-        """Update the main image label based on channel or original."""
-        try:
-            img = Image.open(self.current_image_path).convert("RGB")
-
-            if self.current_channel:
-                # Use the selected channel as a single-band grayscale image
-                idx = {"R": 0, "G": 1, "B": 2}[self.current_channel]
-                channel_data = img.getchannel(idx)
-                img = channel_data.convert("L")
-
-            img_qt = self.pil2pixmap(img)
-            self.main_image_label.setPixmap(img_qt.scaled(600, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        except Exception as e:
-            print("Error showing image:", e)
+        """Decode the main image (channel or original) in the background; the current view stays until it is ready."""
+        if self._main_request is not None:
+            self._main_request.cancel()  # superseded by this channel or image
+        view = (self.current_image_path, self.current_channel, self.exposure)
+        if self.displayed_image is None:
+            self.main_image_label.setText("Loading...")
+
+        def show(image):
+            self.main_image_label.setPixmap(QPixmap.fromImage(image))
+            self.displayed_image = view
+
+        def failed(message):
+            print("Error showing image:", message)
             self.main_image_label.setText("Error showing image")
 
+        self._main_request = self._decode(decode_view, view, show, failed)
+
     @staticmethod
     def pil2pixmap(im: Image.Image) -> QPixmap:
         """Convert PIL Image to QPixmap"""
-        if im.mode == "RGB":
-            data = im.tobytes("raw", "RGB")
-            qimg = QImage(data, im.size[0], im.size[1], QImage.Format_RGB888)
-        elif im.mode == "L":
-            data = im.tobytes("raw", "L")
-            qimg = QImage(data, im.size[0], im.size[1], QImage.Format_Grayscale8)
-        else:
-            im = im.convert("RGB")
-            data = im.tobytes("raw", "RGB")
-            qimg = QImage(data, im.size[0], im.size[1], QImage.Format_RGB888)
-        return QPixmap.fromImage(qimg)
+        return QPixmap.fromImage(pil_to_qimage(im))
 
 
 
@@ -197,13 +303,17 @@ class ManageShotsWindow3Panel(QWidget):
     """Full 3-panel window."""
     def __init__(self, main_window):
         super().__init__()
-        self.metadata = main_window.metadata
+        self.main_window = main_window
         self.project_dir = main_window.project_path
         self.render_config_path = os.path.join(self.project_dir, "Config", "renders.yaml")
         self.manager = RenderManager(self.render_config_path)
+        self.manager.attach_model(self.model)  # render versions and frame versions, next to the shots
+        self._shot_items = {}  # shot name -> QTreeWidgetItem
+        self.shown_frame = None  # frame number in the gallery, for FRAME_COMPLETED
 
         self.setWindowTitle("View Project")
         self.resize(1400, 800)
+        self.setAttribute(Qt.WA_DeleteOnClose)  # closeEvent closes self.manager, so a closed view is not reused
 
         splitter = QSplitter(Qt.Horizontal, self)
         layout = QVBoxLayout(self)
@@ -215,7 +325,7 @@ class ManageShotsWindow3Panel(QWidget):
         splitter.addWidget(self.shot_tree)
 
         # Middle panel: gallery
-        self.render_gallery = RenderGallery()
+        self.render_gallery = RenderGallery(thumbnails=ThumbnailCache.for_project(self.project_dir))
         splitter.addWidget(self.render_gallery)
 
         # Right panel: render settings
@@ -233,15 +343,56 @@ class ManageShotsWindow3Panel(QWidget):
         self.shot_tree.itemClicked.connect(self.on_item_clicked)
         self.render_gallery.image_selected.connect(self.show_render_settings)
 
+        # Shot and render changes from any window or render thread, patched in place
+        self.event_relay = EventRelay(self.manager.events, parent=self)
+        self.event_relay.received.connect(self.on_project_event)
+
+    @property
+    def model(self):
+        """The project's core.models.Project: shots from the config, renders kept current by self.manager."""
+        return self.main_window.config.model
+
+    def closeEvent(self, event):
+        self.manager.close()  # the project database connection, on SQLite-backed projects
+        super().closeEvent(event)
+
     def populate_shots(self):
-        shot_struct = self.metadata.get("shot_struct", {})
-        for shot_name, frames in shot_struct.items():
-            shot_item = QTreeWidgetItem([shot_name])
+        for shot in self.model.shots:  # in shot list order
+            self._add_shot_item(shot.id)
+
+    def _add_shot_item(self, shot_name, index=None):
+        shot = self.model.shot(shot_name)
+        frames = shot.frame_range if shot is not None else None
+        shot_item = QTreeWidgetItem([shot_name])
+        if index is None:
             self.shot_tree.addTopLevelItem(shot_item)
-            if isinstance(frames, (list, tuple)) and len(frames) == 2:
-                for i in range(frames[0], frames[1] + 1):
-                    frame_item = QTreeWidgetItem([f"Frame {i}"])
-                    shot_item.addChild(frame_item)
+        else:
+            self.shot_tree.insertTopLevelItem(index, shot_item)
+        self._shot_items[shot_name] = shot_item
+        if frames is not None:
+            for i in range(frames[0], frames[1] + 1):
+                frame_item = QTreeWidgetItem([f"Frame {i}"])
+                shot_item.addChild(frame_item)
+
+    def _take_shot_item(self, shot_name):
+        shot_item = self._shot_items.pop(shot_name, None)
+        if shot_item is None:
+            return None
+        index = self.shot_tree.indexOfTopLevelItem(shot_item)
+        self.shot_tree.takeTopLevelItem(index)
+        return index
+
+    def on_project_event(self, event):
+        if event.kind == events.SHOT_ADDED:
+            self._add_shot_item(event.shot, event.index)
+        elif event.kind in (events.SHOT_UPDATED, events.SHOT_RENAMED):
+            self._add_shot_item(event.shot, self._take_shot_item(event.old_shot or event.shot))
+        elif event.kind == events.SHOT_REMOVED:
+            self._take_shot_item(event.shot)
+        elif event.kind == events.RSV_CREATED:
+            self.manager.refresh()  # may come from another manager on the same project
+        elif event.kind == events.FRAME_COMPLETED and event.frame == self.shown_frame:
+            self.load_gallery(None, self.shown_frame)
 
     def on_item_clicked(self, item, column):
         try:
@@ -255,45 +406,26 @@ class ManageShotsWindow3Panel(QWidget):
             print("Exception in on_item_clicked:", e)
 
     def load_gallery(self, shot_name: str, frame_number: int):
+        self.shown_frame = frame_number
         self.render_gallery.clear_gallery()
         try:
-            versions = self.manager.get_render_versions()
-            if not versions:
+            if not self.model.render_settings_versions:
                 self.render_gallery.main_image_label.setText("No renders yet")
                 return
 
-            frame_files = []
-
-            # Collect all files for this frame from all render folders
-            for rsv in versions:
-                info = self.manager.get_render_info(rsv)
-                ext = info["settings"].get("output_format", "png").lower()
-                output_dir = Path(info["settings"]["output_dir"])
-                render_folder = output_dir / rsv
-                if not render_folder.exists():
-                    continue
-
-                # rf{frame}v*.ext
-                for file in render_folder.glob(f"rf{frame_number}v*.{ext}"):
-                    frame_files.append(file)
-
+            # Every version's file for this frame, from the render-output index (no folder listings)
+            frame_files = self.manager.output_files(frame_number)
             if not frame_files:
                 self.render_gallery.main_image_label.setText("No render for this frame yet")
                 return
 
-            # Sort by version (v001 → v002 → ... )
-            frame_files.sort(key=lambda f: int(f.stem.split('v')[-1]))
-
             # Latest version = main image
             latest = frame_files[-1]
-            latest_rsv = latest.parent.name
-            self.render_gallery.set_main_image(str(latest), latest_rsv)
+            self.render_gallery.set_main_image(latest.path, latest.rsv)
 
             # Older versions = labeled, clickable thumbnails
-            for f in reversed(frame_files[:-1]):  # newest older first, left→right
-                rsv = f.parent.name
-                ver_label = f"v{int(f.stem.split('v')[-1]):03d}"
-                self.render_gallery.add_version_thumb(str(f), rsv, ver_label)
+            for output in reversed(frame_files[:-1]):  # newest older first, left→right
+                self.render_gallery.add_version_thumb(output.path, output.rsv, f"v{output.version:03d}")
 
         except Exception as e:
             print("Exception in load_gallery:", e)
@@ -309,8 +441,7 @@ class ManageShotsWindow3Panel(QWidget):
 
         try:
             rsv = Path(image_path).parent.name  # assume parent folder = rsvxxx
-            info = self.manager.get_render_info(rsv)
-            for key, value in info["settings"].items():
+            for key, value in self.model.render_settings_version(rsv).settings.items():
                 self.settings_form.addRow(QLabel(key), QLabel(str(value)))
         except Exception as e:
             print("Exception in show_render_settings:", e)
\ No newline at end of file
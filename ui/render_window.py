@@ -3,11 +3,14 @@ from PySide2.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QComboBox, QSpinBox, QCheckBox
 )
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QThreadPool
 
 from ui.progress_window import ProgressWindow
-from core.rendering import RenderSettings, Renderer, RenderManager
+from ui.workers import RenderWorker
+from core.rendering import RenderSettings, Renderer, RenderManager, RenderEngine, WorkerPool, FRAME_STRIDE
 from core.utils import list_cameras_in_usd
+from core.scheduler import RenderQueue
+from core.telemetry import TelemetryStore
 
 
 class RenderSettingsWindow(QWidget):
@@ -21,9 +24,19 @@ class RenderSettingsWindow(QWidget):
         # Render manager
         self.renders_yaml = os.path.join(self.project_dir, "Config", "renders.yaml")
         self.rm = RenderManager(self.renders_yaml)
+        self.worker_pool = None  # warm DCC sessions, kept across render versions
 
         self.setWindowTitle("Render Settings")
-        self.setFixedSize(450, 420)
+        self.setFixedSize(450, 510)
+
+        # --- Render Version (new, or resume an existing one) ---
+        self.version_label = QLabel("Render Version:")
+        self.version_combo = QComboBox()
+        self.version_combo.currentIndexChanged.connect(self.update_resume_state)
+
+        version_layout = QHBoxLayout()
+        version_layout.addWidget(self.version_label)
+        version_layout.addWidget(self.version_combo)
 
         # --- Renderer Dropdown ---
         self.renderer_label = QLabel("Renderer:")
@@ -70,12 +83,41 @@ class RenderSettingsWindow(QWidget):
         frame_layout.addWidget(QLabel("Start")); frame_layout.addWidget(self.start_frame)
         frame_layout.addWidget(QLabel("End")); frame_layout.addWidget(self.end_frame)
 
+        # --- Frames per DCC launch (0 = sized automatically) ---
+        self.chunk_label = QLabel("Frames per Job:")
+        self.chunk_size = QSpinBox(); self.chunk_size.setRange(0, 100); self.chunk_size.setValue(0)
+        self.chunk_size.setSpecialValueText("Auto")
+
+        # --- Seconds a frame may run before the render is killed (0 = no limit) ---
+        self.timeout_label = QLabel("Frame Timeout (s):")
+        self.frame_timeout = QSpinBox(); self.frame_timeout.setRange(0, 86400); self.frame_timeout.setValue(0)
+        self.frame_timeout.setSpecialValueText("None")
+
+        chunk_layout = QHBoxLayout()
+        chunk_layout.addWidget(self.chunk_label)
+        chunk_layout.addWidget(self.chunk_size)
+        chunk_layout.addWidget(self.timeout_label)
+        chunk_layout.addWidget(self.frame_timeout)
+
+        # --- Frame Order: render a coarse preview of the whole range first ---
+        self.order_label = QLabel("Frame Order:")
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("Sequential", "sequential")
+        self.order_combo.addItem("Progressive (first, last, middle, ...)", "progressive")
+        self.order_combo.addItem(f"Every {FRAME_STRIDE}th, then Fill In", "stride")
+
+        order_layout = QHBoxLayout()
+        order_layout.addWidget(self.order_label)
+        order_layout.addWidget(self.order_combo)
+
         # --- Options ---
         self.motion_blur = QCheckBox("Motion Blur")
         self.denoise = QCheckBox("Denoise")
+        self.keep_warm = QCheckBox("Keep DCC Sessions Warm")
         options_layout = QHBoxLayout()
         options_layout.addWidget(self.motion_blur)
         options_layout.addWidget(self.denoise)
+        options_layout.addWidget(self.keep_warm)
 
         # --- Karma-specific (hidden by default) ---
         self.camera_label = QLabel("Camera:")
@@ -90,26 +132,59 @@ class RenderSettingsWindow(QWidget):
         self.render_button = QPushButton("Render")
         self.render_button.clicked.connect(self.start_render)
 
+        # --- Queue Button: hand the render to the scheduler instead of rendering here ---
+        self.queue_button = QPushButton("Queue Render")
+        self.queue_button.clicked.connect(self.queue_render)
+
         # --- Error Label ---
         self.error_label = QLabel("")
         self.error_label.setStyleSheet("color: red")
 
         # --- Main Layout ---
         layout = QVBoxLayout()
+        layout.addLayout(version_layout)
         layout.addLayout(renderer_layout)
         layout.addLayout(format_layout)
         layout.addLayout(res_layout)
         layout.addLayout(fps_layout)
         layout.addLayout(frame_layout)
+        layout.addLayout(chunk_layout)
+        layout.addLayout(order_layout)
         layout.addLayout(options_layout)
         layout.addWidget(self.camera_label); layout.addWidget(self.camera_combo)
         layout.addWidget(self.light_label); layout.addWidget(self.light_combo)
         layout.addWidget(self.error_label)
         layout.addStretch()
-        layout.addWidget(self.render_button)
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.queue_button)
+        button_layout.addWidget(self.render_button)
+        layout.addLayout(button_layout)
         self.setLayout(layout)
 
         self.update_formats()
+        self.refresh_versions()
+
+    # -------------------------
+    def refresh_versions(self):
+        """List existing render versions so an interrupted one can be resumed."""
+        self.version_combo.blockSignals(True)
+        self.version_combo.clear()
+        self.version_combo.addItem("New Version")
+        for rsv in self.rm.get_render_versions():
+            self.version_combo.addItem(f"Resume {rsv}", rsv)
+        self.version_combo.blockSignals(False)
+        self.update_resume_state()
+
+    def update_resume_state(self):
+        """A resumed version keeps its original settings, so lock those controls."""
+        rsv = self.version_combo.currentData()
+        for widget in (self.renderer_combo, self.format_combo, self.res_width, self.res_height,
+                       self.fps_input, self.motion_blur, self.denoise, self.camera_combo, self.light_combo):
+            widget.setEnabled(rsv is None)
+        frame_range = self.rm.get_frame_range(rsv) if rsv else None
+        if frame_range:
+            self.start_frame.setValue(frame_range[0])
+            self.end_frame.setValue(frame_range[1])
 
     # -------------------------
     def update_formats(self):
@@ -160,47 +235,95 @@ class RenderSettingsWindow(QWidget):
         return True
 
     # -------------------------
-    def start_render(self):
+    def prepare_render(self):
+        """
+        Resolve the render version, its settings and the frames to render,
+        creating a new version unless an existing one is being resumed.
+        Returns None when there is nothing to render.
+        """
         if not self.validate_inputs():
+            return None
+
+        resume_rsv = self.version_combo.currentData()
+        if resume_rsv:
+            # Reopen the version and schedule only frames that are missing or corrupt on disk
+            rsv = resume_rsv
+            settings = self.rm.get_settings(rsv)
+            frames = self.rm.missing_frames(rsv, range(self.start_frame.value(), self.end_frame.value() + 1))
+            if not frames:
+                self.error_label.setText(f"{rsv} is already complete.")
+                return None
+        else:
+            settings = RenderSettings(
+                renderer=self.renderer_combo.currentText(),
+                fps=self.fps_input.value(),
+                output_dir=self.output_path,
+                output_format=self.format_combo.currentText(),
+                resolution_width=self.res_width.value(),
+                resolution_height=self.res_height.value(),
+                motion_blur=self.motion_blur.isChecked(),
+                denoise=self.denoise.isChecked()
+            )
+
+            # if settings.renderer == "Karma":
+            settings.camera = self.camera_combo.currentText()
+            settings.light = self.light_combo.currentText()
+
+            # Create new render version
+            frames = range(self.start_frame.value(), self.end_frame.value() + 1)
+            rsv = self.rm.new_render_version(settings, frame_range=(frames[0], frames[-1]))
+            self.refresh_versions()
+
+        return rsv, settings, frames
+
+    def queue_render(self):
+        prepared = self.prepare_render()
+        if prepared is None:
             return
+        rsv, _, frames = prepared
+        job = RenderQueue().submit(self.project_dir, rsv, frames, shot=self.shot or "")
+        self.error_label.setText(f"Queued {rsv} as {job.id}.")
 
-        settings = RenderSettings(
-            renderer=self.renderer_combo.currentText(),
-            fps=self.fps_input.value(),
-            output_dir=self.output_path,
-            output_format=self.format_combo.currentText(),
-            resolution_width=self.res_width.value(),
-            resolution_height=self.res_height.value(),
-            motion_blur=self.motion_blur.isChecked(),
-            denoise=self.denoise.isChecked()
-        )
+    def start_render(self):
+        prepared = self.prepare_render()
+        if prepared is None:
+            return
+        rsv, settings, frames = prepared
 
-        # if settings.renderer == "Karma":
-        settings.camera = self.camera_combo.currentText()
-        settings.light = self.light_combo.currentText()
+        if self.keep_warm.isChecked() and self.worker_pool is None:
+            self.worker_pool = WorkerPool()
+            QApplication.instance().aboutToQuit.connect(self.worker_pool.close)
+        pool = self.worker_pool if self.keep_warm.isChecked() else None
+        renderer = Renderer(settings, metadata=self.project, rsv=rsv, pool=pool,
+                            telemetry=TelemetryStore(os.path.join(self.project_dir, "Config")))
+        engine = RenderEngine(renderer, manager=self.rm, chunk_size=self.chunk_size.value() or None,
+                              ordering=self.order_combo.currentData())
 
-        # Create new render version
-        rsv = self.rm.new_render_version(settings)
-        renderer = Renderer(settings, metadata=self.project, rsv=rsv)
+        self.render_worker = RenderWorker(engine, frames, frame_timeout=self.frame_timeout.value() or None)
 
-        # For now: single batch job
         self.progress = ProgressWindow(
             message=f"Rendering ...",
             determinate=True,
-            maximum=(self.end_frame.value() - self.start_frame.value() + 1)
+            maximum=len(frames),
+            on_cancel=self.render_worker.cancel
         )
         self.progress.show()
 
-        def progress_callback(idx, total, frame):
-            pct = idx / total * 100
+        def progress_callback(done, total, frame):
+            pct = done / total * 100
             self.progress.update_message(f"Rendering... {pct:.0f}%")
-            self.progress.update_progress(idx)
-            QApplication.processEvents()
-            self.rm.update_frame(rsv, frame)
-            if idx == total:
-                self.progress.task_done()
-
-        total = self.end_frame.value() - self.start_frame.value() + 1
-        for idx, frame in enumerate(range(self.start_frame.value(), self.end_frame.value() + 1), start=1):
-            renderer.render_shot({"frame": frame})
-            progress_callback(idx, total, frame)
+            self.progress.update_progress(done)
+
+        def render_failed(message):
+            self.progress.close()
+            self.error_label.setText(f"Render failed: {message}")
+
+        def render_cancelled():
+            self.progress.close()
+            self.error_label.setText(f"Render {rsv} cancelled.")
+
+        self.render_worker.signals.progress.connect(progress_callback)
+        self.render_worker.signals.finished.connect(self.progress.task_done)
+        self.render_worker.signals.cancelled.connect(render_cancelled)
+        self.render_worker.signals.error.connect(render_failed)
+        QThreadPool.globalInstance().start(self.render_worker)
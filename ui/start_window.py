@@ -1,16 +1,21 @@
 import sys
 import time
 import os
+import logging
 from PySide2.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QFileDialog
+    QLineEdit, QFileDialog, QCompleter
 )
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QStringListModel, QTimer, QThreadPool
 
 from ui.progress_window import ProgressWindow
 from ui.project_window import MainProjectWindow
 from core.utils import check_file_type 
 from core.project import SceneProject
+from ui.workers import CatalogRefreshWorker
+
+SUGGEST_DELAY_MS = 150  # typing pause before tag suggestions are looked up
+logger = logging.getLogger(__name__)
 
 
 class StartWindow(QWidget):
@@ -197,6 +202,18 @@ class ExistingProjectWindow(QWidget):
         self.tag_input = QLineEdit()
         self.tag_input.setPlaceholderText("Enter project tag (e.g., @MyProject)")
 
+        # Suggest tags from the project catalog as the user types (prefix and fuzzy matches)
+        self.tag_model = QStringListModel()
+        completer = QCompleter(self.tag_model, self)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.tag_input.setCompleter(completer)
+        self.suggest_timer = QTimer(self)
+        self.suggest_timer.setSingleShot(True)
+        self.suggest_timer.setInterval(SUGGEST_DELAY_MS)
+        self.suggest_timer.timeout.connect(lambda: self.suggest_projects(self.tag_input.text()))
+        self.tag_input.textEdited.connect(self.suggest_timer.start)  # restarted by every key
+        self.catalog_worker = None
+
         load_button = QPushButton("Load Project")
         load_button.clicked.connect(self.load_project)
 
@@ -251,6 +268,26 @@ class ExistingProjectWindow(QWidget):
         )
         self.progress.show()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.catalog_worker is None:  # rescan a stale catalog once, off the GUI thread
+            self.catalog_worker = CatalogRefreshWorker()
+            self.catalog_worker.signals.finished.connect(self.on_catalog_refreshed)
+            QThreadPool.globalInstance().start(self.catalog_worker)
+
+    def on_catalog_refreshed(self, entries):
+        if self.tag_input.text().strip("@ "):
+            self.suggest_projects(self.tag_input.text())
+
+    def suggest_projects(self, text):
+        """Fill the completer from catalog.yaml as it is; the rescan runs in the background."""
+        try:
+            matches = self.sp.list_projects(text, refresh=False)[:10] if text.strip("@ ") else []
+        except Exception as e:  # suggestions are a convenience; typing a tag still works
+            logger.debug("No tag suggestions for %r: %s", text, e)
+            matches = []
+        self.tag_model.setStringList([entry["tag"] for entry in matches])
+
     def load_existing_project(self, project_tag):
         """Wrapper for SceneProject().load_existing to make testing easier."""
         return self.sp.load_existing(project_tag)
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+
 from PySide2.QtCore import QObject, Signal, QRunnable, Slot
-from core.projects import SceneProject
+from core.project import SceneProject
 
 class ProjectCreationWorkerSignals(QObject):
     finished = Signal(dict)  # Pass the result or metadata if needed
@@ -21,3 +24,126 @@ class ProjectCreationWorker(QRunnable):
             self.signals.finished.emit(sp.metadata)
         except Exception as e:
             self.signals.error.emit(str(e))
+
+
+class CatalogRefreshWorkerSignals(QObject):
+    finished = Signal(list)  # catalog entries
+    error = Signal(str)
+
+class CatalogRefreshWorker(QRunnable):
+    """Brings the project catalog up to date (rescanning ROOT_DIR if it is stale) on a pool thread."""
+    def __init__(self):
+        super().__init__()
+        self.signals = CatalogRefreshWorkerSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            self.signals.finished.emit(SceneProject().list_projects())
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+
+class RenderWorkerSignals(QObject):
+    progress = Signal(int, int, int)  # done, total, frame
+    output = Signal(str, str)  # stream, line
+    finished = Signal()
+    cancelled = Signal()
+    error = Signal(str)
+
+class RenderWorker(QRunnable):
+    """
+    Runs a core.rendering.RenderEngine on its own asyncio event loop in a pool
+    thread and relays progress to the GUI thread through Qt signals.
+    cancel() may be called from the GUI thread at any time; it cancels the
+    render task on the worker's loop, which kills the running DCC processes.
+    """
+    def __init__(self, engine, frames, frame_timeout=None):
+        super().__init__()
+        self.engine = engine
+        self.frames = list(frames)
+        self.frame_timeout = frame_timeout
+        self.signals = RenderWorkerSignals()
+        self.engine.subscribe(self.signals.progress.emit)
+        self._loop = None
+        self._task = None
+        self._cancel_requested = False
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self._cancel_requested = True
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+
+    @Slot()
+    def run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            with self._lock:
+                if self._cancel_requested:
+                    self.signals.cancelled.emit()
+                    return
+                self._loop = loop
+                self._task = loop.create_task(
+                    self.engine.run_async(self.frames, self.frame_timeout, on_output=self.signals.output.emit)
+                )
+            loop.run_until_complete(self._task)
+            self.signals.finished.emit()
+        except asyncio.CancelledError:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        finally:
+            with self._lock:
+                self._loop = None
+            loop.close()
+
+
+class EventRelay(QObject):
+    """
+    Delivers a core.events bus to Qt code: received fires on the thread this
+    relay lives in (the GUI thread), also for events emitted by render
+    threads. Unsubscribes when destroyed, e.g. along with its parent widget.
+    """
+    received = Signal(object)  # core.events.ProjectEvent
+
+    def __init__(self, bus, kinds=None, parent=None):
+        super().__init__(parent)
+        self._unsubscribe = bus.subscribe(self.received.emit, kinds)
+        self.destroyed.connect(self._unsubscribe)
+
+
+class ImageDecodeWorkerSignals(QObject):
+    finished = Signal(object)  # QImage
+    error = Signal(str)
+
+class ImageDecodeWorker(QRunnable):
+    """
+    Runs decode(*args), which returns a QImage (QPixmap may only be built on
+    the GUI thread), on a pool thread. cancel() drops a request that is no
+    longer wanted: it is skipped if not started yet and never reported.
+    """
+    def __init__(self, decode, *args):
+        super().__init__()
+        self.setAutoDelete(False)  # the requester keeps it, and may still cancel() it after run()
+        self.decode = decode
+        self.args = args
+        self.cancelled = False
+        self.signals = ImageDecodeWorkerSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    @Slot()
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            image = self.decode(*self.args)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(image)